@@ -1,14 +1,53 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
-import plotly.express as px
 from datetime import datetime
+from contextlib import contextmanager
 import json
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils.dataframe import dataframe_to_rows
+import copy
+import functools
 import io
+import os
+import time
+
+import feasibility
+from feasibility import (
+    SECTION_KEYS,
+    calculate_total,
+    section_totals,
+    project_settings,
+    discount_factors_for,
+    calculate_discounted_cashflow,
+    calculate_cumulative_cashflow,
+    calculate_npv,
+    calculate_irr,
+    calculate_payback_period,
+)
+from feasibility.attribution import item_contributions
+from feasibility.capex import CAPEX_SCHEDULE_FIELDS, capex_matrix, purchase_matrix
+from feasibility.curve import average_rate, curve_points, curve_rates, curve_discount_factors, parse_curve_csv
+from feasibility.deferral import DEFERRAL_STREAMS, item_deferral_npvs, delay_summary
+from feasibility.escalation import (
+    ESCALATION_FIELDS,
+    operating_matrices,
+    parse_adjustments,
+    format_adjustments,
+)
+from feasibility.flows import ProjectFlows, settings_key
+from feasibility.horizons import horizon_profile
+from feasibility.options import OPTION_FIELDS, parse_enables, format_enables, optional_capex_for
+from feasibility.tax import (
+    ASSET_GROUPS,
+    DEFAULT_ASSET_GROUP,
+    DEFAULT_TAX_RATE,
+    DEPRECIATION_METHODS,
+    tax_deductions,
+    after_tax_schedule,
+)
+from feasibility.templates import DEFAULT_TEMPLATE, template_names, new_project
+
+# Heavy, feature-specific modules (plotly, openpyxl, numpy_financial) are imported
+# lazily where they are first used to keep cold starts fast; see benchmarks/import_budget.py
 
 # Page configuration
 st.set_page_config(
@@ -79,6 +118,35 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
+# New projects start from a template (feasibility/templates/*.json); the
+# templates are read once per process and shared read-only by all sessions
+def start_from_template(template_id=DEFAULT_TEMPLATE):
+    """Replace the session's project with a fresh copy of a template"""
+    project = new_project(template_id)
+    st.session_state.capex_items = project['capex_items']
+    st.session_state.opex_cash_in = project['opex_cash_in']
+    st.session_state.opex_cash_out = project['opex_cash_out']
+    st.session_state.project_years = int(project['project_years'])
+    st.session_state.discount_rate = float(project['discount_rate'])
+    st.session_state.discount_curve = discount_curve_setting(project)
+    st.session_state.template = template_id
+    st.session_state.default_data_loaded = True
+    st.session_state.last_save = datetime.now()
+    reset_setting_inputs()
+
+def reset_setting_inputs():
+    """Let the sidebar duration/MARR/curve inputs pick up replaced project settings on the next run"""
+    for key in ('project_years_input', 'discount_rate_input', 'use_discount_curve'):
+        st.session_state.pop(key, None)
+    st.session_state.discount_curve_version = st.session_state.get('discount_curve_version', 0) + 1
+
+def discount_curve_setting(data):
+    """A project's discount curve as (year, rate) points, or None (also for an invalid curve)"""
+    try:
+        return curve_points(data['discount_curve']) if data.get('discount_curve') else None
+    except ValueError:
+        return None
+
 # Initialize session state with enhanced structure
 def init_session_state():
     # Flag to track if we've already initialized in this session
@@ -102,65 +170,200 @@ def init_session_state():
                 st.session_state.opex_cash_out = data.get('opex_cash_out', [])
                 st.session_state.project_years = int(data.get('project_years', 5))  # Ensure integer
                 st.session_state.discount_rate = float(data.get('discount_rate', 10.7))
+                st.session_state.discount_curve = discount_curve_setting(data)
                 st.session_state.default_data_loaded = data.get('default_data_loaded', True)
                 st.session_state.last_save = datetime.now()
                 loaded = True
         except:
             loaded = False
 
+        # Growth rates - UI setting only, NOT saved with data
+        if 'opex_in_growth' not in st.session_state:
+            st.session_state.opex_in_growth = 0.0
+        if 'opex_out_growth' not in st.session_state:
+            st.session_state.opex_out_growth = 0.0
+
+        # Income tax - UI setting only, like the growth rates
+        if 'after_tax' not in st.session_state:
+            st.session_state.after_tax = False
+        if 'tax_rate' not in st.session_state:
+            st.session_state.tax_rate = DEFAULT_TAX_RATE
+        if 'depreciation_method' not in st.session_state:
+            st.session_state.depreciation_method = DEPRECIATION_METHODS[0]
+
         # If no saved data found, initialize with defaults
         if not loaded:
-            # Growth rates - UI setting only, NOT saved with data
-            if 'opex_in_growth' not in st.session_state:
-                st.session_state.opex_in_growth = 0.0
-            if 'opex_out_growth' not in st.session_state:
-                st.session_state.opex_out_growth = 0.0
-
             # Add default data only on first load
-            st.session_state.capex_items = [
-                {"id": "79e1c473-4e21-4ac3-af5f-99b6e0cbfc73", "name": "Synology NAS Server", "volume": 1.0, "unit": "unit", "price": 10599000.0},
-                {"id": "bf7935f4-6824-471a-a7d0-d1c0b72ea194", "name": "Uninterruptible Power Supply (UPS)", "volume": 1.0, "unit": "unit", "price": 3529000.0},
-                {"id": "51d86d79-43d9-41a9-a6ec-a106c839f2ef", "name": "Network Switch", "volume": 2.0, "unit": "unit", "price": 132900.0},
-                {"id": "4157ff5c-8e94-4e15-9431-974da24ef6da", "name": "Laptop/Desktop", "volume": 6.0, "unit": "unit", "price": 6671000.0},
-                {"id": "11616bc0-3e98-4618-a9f0-aaefaec93fe4", "name": "Tablet", "volume": 4.0, "unit": "unit", "price": 4249150.0},
-                {"id": "303585da-d189-4973-a946-f8847035de87", "name": "Wireless Access Point", "volume": 3.0, "unit": "unit", "price": 175000.0},
-                {"id": "240d5d78-811b-4717-9034-4ea76e27e32d", "name": "Biaya Pengembangan Sistem", "volume": 1.0, "unit": "paket", "price": 28000000.0},
-                {"id": "af543c24-d7ad-423b-8bed-cac90c8b8270", "name": "Biaya Setup & Instalasi", "volume": 1.0, "unit": "paket", "price": 2000000.0},
-                {"id": "5fb9ae44-e5bc-47d9-869f-d90d12a69e41", "name": "Biaya Onboarding & Training", "volume": 1.0, "unit": "paket", "price": 1500000.0},
-                {"id": "b5f2f700-b75b-4db9-81f1-802fe06f6051", "name": "Biaya Domain & Konfigurasi", "volume": 1.0, "unit": "paket", "price": 2319900.0},
-                {"id": "c1a2b3c4-d5e6-4f7g-8h9i-0j1k2l3m4n5o", "name": "Kepemilikan Sistem (HKI)", "volume": 1.0, "unit": "paket", "price": 700000.0},
-                {"id": "d6e7f8g9-h0i1-4j2k-3l4m-5n6o7p8q9r0s", "name": "Perlindungan Data Pribadi", "volume": 1.0, "unit": "paket", "price": 6000000.0},
-                {"id": "e8f9g0h1-i2j3-4k4l-5m6n-7o8p9q0r1s2t", "name": "Keamanan Data Elektronik", "volume": 1.0, "unit": "paket", "price": 9000000.0},
-                {"id": "f0g1h2i3-j4k5-4l6m-7n8o-9p0q1r2s3t4u", "name": "Sertifikasi Keamanan Informasi (ISO 27001)", "volume": 1.0, "unit": "paket", "price": 20000000.0}
-            ]
+            start_from_template(DEFAULT_TEMPLATE)
 
-            st.session_state.opex_cash_in = [
-                {"id": "cf693797-5cd7-4985-9245-a3f96e562162", "name": "Penghematan biaya tenaga kerja administrasi", "volume": 1.0, "unit": "tahun", "price": 21600000.0},
-                {"id": "631868b8-1aad-46dd-93ed-b7522534f514", "name": "Pengurangan biaya kesalahan & rework", "volume": 1.0, "unit": "tahun", "price": 16800000.0},
-                {"id": "471147a2-d322-40c7-a45d-293b806b6fde", "name": "Peningkatan produktivitas proses bisnis", "volume": 1.0, "unit": "tahun", "price": 44076276.0},
-                {"id": "eeaa72cc-023e-438a-bdc6-4b8f724f91ee", "name": "Penghematan biaya dokumen fisik", "volume": 1.0, "unit": "tahun", "price": 6054600.0}
-            ]
-
-            st.session_state.opex_cash_out = [
-                {"id": "278e5ae1-b76f-4601-9f19-1cc84079b9d4", "name": "Koneksi Internet Dedicated", "volume": 1.0, "unit": "tahun", "price": 6750000.0},
-                {"id": "75090947-0595-4e0d-ad68-3df78a71b876", "name": "Listrik (Server & Infrastruktur) PLN tarif R1/900VA", "volume": 1.0, "unit": "tahun", "price": 5472000.0},
-                {"id": "de1e3463-a3cb-46f1-9b49-f73ea19a9f21", "name": "IP Public Cloudflare", "volume": 1.0, "unit": "tahun", "price": 3977280.0},
-                {"id": "8ebb7c15-4991-4e94-9db0-59473729d032", "name": "Maintenance & Support Teknis", "volume": 1.0, "unit": "tahun", "price": 13200000.0}
-            ]
-
-            st.session_state.default_data_loaded = True
-            st.session_state.project_years = 5
-            st.session_state.discount_rate = 10.7
-            st.session_state.last_save = datetime.now()
+        rebuild_section_totals()
 
         # Mark as initialized
         st.session_state.initialized = True
 
-init_session_state()
+
+# Per-rerun profiling: the sidebar "🩺 Profile reruns" toggle (on for every
+# session with FEASIBILITY_PROFILE=1) times each phase of a full rerun, and
+# each fragment rerun (item edits) as a whole, and appends it to a JSON-lines
+# log. The recent entries are kept in memory; the log is rotated when it grows.
+PROFILE_LOG_FILE = os.environ.get("FEASIBILITY_PROFILE_LOG", "feasibilitizer_profile.jsonl")
+PROFILE_WINDOW = 500  # Most recent log entries used for the rolling percentiles
+PROFILE_LOG_MAX_BYTES = 5 * 1024 * 1024  # Larger logs are moved to <log>.1
+
+def start_profile():
+    """Start timing this run if profiling is on"""
+    if 'profiling' not in st.session_state:
+        st.session_state.profiling = os.environ.get("FEASIBILITY_PROFILE") == "1"
+
+    st.session_state.profile_run = None
+    if st.session_state.profiling:
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        st.session_state.profile_run = {'start': time.perf_counter(), 'phases': {}}
+
+def stop_memory_tracing():
+    """Turn tracemalloc off again when profiling is switched off"""
+    import tracemalloc
+    if not st.session_state.profiling and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+@contextmanager
+def profile_phase(name):
+    """Add the wall time and memory change of a block to this run's profile (also a decorator)"""
+    run = st.session_state.get('profile_run')
+    if not run:
+        yield
+        return
+
+    import tracemalloc
+    memory_before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        phase = run['phases'].setdefault(name, {'ms': 0.0, 'calls': 0, 'memory_kb': 0.0})
+        phase['ms'] += (time.perf_counter() - start) * 1000
+        phase['calls'] += 1
+        phase['memory_kb'] += (tracemalloc.get_traced_memory()[0] - memory_before) / 1024
+
+@st.cache_resource(show_spinner=False)
+def profile_history(path):
+    """Recent profile log entries, shared by the sessions of this process.
+
+    Loaded once from the tail of the log; later entries are added as they are logged.
+    """
+    from collections import deque
+    history = deque(maxlen=PROFILE_WINDOW)
+    try:
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(0, size - PROFILE_WINDOW * 4096))
+            lines = f.read().splitlines()
+        if size > PROFILE_WINDOW * 4096:
+            lines = lines[1:]  # Started mid-line
+    except OSError:
+        lines = []
+    for line in lines:
+        try:
+            history.append(json.loads(line))
+        except ValueError:
+            continue
+    return history
+
+def append_profile_log(entry):
+    """Append an entry to the profile log; returns the recent entries, this one included"""
+    history = profile_history(PROFILE_LOG_FILE)
+    history.append(entry)
+    try:
+        if os.path.exists(PROFILE_LOG_FILE) and os.path.getsize(PROFILE_LOG_FILE) > PROFILE_LOG_MAX_BYTES:
+            os.replace(PROFILE_LOG_FILE, PROFILE_LOG_FILE + ".1")
+        with open(PROFILE_LOG_FILE, 'a') as f:
+            f.write(json.dumps(entry) + "\n")
+    except OSError:
+        # Profiling must never break the app
+        pass
+    return list(history)
+
+def profiled_fragment(name):
+    """Decorator for a fragment body: when the fragment reruns on its own it is profiled and logged as one rerun"""
+    def decorate(body):
+        @functools.wraps(body)
+        def run(*args, **kwargs):
+            if st.session_state.get('profile_run') or not st.session_state.get('profiling'):
+                # Part of a full rerun (profiled by its phases), or profiling is off
+                return body(*args, **kwargs)
+            start_profile()
+            try:
+                with profile_phase(name):
+                    return body(*args, **kwargs)
+            finally:
+                finish_profile(fragment=name)
+        return run
+    return decorate
+
+def finish_profile(fragment=None):
+    """Log this run's profile and show it with rolling percentiles (fragment reruns are only logged)"""
+    run = st.session_state.get('profile_run')
+    st.session_state.profile_run = None
+    if not run:
+        return
+
+    import tracemalloc
+    entry = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'total_ms': round((time.perf_counter() - run['start']) * 1000, 3),
+        'peak_memory_kb': round(tracemalloc.get_traced_memory()[1] / 1024, 1),
+        'active_tab': st.session_state.get('active_tab'),
+        'rerun': fragment or 'full',
+        'data_revision': st.session_state.get('data_revision', 0),
+        'phases': {
+            name: {'ms': round(p['ms'], 3), 'calls': p['calls'], 'memory_kb': round(p['memory_kb'], 1)}
+            for name, p in run['phases'].items()
+        },
+    }
+    history = append_profile_log(entry)
+    if fragment:
+        return
+    fragment_names = sorted({e['rerun'] for e in history if e.get('rerun', 'full') != 'full'})
+    history = [e for e in history if e.get('rerun', 'full') == 'full']
+
+    def percentiles(values):
+        return np.percentile(values, [50, 95, 99]) if values else [np.nan] * 3
+
+    rows = []
+    for name, phase in [('total', {'ms': entry['total_ms'], 'calls': 1, 'memory_kb': np.nan})] + list(entry['phases'].items()):
+        if name == 'total':
+            values = [e['total_ms'] for e in history if 'total_ms' in e]
+        else:
+            values = [e['phases'][name]['ms'] for e in history if name in e.get('phases', {})]
+        p50, p95, p99 = percentiles(values)
+        rows.append({'Phase': name, 'Time (ms)': phase['ms'], 'Calls': phase['calls'],
+                     'Memory Δ (KB)': phase['memory_kb'], 'p50': p50, 'p95': p95, 'p99': p99})
+    # Fragment reruns (item edits) from the same window, as whole reruns
+    recent = profile_history(PROFILE_LOG_FILE)
+    for name in fragment_names:
+        p50, p95, p99 = percentiles([e['total_ms'] for e in recent if e.get('rerun') == name])
+        rows.append({'Phase': f"fragment rerun: {name}", 'Time (ms)': np.nan, 'Calls': np.nan,
+                     'Memory Δ (KB)': np.nan, 'p50': p50, 'p95': p95, 'p99': p99})
+
+    with st.expander("🩺 Performance Profile", expanded=True):
+        st.caption(f"This rerun: {entry['total_ms']:.0f} ms, peak traced memory {entry['peak_memory_kb'] / 1024:.1f} MB. "
+                   f"Percentiles (ms) over the last {len(history)} reruns in {PROFILE_LOG_FILE}.")
+        st.dataframe(
+            pd.DataFrame(rows),
+            hide_index=True,
+            use_container_width=True,
+            column_config={col: st.column_config.NumberColumn(format="%.1f")
+                           for col in ['Time (ms)', 'Memory Δ (KB)', 'p50', 'p95', 'p99']},
+        )
 
 # Persistent storage functions using local file
 STORAGE_FILE = "feasibilitizer_data.json"
 
+@profile_phase("storage")
 def save_to_storage():
     """Save current state to persistent storage file"""
     try:
@@ -170,6 +373,7 @@ def save_to_storage():
             'opex_cash_out': st.session_state.opex_cash_out,
             'project_years': int(st.session_state.project_years),  # Ensure integer
             'discount_rate': float(st.session_state.discount_rate),
+            'discount_curve': [list(point) for point in st.session_state.discount_curve] if st.session_state.discount_curve else None,
             'last_save': st.session_state.last_save.isoformat(),
             'default_data_loaded': st.session_state.default_data_loaded
         }
@@ -183,6 +387,7 @@ def save_to_storage():
         # Silently fail - don't show error to user for auto-save
         return None
 
+@profile_phase("storage")
 def load_from_storage():
     """Load data from persistent storage file"""
     try:
@@ -196,11 +401,13 @@ def load_from_storage():
             st.session_state.opex_cash_out = data.get('opex_cash_out', [])
             st.session_state.project_years = int(data.get('project_years', 5))  # Ensure integer
             st.session_state.discount_rate = float(data.get('discount_rate', 10.7))
+            st.session_state.discount_curve = discount_curve_setting(data)
             st.session_state.default_data_loaded = data.get('default_data_loaded', False)
 
             if 'last_save' in data:
                 st.session_state.last_save = datetime.fromisoformat(data['last_save'])
 
+            rebuild_section_totals()
             return True
         return False
     except Exception as e:
@@ -210,309 +417,585 @@ def load_from_storage():
 # Auto-save function
 def auto_save():
     st.session_state.last_save = datetime.now()
+    st.session_state.data_revision = st.session_state.get('data_revision', 0) + 1
     save_to_storage()
 
-# Helper Functions with improved error handling
-def calculate_total(item):
-    """Calculate total from volume * price with validation"""
-    try:
-        volume = float(item.get('volume', 0))
-        price = float(item.get('price', 0))
-        return volume * price
-    except (ValueError, TypeError):
-        return 0
+# Section totals and cash flows for the session's project; the arithmetic lives
+# in the feasibility package so it also runs without Streamlit
+
+# Running section totals: rebuilt when a project is loaded/reset and updated
+# incrementally by every add/edit/duplicate/delete, so reading them is O(1)
+def rebuild_section_totals():
+    """Recompute every section total from its items (after load/reset)"""
+    st.session_state.section_totals = section_totals(st.session_state)
+    st.session_state.pop('project_flows', None)  # Rebuilt from the new items on first use
+
+def section_total(items_key):
+    """Current total of a section"""
+    if 'section_totals' not in st.session_state:
+        rebuild_section_totals()
+    return st.session_state.section_totals[items_key]
+
+def adjust_section_total(items_key, delta):
+    """Apply an item change (new total - old total) to a section total"""
+    st.session_state.section_totals[items_key] = section_total(items_key) + delta
+
+# Running yearly flows, NPV and payback (feasibility.flows): rebuilt when a project
+# is loaded/reset or a setting changes, and updated by every item change in O(years)
+def project_flows():
+    """The session's ProjectFlows, rebuilt when the settings it depends on change"""
+    project = current_project()
+    flows = st.session_state.get('project_flows')
+    if flows is None or flows.key != settings_key(project_settings(project)):
+        flows = st.session_state.project_flows = ProjectFlows(project)
+    return flows
+
+def adjust_item_flows(items_key, old_item, new_item):
+    """Apply an item change (old and new item; None when added or removed) to the running flows"""
+    flows = st.session_state.get('project_flows')
+    if flows is not None:
+        flows.replace_item(items_key, old_item, new_item)
 
 def calculate_capex_total():
     """Calculate total CAPEX with validation"""
-    return sum(calculate_total(item) for item in st.session_state.capex_items)
+    return section_total('capex_items')
 
 def calculate_yearly_opex_cash_in():
     """Calculate yearly OPEX cash in with validation"""
-    return sum(calculate_total(item) for item in st.session_state.opex_cash_in)
+    return section_total('opex_cash_in')
 
 def calculate_yearly_opex_cash_out():
     """Calculate yearly OPEX cash out with validation"""
-    return sum(calculate_total(item) for item in st.session_state.opex_cash_out)
+    return section_total('opex_cash_out')
+
+# Every OPEX item's amount per year (items × years), shared by the metrics,
+# the Arus Kas table and the export so they agree by construction
+def operating_item_matrices():
+    """(revenue, expense) escalation matrices for the current inputs, cached until they change"""
+    return cached_view_data('operating_matrices', lambda: operating_matrices(
+        st.session_state,
+        int(st.session_state.project_years),
+        st.session_state.opex_in_growth / 100.0,
+        st.session_state.opex_out_growth / 100.0
+    ))
+
+def operating_schedules():
+    """Revenue and expense totals for years 1..N"""
+    schedules = project_flows().schedules
+    return schedules['opex_cash_in'][1:].copy(), schedules['opex_cash_out'][1:].copy()
+
+# Every CAPEX item's purchases and residual values per year (items × years 0..N)
+def capex_item_matrix():
+    """CAPEX matrix for the current inputs, cached until they change"""
+    return cached_view_data('capex_matrix', lambda: capex_matrix(
+        st.session_state.capex_items,
+        int(st.session_state.project_years)
+    ))
+
+def capex_yearly_schedule():
+    """Net CAPEX for years 0..N"""
+    return project_flows().schedules['capex_items'].copy()
+
+def calculate_pre_tax_cashflow():
+    """Net cashflow for each year before income tax"""
+    return project_flows().pre_tax_cashflows.tolist()
+
+def tax_schedule():
+    """(depreciation, taxable income, tax) for years 0..N, or None when the analysis is pre-tax"""
+    if not st.session_state.after_tax:
+        return None
+
+    def build():
+        depreciation, disposal_gains = tax_deductions(
+            st.session_state.capex_items,
+            int(st.session_state.project_years),
+            st.session_state.depreciation_method
+        )
+        taxable_income, tax = after_tax_schedule(
+            capex_yearly_schedule(),
+            calculate_pre_tax_cashflow(),
+            depreciation - disposal_gains,
+            float(st.session_state.tax_rate)
+        )
+        return depreciation, disposal_gains, taxable_income, tax
+    return cached_view_data('tax_schedule', build)
 
+@profile_phase("engine")
 def calculate_net_cashflow():
-    """Calculate net cashflow for each year with growth rates applied for display only"""
+    """Calculate net cashflow for each year with each item's schedule and escalation applied (after tax when enabled)"""
     try:
-        years = int(st.session_state.project_years)  # Ensure integer
-        capex = calculate_capex_total()
-
-        # Base values from input data (never changed!)
-        base_cash_in = calculate_yearly_opex_cash_in()
-        base_cash_out = calculate_yearly_opex_cash_out()
-
-        # Get growth rates (convert % to decimal)
-        growth_in = st.session_state.opex_in_growth / 100.0
-        growth_out = st.session_state.opex_out_growth / 100.0
-
-        cashflows = [-capex]  # Year 0
-
-        # Calculate each year with compound growth (Excel-style)
-        # Growth starts from year 2: exponent = 0 for year 1, exponent = 1 for year 2, etc.
-        for year in range(1, years + 1):
-            if year == 1:
-                # Year 1: No growth (base amount)
-                cash_in_year = base_cash_in
-                cash_out_year = base_cash_out
-            else:
-                # Year 2+: Apply growth with exponent = year - 1
-                # Excel formula: =Base*(1+Rate)^(year-1)
-                cash_in_year = base_cash_in * ((1 + growth_in) ** (year - 1))
-                cash_out_year = base_cash_out * ((1 + growth_out) ** (year - 1))
-
-            yearly_net = cash_in_year - cash_out_year
-            cashflows.append(yearly_net)
-
-        return cashflows
+        return project_flows().cashflows.tolist()
     except Exception:
         return [0]
 
+@profile_phase("engine")
 def calculate_discount_factor():
-    """Calculate discount factors for each year"""
+    """Calculate discount factors for each year (from the discount curve when one is set)"""
     try:
-        years = int(st.session_state.project_years)  # Ensure integer
-        rate = st.session_state.discount_rate / 100
-        factors = [1.0]  # Year 0
-        for i in range(1, years + 1):
-            factors.append((1 + rate) ** i)
-        return factors
+        if st.session_state.discount_curve:
+            return curve_discount_factors(st.session_state.discount_curve, int(st.session_state.project_years))
+        return discount_factors_for(st.session_state.discount_rate, int(st.session_state.project_years))
     except Exception:
         return [1.0]
 
-def calculate_discounted_cashflow(cashflows, discount_factors):
-    """Calculate discounted cashflow"""
-    try:
-        return [cf / df if df != 0 else 0 for cf, df in zip(cashflows, discount_factors)]
-    except Exception:
-        return [0]
+def hurdle_rate():
+    """(rate %, name) IRR is judged against: the MARR, or the curve's average yearly rate over the duration"""
+    if st.session_state.discount_curve:
+        return average_rate(st.session_state.discount_curve, int(st.session_state.project_years)), "curve average"
+    return float(st.session_state.discount_rate), "MARR"
 
-def calculate_cumulative_cashflow(discounted_cashflows):
-    """Calculate cumulative cashflow"""
-    try:
-        cumulative = []
-        total = 0
-        for dcf in discounted_cashflows:
-            total += dcf
-            cumulative.append(total)
-        return cumulative
-    except Exception:
-        return [0]
+# Tornado and start-timing analyses of the yearly totals, cached across reruns and sessions
+run_sensitivity_analysis = profile_phase("sensitivity")(
+    st.cache_data(show_spinner=False, max_entries=256)(feasibility.run_sensitivity_analysis)
+)
+deferral_npvs = profile_phase("deferral")(
+    st.cache_data(show_spinner=False, max_entries=256)(feasibility.deferral_npvs)
+)
 
-def calculate_npv(discounted_cashflows):
-    """Calculate Net Present Value"""
-    try:
-        return sum(discounted_cashflows)
-    except Exception:
-        return 0
+def what_if_inputs():
+    """(capex, cash_in, cash_out, years, rate, tax_rate, deductions) for the what-if analyses, as hashable values"""
+    years = int(st.session_state.project_years)
+    cash_in, cash_out = operating_schedules()
+    taxes = tax_schedule()
+    return (
+        tuple(capex_yearly_schedule().tolist()),
+        tuple(cash_in.tolist()),
+        tuple(cash_out.tolist()),
+        years,
+        tuple(curve_rates(st.session_state.discount_curve, years).tolist())
+        if st.session_state.discount_curve else float(st.session_state.discount_rate),
+        float(st.session_state.tax_rate) if taxes is not None else None,
+        tuple((taxes[0] - taxes[1]).tolist()) if taxes is not None else None,
+    )
 
-def calculate_irr(cashflows):
-    """Calculate Internal Rate of Return"""
-    try:
-        from numpy_financial import irr
-        return irr(cashflows)
-    except:
-        # Fallback to manual calculation if numpy_financial not available
-        try:
-            return np.irr(cashflows)
-        except:
-            return 0.0
+def current_project():
+    """The session's project in the engine's format (items plus settings)"""
+    project = {key: st.session_state[key] for key in SECTION_KEYS}
+    project.update(
+        project_years=int(st.session_state.project_years),
+        discount_rate=float(st.session_state.discount_rate),
+        discount_curve=st.session_state.discount_curve,
+        opex_in_growth=float(st.session_state.opex_in_growth),
+        opex_out_growth=float(st.session_state.opex_out_growth),
+        after_tax=bool(st.session_state.after_tax),
+        tax_rate=float(st.session_state.tax_rate),
+        depreciation_method=st.session_state.depreciation_method,
+    )
+    return project
+
+# Lazily computed views are cached per session until the inputs change
+def results_key():
+    """Identifies the inputs every computed view depends on"""
+    return (
+        st.session_state.get('data_revision', 0),
+        int(st.session_state.project_years),
+        float(st.session_state.discount_rate),
+        st.session_state.discount_curve,
+        float(st.session_state.opex_in_growth),
+        float(st.session_state.opex_out_growth),
+        bool(st.session_state.after_tax),
+        float(st.session_state.tax_rate),
+        st.session_state.depreciation_method,
+    )
 
-def calculate_payback_period(cumulative_cashflows):
-    """Calculate Payback Period"""
-    try:
-        for i, cumulative in enumerate(cumulative_cashflows):
-            if cumulative >= 0:
-                if i == 0:
-                    return 0
-                # Linear interpolation for more accurate payback period
-                prev_cumulative = cumulative_cashflows[i-1]
-                curr_cumulative = cumulative
-                if curr_cumulative - prev_cumulative != 0:
-                    fraction = abs(prev_cumulative) / (curr_cumulative - prev_cumulative)
-                    return i - 1 + fraction
-        return st.session_state.project_years  # If never positive
-    except Exception:
-        return 0
+def cached_view_data(name, build, *inputs):
+    """Return the cached result of build() for the current inputs, rebuilding when they change.
+
+    inputs are the view's own values build() depends on; a change replaces the entry.
+    """
+    cache = st.session_state.setdefault('view_cache', {})
+    key = (results_key(), inputs)
+    entry = cache.get(name)
+    if entry is None or entry[0] != key:
+        entry = (key, build())
+        cache[name] = entry
+    return entry[1]
 
 # Excel export function with formatting
+@profile_phase("export_to_excel")
 def export_to_excel():
     """Export cash flow analysis to Excel with formatting"""
     try:
-        # Create workbook
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Cash Flow Analysis"
-
-        # Calculate all values
-        cashflows = calculate_net_cashflow()
-        discount_factors = calculate_discount_factor()
-        discounted_cashflows = calculate_discounted_cashflow(cashflows, discount_factors)
-        cumulative_cashflows = calculate_cumulative_cashflow(discounted_cashflows)
-
-        # Create headers
-        years_labels = ['Tahun 0'] + [f'Tahun {i+1}' for i in range(int(st.session_state.project_years))]
-        headers = ['Description', 'Total'] + years_labels
-
-        # Add title
-        ws.merge_cells('A1:' + chr(65 + len(headers) - 1) + '1')
-        title_cell = ws['A1']
-        title_cell.value = "CASH FLOW ANALYSIS (ARUS KAS)"
-        title_cell.font = Font(bold=True, size=16)
-        title_cell.alignment = Alignment(horizontal='center', vertical='center')
-        title_cell.fill = PatternFill(start_color="1f77b4", end_color="1f77b4", fill_type="solid")
-        title_cell.font = Font(bold=True, size=16, color="FFFFFF")
-
-        # Add project info
-        ws.merge_cells('A2:' + chr(65 + len(headers) - 1) + '2')
-        ws['A2'].value = f"Project Duration: {st.session_state.project_years} years | Discount Rate: {st.session_state.discount_rate}%"
-        ws['A2'].alignment = Alignment(horizontal='center')
-        ws['A2'].font = Font(size=10, color="666666")
-
-        # Add timestamp
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        ws.merge_cells('A3:' + chr(65 + len(headers) - 1) + '3')
-        ws['A3'].value = f"Generated: {timestamp}"
-        ws['A3'].alignment = Alignment(horizontal='center')
-        ws['A3'].font = Font(size=10, color="999999")
-
-        # Add headers
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=5, column=col, value=header)
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill(start_color="ecf0f1", end_color="ecf0f1", fill_type="solid")
-            cell.border = Border(
-                left=Side(style='thin'), right=Side(style='thin'),
-                top=Side(style='thin'), bottom=Side(style='thin')
-            )
+        return feasibility.export_to_excel(current_project())
+    except Exception as e:
+        st.error(f"Error exporting to Excel: {str(e)}")
+        return None
 
-        current_row = 6
-
-        # Function to add section with color
-        def add_section(title, data, color="FFFFFF"):
-            nonlocal current_row
-
-            # Add section title
-            ws.merge_cells(f'A{current_row}:{chr(65 + len(headers) - 1)}{current_row}')
-            title_cell = ws.cell(row=current_row, column=1, value=title)
-            title_cell.font = Font(bold=True, size=12)
-            title_cell.fill = PatternFill(start_color=color, end_color=color, fill_type="solid")
-            title_cell.alignment = Alignment(horizontal='center')
-            current_row += 1
-
-            # Add data rows
-            for row_data in data:
-                for col, value in enumerate(row_data, 1):
-                    cell = ws.cell(row=current_row, column=col, value=value)
-                    cell.border = Border(
-                        left=Side(style='thin'), right=Side(style='thin'),
-                        top=Side(style='thin'), bottom=Side(style='thin')
-                    )
-                    if isinstance(value, (int, float)) and value != '':
-                        cell.number_format = '#,##0'
-                current_row += 1
-
-            current_row += 1  # Add spacing
-
-        # CAPEX Section (Light Blue)
-        capex_data = []
-        capex_total = 0
-        for item in st.session_state.capex_items:
-            total = -calculate_total(item)
-            capex_total += total
-            row = [f"  {item['name']}", total]
-            for i, year in enumerate(years_labels):
-                if i == 0:
-                    row.append(total)
-                else:
-                    row.append('')
-            capex_data.append(row)
-
-        capex_data.append(['Total CAPEX', capex_total] + ([capex_total] + [''] * (len(years_labels) - 1)))
-        add_section('CAPITAL EXPENDITURE (CAPEX)', capex_data, "DDEBF7")
-
-        # OPEX Cash In Section (Light Green)
-        cashin_data = []
-        growth_in = st.session_state.opex_in_growth / 100.0
-        for item in st.session_state.opex_cash_in:
-            base_total = calculate_total(item)
-            row = [f"  {item['name']}", base_total]
-            for i, year in enumerate(years_labels):
-                if i == 0:
-                    row.append('')
-                else:
-                    # Apply growth: base × (1 + rate)^year
-                    year_total = base_total * ((1 + growth_in) ** i)
-                    row.append(year_total)
-            cashin_data.append(row)
-
-        base_yearly_revenue = calculate_yearly_opex_cash_in()
-        revenue_row = ['Total Revenue', '']
-        for i, year in enumerate(years_labels):
-            if i == 0:
-                revenue_row.append('')
-            else:
-                year_revenue = base_yearly_revenue * ((1 + growth_in) ** i)
-                revenue_row.append(year_revenue)
-        cashin_data.append(revenue_row)
-        add_section('OPERATIONAL REVENUE (OPEX - Cash In)', cashin_data, "D4E6C4")
-
-        # OPEX Cash Out Section (Light Red)
-        cashout_data = []
-        growth_out = st.session_state.opex_out_growth / 100.0
-        for item in st.session_state.opex_cash_out:
-            base_total = -calculate_total(item)
-            row = [f"  {item['name']}", base_total]
-            for i, year in enumerate(years_labels):
-                if i == 0:
-                    row.append('')
-                else:
-                    # Apply growth: base × (1 + rate)^year
-                    year_total = base_total * ((1 + growth_out) ** i)
-                    row.append(year_total)
-            cashout_data.append(row)
-
-        base_yearly_expenses = -calculate_yearly_opex_cash_out()
-        expenses_row = ['Total Expenses', '']
-        for i, year in enumerate(years_labels):
-            if i == 0:
-                expenses_row.append('')
-            else:
-                year_expenses = base_yearly_expenses * ((1 + growth_out) ** i)
-                expenses_row.append(year_expenses)
-        cashout_data.append(expenses_row)
-        add_section('OPERATIONAL EXPENSES (OPEX - Cash Out)', cashout_data, "F8D7DA")
-
-        # Financial Summary Section (Light Yellow)
-        summary_data = [
-            ['NET CASH FLOW', ''] + cashflows,
-            [f'DISCOUNT FACTOR (MARR {st.session_state.discount_rate}%)', ''] + discount_factors,
-            ['DISCOUNTED CASH FLOW', ''] + discounted_cashflows,
-            ['CUMULATIVE CASH FLOW', ''] + cumulative_cashflows,
-            ['NPV', calculate_npv(discounted_cashflows)] + [''] * len(years_labels),
-            ['IRR', f"{calculate_irr(cashflows)*100:.2f}%"] + [''] * len(years_labels),
-            ['Payback Period', f"{calculate_payback_period(cumulative_cashflows):.2f} years"] + [''] * len(years_labels)
-        ]
-        add_section('FINANCIAL SUMMARY', summary_data, "FFF2CC")
+# Grid editor helpers
+ITEM_FIELDS = ['name', 'volume', 'unit', 'price']
+# Schedule columns per section: purchase schedule for CAPEX (see feasibility.capex),
+# escalation for OPEX (see feasibility.escalation)
+SCHEDULE_COLUMNS = {
+    'capex_items': ['start_year', 'recur_every', 'useful_life', 'residual', 'asset_group', 'optional', 'enables'],
+    'opex_cash_in': ['growth', 'start_year', 'end_year', 'adjustments'],
+    'opex_cash_out': ['growth', 'start_year', 'end_year', 'adjustments'],
+}
+SCHEDULE_FIELDS = tuple(dict.fromkeys(ESCALATION_FIELDS + CAPEX_SCHEDULE_FIELDS + ('asset_group',) + OPTION_FIELDS))
+NUMERIC_SCHEDULE_FIELDS = ['growth', 'start_year', 'end_year', 'recur_every', 'useful_life', 'residual']
+
+def coerce_item_value(field, value, default=None):
+    """Convert a grid cell value to the type stored in session state"""
+    if field in ('volume', 'price'):
+        try:
+            return float(value)
+        except (ValueError, TypeError):
+            return float(default) if default is not None else 0.0
+    if value is None:
+        return default if default is not None else ''
+    return str(value)
+
+def items_to_dataframe(items):
+    """Build the grid DataFrame for a list of items (IDs kept in a hidden column)"""
+    df = pd.DataFrame({
+        'id': [item['id'] for item in items],
+        'name': [item.get('name', '') for item in items],
+        'volume': [item.get('volume', 0) for item in items],
+        'unit': [item.get('unit', '') for item in items],
+        'price': [item.get('price', 0) for item in items],
+    })
+    df['name'] = df['name'].fillna('').astype(str)
+    df['unit'] = df['unit'].fillna('').astype(str)
+    df['volume'] = pd.to_numeric(df['volume'], errors='coerce').fillna(0.0).astype(float)
+    df['price'] = pd.to_numeric(df['price'], errors='coerce').fillna(0.0).astype(float)
+    df['total'] = df['volume'] * df['price']
+    for field in NUMERIC_SCHEDULE_FIELDS:
+        df[field] = pd.to_numeric(pd.Series([item.get(field) for item in items], dtype=object), errors='coerce').astype(float)
+    df['adjustments'] = [format_adjustments(item) for item in items]
+    df['asset_group'] = [item.get('asset_group') or DEFAULT_ASSET_GROUP for item in items]
+    df['optional'] = [bool(item.get('optional')) for item in items]
+    df['enables'] = [format_enables(item) for item in items]
+    df['duplicate'] = False
+    return df
+
+def apply_schedule_edit(item, field, value):
+    """Set one schedule cell on an item (blank clears it); True if the item changed.
+
+    Raises ValueError for adjustments text that doesn't parse.
+    """
+    before = {key: item.get(key) for key in SCHEDULE_FIELDS}
+    if field == 'adjustments':
+        steps, overrides = parse_adjustments(value or '')
+        updates = {'steps': steps, 'overrides': overrides}
+    elif field == 'optional':
+        updates = {field: True if value is True else None}
+    elif field == 'enables':
+        updates = {field: parse_enables(value) or None}
+    elif value is None or value == '' or pd.isna(value):
+        updates = {field: None}
+    elif field == 'asset_group':
+        updates = {field: value if value != DEFAULT_ASSET_GROUP else None}
+    elif field in ('growth', 'residual'):
+        updates = {field: float(value)}
+    else:
+        updates = {field: max(0 if field == 'start_year' else 1, int(value))}
+
+    for key, new_value in updates.items():
+        if new_value in (None, {}):
+            item.pop(key, None)
+        else:
+            item[key] = new_value
+    return before != {key: item.get(key) for key in SCHEDULE_FIELDS}
+
+def apply_editor_changes(items_key, row_ids, editor_key):
+    """Apply only the rows changed in the grid editor to session state"""
+    import uuid
+
+    changes = st.session_state.get(editor_key)
+    if not changes:
+        return
+
+    items = st.session_state[items_key]
+    items_by_id = {item['id']: item for item in items}
+    changed = False
+    duplicate_ids = []
+
+    # Edited rows: {row position: {column: new value}}
+    for row, edits in changes.get('edited_rows', {}).items():
+        item = items_by_id.get(row_ids[int(row)])
+        if item is None:
+            continue
+        old_total = calculate_total(item)
+        old_item = copy.deepcopy(item)
+        for field, value in edits.items():
+            if field == 'duplicate':
+                if value:
+                    duplicate_ids.append(item['id'])
+                continue
+            if field in SCHEDULE_COLUMNS[items_key]:
+                try:
+                    changed |= apply_schedule_edit(item, field, value)
+                except ValueError as e:
+                    set_notice(items_key, "error", f"❌ {item.get('name', 'Item')}: {e}")
+                    changed = True  # Restart the grid from the stored value
+                continue
+            if field not in ITEM_FIELDS:
+                continue
+            new_value = coerce_item_value(field, value, item.get(field))
+            if item.get(field) != new_value:
+                item[field] = new_value
+                changed = True
+        adjust_section_total(items_key, calculate_total(item) - old_total)
+        adjust_item_flows(items_key, old_item, item)
+
+    # Duplicated rows are inserted right after their source
+    for item_id in duplicate_ids:
+        idx = next(i for i, item in enumerate(items) if item['id'] == item_id)
+        duplicated_item = {"id": str(uuid.uuid4())}
+        duplicated_item.update({field: items[idx].get(field) for field in ITEM_FIELDS})
+        duplicated_item.update({field: copy.deepcopy(items[idx][field]) for field in SCHEDULE_FIELDS if field in items[idx]})
+        items.insert(idx + 1, duplicated_item)
+        adjust_section_total(items_key, calculate_total(duplicated_item))
+        adjust_item_flows(items_key, None, duplicated_item)
+        changed = True
+
+    # Deleted rows: [row position]
+    deleted_ids = {row_ids[int(row)] for row in changes.get('deleted_rows', [])}
+    if deleted_ids:
+        adjust_section_total(items_key, -sum(calculate_total(items_by_id[i]) for i in deleted_ids if i in items_by_id))
+        for item_id in deleted_ids & items_by_id.keys():
+            adjust_item_flows(items_key, items_by_id[item_id], None)
+        st.session_state[items_key] = items = [item for item in items if item['id'] not in deleted_ids]
+        changed = True
+
+    # Added rows: [{column: value}]
+    for row in changes.get('added_rows', []):
+        new_item = {"id": str(uuid.uuid4())}
+        new_item['name'] = coerce_item_value('name', row.get('name'))
+        new_item['volume'] = coerce_item_value('volume', row.get('volume'), 1.0)
+        new_item['unit'] = coerce_item_value('unit', row.get('unit'))
+        new_item['price'] = coerce_item_value('price', row.get('price'))
+        items.append(new_item)
+        adjust_section_total(items_key, calculate_total(new_item))
+        adjust_item_flows(items_key, None, new_item)
+        changed = True
+
+    if changed:
+        version_key = f"{items_key}_editor_version"
+        st.session_state[version_key] = st.session_state.get(version_key, 0) + 1
+        auto_save()
+        st.rerun(item_fragment_keys(items_key))
+
+SORT_OPTIONS = ["Original order", "Total (highest first)", "Total (lowest first)"]
+PAGE_SIZES = [25, 50, 100, 250]
+
+def get_items_frame(items_key):
+    """Columnar copy of a section's items, rebuilt only when the data changes"""
+    frames = st.session_state.setdefault('items_frames', {})
+    revision = st.session_state.get('data_revision', 0)
+    cached = frames.get(items_key)
 
-        # Adjust column widths
-        for col in range(1, len(headers) + 1):
-            if col == 1:  # Description column
-                ws.column_dimensions[chr(64 + col)].width = 40
-            else:
-                ws.column_dimensions[chr(64 + col)].width = 15
+    if cached is None or cached[0] != revision:
+        # Ensure every item has an ID (for backward compatibility with old data)
+        for item in st.session_state[items_key]:
+            if 'id' not in item:
+                import uuid
+                item['id'] = str(uuid.uuid4())
 
-        # Save to bytes
-        excel_file = io.BytesIO()
-        wb.save(excel_file)
-        excel_file.seek(0)
+        df = items_to_dataframe(st.session_state[items_key])
+        df['search'] = (df['name'] + ' ' + df['unit']).str.lower()
+        cached = (revision, df)
+        frames[items_key] = cached
+
+    return cached[1]
+
+# Fragment-scoped refresh: item edits only rerun the views that depend on them
+def item_fragment_keys(items_key):
+    """Fragments that must refresh when a section's items change"""
+    return [f"editor_{items_key}", "quick_summary", "live_results"]
+
+def set_notice(items_key, level, message):
+    """Queue a message to show at the top of a section on its next render"""
+    st.session_state[f"{items_key}_notice"] = (level, message)
+
+def show_notice(items_key):
+    """Show (and clear) a queued section message"""
+    notice = st.session_state.pop(f"{items_key}_notice", None)
+    if notice:
+        level, message = notice
+        getattr(st, level)(message)
+
+# Bulk import: delimiter sniffing, locale-aware numbers and a per-row report
+BULK_COLUMNS = ['name', 'volume', 'unit', 'price']
+BULK_CHUNK_ROWS = 50000
+
+def sniff_delimiter(sample_lines):
+    """Pick the delimiter used consistently (at least 3 times) on every sample line"""
+    lines = [line for line in sample_lines if line.strip()]
+    if not lines:
+        return '\t'
+    for delimiter in ['\t', ';', '|', ',']:
+        if all(line.count(delimiter) >= 3 for line in lines):
+            return delimiter
+    # Fall back to the most common candidate
+    return max(['\t', ';', '|', ','], key=lambda d: sum(line.count(d) for line in lines))
+
+def parse_locale_numbers(values):
+    """Parse numbers written as 1.500,50 (Indonesian), 1,500.50 or 1500.50 (vectorized).
+
+    A single separator followed by exactly three-digit groups is read as a
+    thousands separator (1.500 / 1,500 = 1500); otherwise it is the decimal
+    point (1,5 / 1.5 = 1.5). With both separators, the last one is decimal.
+    """
+    s = values.fillna('').astype(str).str.replace(r'(?i)rp\.?|\s', '', regex=True)
+    last_dot = s.str.rfind('.')
+    last_comma = s.str.rfind(',')
+    has_dot = last_dot >= 0
+    has_comma = last_comma >= 0
+
+    no_dots = s.str.replace('.', '', regex=False)
+    no_commas = s.str.replace(',', '', regex=False)
+
+    normalized = np.select(
+        [
+            has_dot & has_comma & (last_comma > last_dot),           # 1.500,50
+            has_dot & has_comma,                                     # 1,500.50
+            has_dot & s.str.fullmatch(r'-?\d{1,3}(\.\d{3})+'),       # 1.500.000
+            has_comma & s.str.fullmatch(r'-?\d{1,3}(,\d{3})+'),       # 1,500,000
+            has_comma,                                               # 1500,5
+        ],
+        [
+            no_dots.str.replace(',', '.', regex=False),
+            no_commas,
+            no_dots,
+            no_commas,
+            s.str.replace(',', '.', regex=False),
+        ],
+        default=s
+    )
+    return pd.to_numeric(pd.Series(normalized, index=values.index), errors='coerce')
+
+def parse_bulk_items(text):
+    """Parse pasted/uploaded rows (Name | Qty | Unit | Price).
+
+    Returns (items_df, report_df): items_df holds the valid rows, report_df
+    has one line per non-empty input row with its status and error reasons.
+    """
+    lines = text.splitlines()
+    delimiter = sniff_delimiter(lines[:50])
+    n_fields = max(4, max((line.count(delimiter) for line in lines), default=0) + 1)
+
+    reader = pd.read_csv(
+        io.StringIO(text), sep=delimiter, header=None, names=list(range(n_fields)),
+        dtype=str, keep_default_na=False, skip_blank_lines=False, quotechar='"',
+        skipinitialspace=True, engine='c', chunksize=BULK_CHUNK_ROWS
+    )
 
-        return excel_file
+    item_chunks, report_chunks = [], []
+    for chunk in reader:
+        chunk = chunk.apply(lambda col: col.str.strip())
+        chunk.index = chunk.index + 1  # 1-based row numbers as pasted
+        chunk = chunk[(chunk != '').any(axis=1)]  # Skip empty lines
+        if chunk.empty:
+            continue
+
+        rows = pd.DataFrame({
+            'name': chunk[0],
+            'volume': parse_locale_numbers(chunk[1]),
+            'unit': chunk[2],
+            'price': parse_locale_numbers(chunk[3]),
+        })
+
+        # Header row (e.g. "Name | Qty | Unit | Price") is skipped, not reported
+        if chunk.index[0] == 1 and pd.isna(rows['volume'].iloc[0]) and pd.isna(rows['price'].iloc[0]):
+            rows, chunk = rows.iloc[1:], chunk.iloc[1:]
+
+        field_count = (chunk != '').iloc[:, ::-1].cummax(axis=1).sum(axis=1)
+        checks = [
+            (field_count < 4, "missing columns (expected Name | Qty | Unit | Price)"),
+            ((field_count > 4) & (delimiter == ','), "too many columns (quote values that contain commas)"),
+            (rows['name'] == '', "empty name"),
+            ((field_count >= 4) & rows['volume'].isna(), "quantity is not a number"),
+            (rows['volume'] <= 0, "quantity must be greater than 0"),
+            ((field_count >= 4) & rows['price'].isna(), "price is not a number"),
+            (rows['price'] <= 0, "price must be greater than 0"),
+        ]
+        errors = pd.Series('', index=rows.index)
+        for mask, message in checks:
+            errors = errors.where(~mask, errors + message + '; ')
+        errors = errors.str.rstrip('; ')
+        valid = errors == ''
+
+        item_chunks.append(rows[valid])
+        report_chunks.append(pd.DataFrame({
+            'Row': rows.index,
+            'Name': rows['name'],
+            'Status': np.where(valid, '✅ Imported', '❌ Skipped'),
+            'Error': errors,
+        }))
+
+    items_df = pd.concat(item_chunks) if item_chunks else pd.DataFrame(columns=BULK_COLUMNS)
+    report_df = pd.concat(report_chunks, ignore_index=True) if report_chunks else pd.DataFrame(columns=['Row', 'Name', 'Status', 'Error'])
+    return items_df, report_df
+
+def import_bulk_rows(items_key):
+    """Import pasted or uploaded rows into a section (button callback)"""
+    bulk_paste = st.session_state.get(f"bulk_{items_key}", "")
+    uploaded = st.session_state.get(f"bulk_file_{items_key}")
+    if uploaded is not None:
+        bulk_paste = uploaded.getvalue().decode('utf-8-sig', errors='replace')
+
+    st.session_state.pop(f"{items_key}_import_report", None)
+    if not bulk_paste.strip():
+        set_notice(items_key, "warning", "⚠️ Please paste some data first")
+        return
+
+    try:
+        import uuid
+        items_df, report_df = parse_bulk_items(bulk_paste)
+        st.session_state[f"{items_key}_import_report"] = report_df
+        failed_count = int((report_df['Status'] != '✅ Imported').sum())
+
+        if len(items_df) > 0:
+            new_items = items_df[BULK_COLUMNS].to_dict('records')
+            for item in new_items:
+                item['id'] = str(uuid.uuid4())
+            st.session_state[items_key].extend(
+                {"id": item['id'], "name": item['name'], "volume": float(item['volume']),
+                 "unit": item['unit'], "price": float(item['price'])}
+                for item in new_items
+            )
+            adjust_section_total(items_key, float((items_df['volume'] * items_df['price']).sum()))
+            for item in st.session_state[items_key][-len(new_items):]:
+                adjust_item_flows(items_key, None, item)
+            auto_save()
+            message = f"✅ Added {len(new_items)} items successfully!"
+            if failed_count:
+                message += f" {failed_count} rows were skipped (see the import report)."
+            set_notice(items_key, "success", message)
+            st.rerun(item_fragment_keys(items_key))
+        else:
+            set_notice(items_key, "error", "❌ No valid rows found. Please check format: Name | Qty | Unit | Price")
     except Exception as e:
-        st.error(f"Error exporting to Excel: {str(e)}")
-        return None
+        set_notice(items_key, "error", f"❌ Error importing: {str(e)}")
+
+def add_new_item(items_key):
+    """Add the item from the 'Add New Item' form (button callback)"""
+    new_name = st.session_state.get(f"new_{items_key}_name", "")
+    new_volume = st.session_state.get(f"new_{items_key}_volume", 0.0)
+    new_unit = st.session_state.get(f"new_{items_key}_unit", "")
+    new_price = st.session_state.get(f"new_{items_key}_price", 0.0)
+
+    if new_name and new_volume > 0 and new_price > 0:
+        import uuid
+        st.session_state[items_key].append({
+            "id": str(uuid.uuid4()),
+            "name": new_name,
+            "volume": new_volume,
+            "unit": new_unit,
+            "price": new_price
+        })
+        adjust_section_total(items_key, new_volume * new_price)
+        adjust_item_flows(items_key, None, st.session_state[items_key][-1])
+        auto_save()
+        set_notice(items_key, "success", f"✅ Added: {new_name}")
+        st.rerun(item_fragment_keys(items_key))
+    else:
+        set_notice(items_key, "error", "❌ Please fill all required fields")
+
+def build_excel_bytes():
+    """Excel export as bytes (None if the export failed)"""
+    excel_file = export_to_excel()
+    return excel_file.getvalue() if excel_file else None
 
 # Enhanced input component with auto-save
 def editable_data_editor(section_title, items_key, color="primary", unit_placeholder="unit"):
@@ -527,177 +1010,151 @@ def editable_data_editor(section_title, items_key, color="primary", unit_placeho
     # Use the provided section title
     st.markdown(f"### {section_title}")
 
+    show_notice(items_key)
+
     # Bulk paste feature
     with st.expander("📋 Bulk Add from Clipboard", expanded=False):
         st.markdown("**Paste data from Excel/Google Sheets** (columns: Name | Qty | Unit | Price)")
-        bulk_paste = st.text_area("Paste rows here (tab-separated)", key=f"bulk_{item_key}", height=150,
-                                   help="Copy rows from Excel/Sheets and paste here. Format: Name [Tab] Qty [Tab] Unit [Tab] Price")
-
-        if st.button("📥 Import All Rows", key=f"bulk_add_{item_key}", type="primary"):
-            if bulk_paste.strip():
-                try:
-                    lines = bulk_paste.strip().split('\n')
-                    added_count = 0
-                    import uuid
-
-                    for line in lines:
-                        # Skip empty lines
-                        if not line.strip():
-                            continue
-
-                        # Try tab-separated first, then comma-separated
-                        if '\t' in line:
-                            parts = line.split('\t')
-                        else:
-                            parts = [p.strip() for p in line.split(',')]
-
-                        if len(parts) >= 4:
-                            try:
-                                name = parts[0].strip()
-                                volume = float(parts[1].strip())
-                                unit = parts[2].strip()
-                                # Remove any currency symbols and commas from price
-                                price_str = parts[3].strip().replace('Rp', '').replace(',', '').replace('.', '')
-                                price = float(price_str)
-
-                                if name and volume > 0 and price > 0:
-                                    st.session_state[items_key].append({
-                                        "id": str(uuid.uuid4()),
-                                        "name": name,
-                                        "volume": volume,
-                                        "unit": unit,
-                                        "price": price
-                                    })
-                                    added_count += 1
-                            except (ValueError, IndexError):
-                                continue  # Skip invalid rows
-
-                    if added_count > 0:
-                        auto_save()
-                        st.success(f"✅ Added {added_count} items successfully!")
-                        st.rerun()
-                    else:
-                        st.error("❌ No valid rows found. Please check format: Name | Qty | Unit | Price")
-                except Exception as e:
-                    st.error(f"❌ Error importing: {str(e)}")
-            else:
-                st.warning("⚠️ Please paste some data first")
+        st.text_area("Paste rows here (tab-separated)", key=f"bulk_{item_key}", height=150,
+                     help="Copy rows from Excel/Sheets and paste here. Format: Name [Tab] Qty [Tab] Unit [Tab] Price. "
+                          "Tab, semicolon, pipe and comma delimiters are detected; prices like 1.500.000, 1.500,50 or 1500.50 are all understood.")
+        st.file_uploader("...or upload a CSV/TSV file", type=['csv', 'tsv', 'txt'], key=f"bulk_file_{item_key}")
+        st.button("📥 Import All Rows", key=f"bulk_add_{item_key}", type="primary",
+                  on_click=import_bulk_rows, args=(items_key,))
+
+        report_df = st.session_state.get(f"{item_key}_import_report")
+        if report_df is not None and len(report_df):
+            failed = report_df[report_df['Status'] != '✅ Imported']
+            st.caption(f"Import report: {len(report_df) - len(failed)} imported, {len(failed)} skipped")
+            if len(failed):
+                st.dataframe(failed, use_container_width=True, hide_index=True, height=min(400, 40 + 35 * len(failed)))
 
     # Add new item form
     with st.expander("➕ Add New Item", expanded=False):
         col1, col2, col3, col4, col5 = st.columns([3, 1, 2, 2, 1])
 
         with col1:
-            new_name = st.text_input("Item Name", key=f"new_{item_key}_name")
+            st.text_input("Item Name", key=f"new_{item_key}_name")
         with col2:
-            new_volume = st.number_input("Qty", min_value=0.0, value=1.0, key=f"new_{item_key}_volume")
+            st.number_input("Qty", min_value=0.0, value=1.0, key=f"new_{item_key}_volume")
         with col3:
-            new_unit = st.text_input("Unit", value=unit_placeholder, key=f"new_{item_key}_unit")
+            st.text_input("Unit", value=unit_placeholder, key=f"new_{item_key}_unit")
         with col4:
-            new_price = st.number_input("Price", min_value=0.0, value=0.0, step=10000.0, key=f"new_{item_key}_price")
+            st.number_input("Price", min_value=0.0, value=0.0, step=10000.0, key=f"new_{item_key}_price")
         with col5:
-            if st.button("Add", key=f"add_{item_key}", type="primary"):
-                if new_name and new_volume > 0 and new_price > 0:
-                    import uuid
-                    st.session_state[items_key].append({
-                        "id": str(uuid.uuid4()),
-                        "name": new_name,
-                        "volume": new_volume,
-                        "unit": new_unit,
-                        "price": new_price
-                    })
-                    auto_save()
-                    st.success(f"✅ Added: {new_name}")
-                    st.rerun()
-                else:
-                    st.error("❌ Please fill all required fields")
+            st.button("Add", key=f"add_{item_key}", type="primary", on_click=add_new_item, args=(items_key,))
 
-    # Display and edit existing items
-    if st.session_state[items_key]:  # Check session state directly
-        # Show title first (total will be calculated after widgets render)
-        st.markdown(f'<div class="section-title">Current Items</div>', unsafe_allow_html=True)
+    # Display and edit existing items in a single grid
+    st.markdown(f'<div class="section-title">Current Items</div>', unsafe_allow_html=True)
 
-        # Track live total as we render items
-        live_total = 0.0
+    if not st.session_state[items_key]:
+        st.info("No items added yet. Click 'Add New Item' or add a row to the grid below.")
 
-        # Loop through items - enumerate to get both index and item
-        for idx, item in enumerate(st.session_state[items_key]):
-            # Ensure item has an ID (for backward compatibility with old data)
-            if 'id' not in item:
-                import uuid
-                item['id'] = str(uuid.uuid4())
+    items_df = get_items_frame(items_key)
 
-            item_id = item['id']  # Use item ID for widget keys!
-
-            with st.container():
-                col1, col2, col3, col4, col5, col6 = st.columns([3, 1, 1.5, 2, 2, 1.5])
-
-                with col1:
-                    name = st.text_input("Name", value=item.get('name', ''), key=f"{item_key}_name_{item_id}", label_visibility="collapsed")
-
-                with col2:
-                    volume = st.number_input("Qty", value=float(item.get('volume', 0)), min_value=0.0, key=f"{item_key}_vol_{item_id}", label_visibility="collapsed")
-
-                with col3:
-                    unit = st.text_input("Unit", value=item.get('unit', ''), key=f"{item_key}_unit_{item_id}", label_visibility="collapsed")
-
-                with col4:
-                    price = st.number_input("Price", value=float(item.get('price', 0)), min_value=0.0, step=10000.0, key=f"{item_key}_price_{item_id}", label_visibility="collapsed")
-
-                with col5:
-                    # Recalculate total from current widget values
-                    current_total = float(volume) * float(price)
-                    live_total += current_total  # Add to running total
-                    st.markdown(f'<div style="text-align: right; font-weight: bold; padding-top: 8px;">Rp {current_total:,.0f}</div>', unsafe_allow_html=True)
-
-                with col6:
-                    btn_col1, btn_col2 = st.columns(2)
-                    with btn_col1:
-                        if st.button("📋", key=f"dup_{item_key}_{item_id}", help="Duplicate item"):
-                            import uuid
-                            # Create a copy with new ID
-                            duplicated_item = {
-                                "id": str(uuid.uuid4()),
-                                "name": name,
-                                "volume": volume,
-                                "unit": unit,
-                                "price": price
-                            }
-                            st.session_state[items_key].insert(idx + 1, duplicated_item)
-                            auto_save()
-                            st.rerun()
-                    with btn_col2:
-                        if st.button("🗑️", key=f"del_{item_key}_{item_id}", help="Delete item"):
-                            # Delete by finding the item with this ID
-                            st.session_state[items_key] = [i for i in st.session_state[items_key] if i.get('id') != item_id]
-                            auto_save()
-                            st.rerun()
-
-            # Update session state ONLY if values changed (prevents unintended overwrites)
-            changed = False
-            if st.session_state[items_key][idx]['name'] != name:
-                st.session_state[items_key][idx]['name'] = name
-                changed = True
-            if st.session_state[items_key][idx]['volume'] != volume:
-                st.session_state[items_key][idx]['volume'] = volume
-                changed = True
-            if st.session_state[items_key][idx]['unit'] != unit:
-                st.session_state[items_key][idx]['unit'] = unit
-                changed = True
-            if st.session_state[items_key][idx]['price'] != price:
-                st.session_state[items_key][idx]['price'] = price
-                changed = True
+    # Search / sort / page controls (filtering runs server-side on the columnar copy)
+    col1, col2, col3 = st.columns([3, 2, 1])
+    with col1:
+        search = st.text_input("Search", key=f"{item_key}_search", placeholder="Search by name or unit", label_visibility="collapsed")
+    with col2:
+        sort_order = st.selectbox("Sort", SORT_OPTIONS, key=f"{item_key}_sort", label_visibility="collapsed")
+    with col3:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, index=1, key=f"{item_key}_page_size", label_visibility="collapsed")
+
+    view_df = items_df
+    query = search.strip().lower()
+    if query:
+        view_df = view_df[view_df['search'].str.contains(query, regex=False)]
+    if sort_order == "Total (highest first)":
+        view_df = view_df.sort_values('total', ascending=False, kind='stable')
+    elif sort_order == "Total (lowest first)":
+        view_df = view_df.sort_values('total', ascending=True, kind='stable')
+
+    page_count = max(1, -(-len(view_df) // page_size))
+    page = 1
+    if page_count > 1:
+        page = int(st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1, step=1, key=f"{item_key}_page"))
+    start = (page - 1) * page_size
+    editor_df = view_df.iloc[start:start + page_size].drop(columns=['search']).reset_index(drop=True)
+    row_ids = editor_df['id'].tolist()
+
+    if query or page_count > 1:
+        st.caption(f"Showing {start + 1 if len(view_df) else 0}–{start + len(editor_df)} of {len(view_df)} items"
+                   + (f" (filtered from {len(items_df)})" if query else ""))
+
+    # The version is bumped after every applied change so the grid restarts
+    # from the updated items instead of replaying old edits
+    editor_key = f"{item_key}_editor_{st.session_state.get(f'{item_key}_editor_version', 0)}_{query}_{sort_order}_{page_size}_{page}"
+
+    st.data_editor(
+        editor_df,
+        key=editor_key,
+        num_rows="dynamic",
+        hide_index=True,
+        use_container_width=True,
+        column_order=['name', 'volume', 'unit', 'price', 'total'] + SCHEDULE_COLUMNS[items_key] + ['duplicate'],
+        column_config={
+            'name': st.column_config.TextColumn("Name", required=True, width="large"),
+            'volume': st.column_config.NumberColumn("Qty", min_value=0.0, default=1.0, required=True),
+            'unit': st.column_config.TextColumn("Unit", default=unit_placeholder),
+            'price': st.column_config.NumberColumn("Price", min_value=0.0, step=10000.0, default=0.0, required=True, format="localized"),
+            'total': st.column_config.NumberColumn("Total", format="localized"),
+            'growth': st.column_config.NumberColumn("Growth %/yr", help="Yearly growth for this item (blank: the sidebar rate)", format="%.2f"),
+            'asset_group': st.column_config.SelectboxColumn("Tax Group", help="Fiscal asset group for depreciation in the after-tax analysis", options=list(ASSET_GROUPS), default=DEFAULT_ASSET_GROUP, format_func=lambda group: ASSET_GROUPS[group][0]),
+            'start_year': (
+                st.column_config.NumberColumn("Year", help="Year it is bought (blank: year 0)", min_value=0, step=1, format="%d")
+                if items_key == 'capex_items' else
+                st.column_config.NumberColumn("From Year", help="First year of this item (blank: year 1)", min_value=1, step=1, format="%d")
+            ),
+            'end_year': st.column_config.NumberColumn("To Year", help="Last year of this item (blank: the last project year)", min_value=1, step=1, format="%d"),
+            'recur_every': st.column_config.NumberColumn("Every (yrs)", help="Buy it again every N years (blank: once)", min_value=1, step=1, format="%d"),
+            'useful_life': st.column_config.NumberColumn("Life (yrs)", help="Years each purchase lasts (blank: the replacement cycle)", min_value=1, step=1, format="%d"),
+            'residual': st.column_config.NumberColumn("Residual %", help="Value left at the end of its life, in % of cost; unused life is returned at book value when the project ends", min_value=0.0, max_value=100.0, format="%.1f"),
+            'optional': st.column_config.CheckboxColumn("Optional", help="Let the Optional CAPEX analysis (Financial Metrics tab) decide whether to buy it", default=False),
+            'enables': st.column_config.TextColumn("Enables", help="Names of the revenue/expense items that exist only when this optional item is bought; separate with ';'"),
+            'adjustments': st.column_config.TextColumn("Adjustments", help="'3:+10%' changes the level by 10% from year 3 on, '5=25000000' sets year 5's amount; separate with commas"),
+            'duplicate': st.column_config.CheckboxColumn("📋", help="Duplicate item", default=False),
+        },
+        disabled=['total'],
+        on_change=apply_editor_changes,
+        args=(items_key, row_ids, editor_key)
+    )
 
-            # Only auto-save if something actually changed
-            if changed:
-                auto_save()
+    st.markdown(f'<div style="text-align: right; font-size: 1.2em; font-weight: bold; padding: 10px; background-color: #f0f2f6; border-radius: 5px;">TOTAL: Rp {section_total(items_key):,.0f}</div>', unsafe_allow_html=True)
 
-        # Display the live total after all items rendered
-        st.markdown("---")
-        st.markdown(f'<div style="text-align: right; font-size: 1.2em; font-weight: bold; padding: 10px; background-color: #f0f2f6; border-radius: 5px;">TOTAL: Rp {live_total:,.0f}</div>', unsafe_allow_html=True)
+start_profile()
+with profile_phase("init_session_state"):
+    init_session_state()
 
-    else:
-        st.info("No items added yet. Click 'Add New Item' to start.")
+# Views that rerun on their own (see item_fragment_keys)
+@st.fragment(key="quick_summary")
+@profiled_fragment("quick_summary")
+def quick_summary():
+    st.subheader("📊 Quick Summary")
+
+    capex_total = calculate_capex_total()
+    yearly_revenue = calculate_yearly_opex_cash_in()
+    yearly_expenses = calculate_yearly_opex_cash_out()
+
+    st.metric("CAPEX", f"Rp {capex_total:,.0f}")
+    st.metric("Annual Revenue", f"Rp {yearly_revenue:,.0f}")
+    st.metric("Annual Expenses", f"Rp {yearly_expenses:,.0f}")
+    st.metric("Net Cash Flow/Year", f"Rp {yearly_revenue - yearly_expenses:,.0f}")
+
+@st.fragment(key="live_results")
+@profiled_fragment("live_results")
+def live_results():
+    flows = project_flows()
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("NPV", f"Rp {flows.npv:,.0f}")
+    col2.metric("IRR", f"{calculate_irr(flows.cashflows)*100:.2f}%")
+    col3.metric("Payback Period", f"{flows.payback_period:.2f} years")
+
+def item_section(section_title, items_key, color="primary", unit_placeholder="unit"):
+    """Render a section editor as its own fragment so edits don't rerun the whole app"""
+    body = profiled_fragment(f"editor_{items_key}")(editable_data_editor)
+    st.fragment(body, key=f"editor_{items_key}")(section_title, items_key, color, unit_placeholder)
 
 # Main App
 st.markdown('<div class="main-header">📊 Feasibility Analysis Tool</div>', unsafe_allow_html=True)
@@ -709,7 +1166,7 @@ st.markdown(f'<div style="text-align: right; color: #666; font-size: 0.8rem;">
 st.markdown("---")
 
 # Enhanced Sidebar Configuration
-with st.sidebar:
+with st.sidebar, profile_phase("sidebar"):
     st.header("⚙️ Project Configuration")
 
     st.subheader("General Settings")
@@ -744,12 +1201,55 @@ with st.sidebar:
         auto_save()
         st.rerun()
 
+    # Discount curve: a rate per year instead of the single MARR
+    with st.expander("📉 Discount Curve", expanded=bool(st.session_state.discount_curve)):
+        use_curve = st.toggle(
+            "Use a rate curve",
+            value=bool(st.session_state.discount_curve),
+            key="use_discount_curve",
+            help="Discount each year at its own rate; rates between the points are interpolated"
+        )
+        new_curve = None
+        if use_curve:
+            points = st.session_state.discount_curve or ((1, float(st.session_state.discount_rate)),)
+            edited_points = st.data_editor(
+                pd.DataFrame(points, columns=['year', 'rate']),
+                key=f"discount_curve_editor_{st.session_state.get('discount_curve_version', 0)}",
+                num_rows="dynamic",
+                hide_index=True,
+                use_container_width=True,
+                column_config={
+                    'year': st.column_config.NumberColumn("Year", min_value=1, step=1, format="%d", required=True),
+                    'rate': st.column_config.NumberColumn("Rate (%)", min_value=-99.0, max_value=100.0, format="%.2f", required=True),
+                },
+            )
+            curve_file = st.file_uploader("Load curve from CSV (year, rate)", type=['csv', 'txt'], key="discount_curve_file")
+            try:
+                new_curve = curve_points(edited_points.dropna().itertuples(index=False))
+                if curve_file is not None and st.session_state.get('discount_curve_file_id') != curve_file.file_id:
+                    new_curve = parse_curve_csv(curve_file.getvalue().decode('utf-8-sig'))
+                    st.session_state.discount_curve_file_id = curve_file.file_id
+            except ValueError as e:
+                st.error(f"❌ {e}")
+                new_curve = st.session_state.discount_curve
+
+            if new_curve:
+                rates = curve_rates(new_curve, int(st.session_state.project_years))
+                st.caption(f"Year 1: {rates[0]:.2f}% → Year {len(rates)}: {rates[-1]:.2f}%")
+
+        if new_curve != st.session_state.discount_curve:
+            # A new editor key so the grid restarts from the applied curve
+            st.session_state.discount_curve = new_curve
+            st.session_state.discount_curve_version = st.session_state.get('discount_curve_version', 0) + 1
+            auto_save()
+            st.rerun()
+
     st.markdown("---")
 
     # Growth rates for analysis display only
     st.subheader("📈 Yearly Growth Rates")
     st.markdown("**For analysis display only** (doesn't change input data)")
-    st.info("💡 These growth rates use compound interest formula: Amount = Base × (1 + rate)^(year-1)")
+    st.info("💡 These growth rates use compound interest formula: Amount = Base × (1 + rate)^(year-1). Items with their own Growth %/yr in the grid use that rate instead.")
 
     col1, col2 = st.columns(2)
 
@@ -804,6 +1304,36 @@ with st.sidebar:
 
     st.markdown("---")
 
+    # Income tax for analysis display only
+    st.subheader("🧾 Income Tax")
+
+    st.session_state.after_tax = st.toggle(
+        "After-tax analysis",
+        value=bool(st.session_state.after_tax),
+        key="after_tax_input",
+        help="Deduct corporate income tax (with the depreciation tax shield) from the net cash flow"
+    )
+    if st.session_state.after_tax:
+        st.session_state.tax_rate = st.number_input(
+            "Tax Rate (%)",
+            min_value=0.0,
+            max_value=100.0,
+            value=float(st.session_state.tax_rate),
+            step=0.5,
+            key="tax_rate_input",
+            help="PPh Badan is 22%"
+        )
+        st.session_state.depreciation_method = st.selectbox(
+            "Depreciation Method",
+            DEPRECIATION_METHODS,
+            index=DEPRECIATION_METHODS.index(st.session_state.depreciation_method),
+            format_func=lambda method: method.replace('_', ' ').capitalize(),
+            key="depreciation_method_input",
+            help="Fiscal depreciation per CAPEX item by its Tax Group (buildings are always straight line)"
+        )
+
+    st.markdown("---")
+
     # Export/Import Data
     st.subheader("💾 Data Management")
 
@@ -822,6 +1352,25 @@ with st.sidebar:
 
     st.markdown("---")
 
+    # New Project
+    st.markdown("**Start a New Project:**")
+    templates = template_names()
+    template_id = st.selectbox(
+        "Template",
+        options=list(templates),
+        format_func=templates.get,
+        key="new_project_template",
+        label_visibility="collapsed",
+        help="Example projects in feasibility/templates/"
+    )
+    if st.button("📄 New Project from Template", help="Replace the current data with the selected template", use_container_width=True):
+        start_from_template(template_id)
+        rebuild_section_totals()
+        auto_save()
+        st.rerun()
+
+    st.markdown("---")
+
     # Load Project
     st.markdown("**Load Previous Work:**")
     uploaded_file = st.file_uploader("Choose JSON file", type=['json'], label_visibility="collapsed", key="project_upload")
@@ -833,6 +1382,9 @@ with st.sidebar:
             st.session_state.opex_cash_out = loaded_data.get('opex_cash_out', [])
             st.session_state.project_years = int(loaded_data.get('project_years', 5))
             st.session_state.discount_rate = float(loaded_data.get('discount_rate', 12.0))
+            st.session_state.discount_curve = discount_curve_setting(loaded_data)
+            reset_setting_inputs()
+            rebuild_section_totals()
             auto_save()
             st.success("✅ Project loaded successfully!")
             st.rerun()
@@ -859,233 +1411,137 @@ with st.sidebar:
     # Reset
     if st.button("🔄 Reset to Default", help="Reset all data to example values", use_container_width=True):
         # Reset all data
-        st.session_state.capex_items = []
-        st.session_state.opex_cash_in = []
-        st.session_state.opex_cash_out = []
-        init_session_state()
+        start_from_template(DEFAULT_TEMPLATE)
+        rebuild_section_totals()
         auto_save()
         st.success("✅ Reset to default values")
         st.rerun()
 
     # Add project summary
     st.markdown("---")
-    st.subheader("📊 Quick Summary")
-
-    capex_total = calculate_capex_total()
-    yearly_revenue = calculate_yearly_opex_cash_in()
-    yearly_expenses = calculate_yearly_opex_cash_out()
-
-    st.metric("CAPEX", f"Rp {capex_total:,.0f}")
-    st.metric("Annual Revenue", f"Rp {yearly_revenue:,.0f}")
-    st.metric("Annual Expenses", f"Rp {yearly_expenses:,.0f}")
-    st.metric("Net Cash Flow/Year", f"Rp {yearly_revenue - yearly_expenses:,.0f}")
+    quick_summary()
 
 # Main Tabs
+# Switching tabs reruns the app, and only the selected tab's view is computed
 tab1, tab2, tab3, tab4, tab5 = st.tabs([
     "📝 Input Data",
     "📊 Cash Flow Analysis",
     "💰 Financial Metrics",
     "📈 Visualizations",
     "🎯 Sensitivity Analysis"
-])
+], key="active_tab", on_change="rerun")
 
 # TAB 1: INPUT DATA (Enhanced)
-with tab1:
+def input_view():
     st.markdown('<div class="section-header">Input Data Management</div>', unsafe_allow_html=True)
+    live_results()
+    st.markdown("---")
 
     # Enhanced input sections
-    editable_data_editor("💼 Capital Expenditure (CAPEX)", "capex_items", "primary", "unit")
+    item_section("💼 Capital Expenditure (CAPEX)", "capex_items", "primary", "unit")
     st.markdown("---")
-    editable_data_editor("💵 Operating Revenue (OPEX - Cash In)", "opex_cash_in", "success", "month")
+    item_section("💵 Operating Revenue (OPEX - Cash In)", "opex_cash_in", "success", "month")
     st.markdown("---")
-    editable_data_editor("💸 Operating Expenses (OPEX - Cash Out)", "opex_cash_out", "danger", "month")
+    item_section("💸 Operating Expenses (OPEX - Cash Out)", "opex_cash_out", "danger", "month")
 
 # TAB 2: CASH FLOW ANALYSIS (Enhanced)
-with tab2:
-    st.markdown('<div class="section-header">Cash Flow Analysis (Arus Kas)</div>', unsafe_allow_html=True)
-
+def item_totals(items):
+    """Vector of volume × price per item"""
+    if not items:
+        return np.zeros(0)
+    volumes = pd.to_numeric(pd.Series([item.get('volume', 0) for item in items]), errors='coerce')
+    prices = pd.to_numeric(pd.Series([item.get('price', 0) for item in items]), errors='coerce')
+    return (volumes * prices).fillna(0.0).to_numpy(dtype=float)
+
+def build_cash_flow_table():
+    """Arus Kas table for the current inputs as a numeric DataFrame (NaN = blank cell)"""
     # Calculate all values
-    cashflows = calculate_net_cashflow()
-    discount_factors = calculate_discount_factor()
-    discounted_cashflows = calculate_discounted_cashflow(cashflows, discount_factors)
-    cumulative_cashflows = calculate_cumulative_cashflow(discounted_cashflows)
+    cashflows = np.asarray(calculate_net_cashflow(), dtype=float)
+    discount_factors = np.asarray(calculate_discount_factor(), dtype=float)
+    discounted_cashflows = np.asarray(calculate_discounted_cashflow(cashflows, discount_factors), dtype=float)
+    cumulative_cashflows = np.asarray(calculate_cumulative_cashflow(discounted_cashflows), dtype=float)
+
+    years = int(st.session_state.project_years)
+    years_labels = ['Tahun 0'] + [f'Tahun {i+1}' for i in range(years)]
+    n_cols = years + 1
+    blank = np.full((1, n_cols), np.nan)
+
+    # Yearly item amounts from the escalation matrices; Year 0 has no operating flows
+    cash_in_matrix, cash_out_matrix = operating_item_matrices()
+    with_year_0 = lambda matrix: np.hstack([np.full((matrix.shape[0], 1), np.nan), matrix])
+
+    capex = -item_totals(st.session_state.capex_items)  # Negative for expenses
+    cash_in = item_totals(st.session_state.opex_cash_in)
+    cash_out = -item_totals(st.session_state.opex_cash_out)  # Negative for expenses
+
+    # CAPEX in the years it is spent (or returned as residual value), blank in other years
+    capex_by_item = capex_item_matrix()
+    capex_rows = np.vstack([-capex_by_item, -capex_by_item.sum(axis=0)])
+    capex_rows[:, 1:][capex_rows[:, 1:] == 0] = np.nan
+    capex_rows, capex_total_row = capex_rows[:-1], capex_rows[-1:]
+
+    names = lambda items: [f"  {item['name']}" for item in items]
+
+    # (description(s), Total column, yearly values) per block, top to bottom
+    blocks = [
+        (['CAPITAL EXPENDITURE (CAPEX)'], [np.nan], blank),
+        (names(st.session_state.capex_items), capex, capex_rows),
+        (['Total CAPEX'], [capex.sum()], capex_total_row),
+        ([''], [np.nan], blank),
+        (['OPERATIONAL REVENUE (OPEX - Cash In)'], [np.nan], blank),
+        (names(st.session_state.opex_cash_in), cash_in, with_year_0(cash_in_matrix)),
+        (['Total Revenue'], [np.nan], with_year_0(cash_in_matrix.sum(axis=0)[None, :])),
+        ([''], [np.nan], blank),
+        (['OPERATIONAL EXPENSES (OPEX - Cash Out)'], [np.nan], blank),
+        (names(st.session_state.opex_cash_out), cash_out, with_year_0(-cash_out_matrix)),
+        (['Total Expenses'], [np.nan], with_year_0(-cash_out_matrix.sum(axis=0)[None, :])),
+        ([''], [np.nan], blank),
+    ]
+
+    # Income tax between the operating flows and the (after-tax) net cash flow
+    taxes = tax_schedule()
+    if taxes is not None:
+        depreciation, _, taxable_income, tax = taxes
+        blocks += [
+            (['INCOME TAX'], [np.nan], blank),
+            (['  Depreciation'], [-depreciation.sum()], 0.0 - depreciation[None, :]),
+            (['  Taxable Income'], [np.nan], taxable_income[None, :]),
+            ([f'  Income Tax ({st.session_state.tax_rate:g}%)'], [-tax.sum()], 0.0 - tax[None, :]),
+            ([''], [np.nan], blank),
+        ]
 
-    # Create comprehensive cash flow table
-    years_labels = ['Tahun 0'] + [f'Tahun {i+1}' for i in range(int(st.session_state.project_years))]
+    blocks += [
+        (['NET CASH FLOW (AFTER TAX)' if taxes is not None else 'NET CASH FLOW'], [np.nan], cashflows[None, :]),
+        ([''], [np.nan], blank),
+        (['DISCOUNT FACTOR (RATE CURVE)' if st.session_state.discount_curve else f'DISCOUNT FACTOR (MARR {st.session_state.discount_rate}%)'], [np.nan], discount_factors[None, :]),
+        (['DISCOUNTED CASH FLOW'], [np.nan], discounted_cashflows[None, :]),
+        (['CUMULATIVE CASH FLOW'], [np.nan], cumulative_cashflows[None, :]),
+    ]
 
-    # Build detailed breakdown
-    cash_flow_data = {
-        'Description': [],
-        'Total': []
-    }
+    values = np.vstack([block[2].reshape(-1, n_cols) for block in blocks])
+    df_cashflow = pd.DataFrame(values, columns=years_labels)
+    df_cashflow.insert(0, 'Total', np.concatenate([np.asarray(block[1], dtype=float) for block in blocks]))
+    df_cashflow.insert(0, 'Description', [label for block in blocks for label in block[0]])
 
-    for year in years_labels:
-        cash_flow_data[year] = []
-
-    # CAPEX Section
-    cash_flow_data['Description'].append('CAPITAL EXPENDITURE (CAPEX)')
-    cash_flow_data['Total'].append('')
-    for i, year in enumerate(years_labels):
-        cash_flow_data[year].append('')
-
-    capex_total = 0
-    for item in st.session_state.capex_items:
-        total = -calculate_total(item)  # Negative for expenses
-        capex_total += total
-        cash_flow_data['Description'].append(f"  {item['name']}")
-        cash_flow_data['Total'].append(total)
-        for i, year in enumerate(years_labels):
-            if i == 0:
-                cash_flow_data[year].append(total)
-            else:
-                cash_flow_data[year].append('')
-
-    cash_flow_data['Description'].append('Total CAPEX')
-    cash_flow_data['Total'].append(capex_total)
-    for i, year in enumerate(years_labels):
-        if i == 0:
-            cash_flow_data[year].append(capex_total)
-        else:
-            cash_flow_data[year].append('')
-
-    # Empty row
-    cash_flow_data['Description'].append('')
-    cash_flow_data['Total'].append('')
-    for year in years_labels:
-        cash_flow_data[year].append('')
-
-    # OPEX Cash In Section
-    cash_flow_data['Description'].append('OPERATIONAL REVENUE (OPEX - Cash In)')
-    cash_flow_data['Total'].append('')
-    for year in years_labels:
-        cash_flow_data[year].append('')
-
-    # Get growth rate
-    growth_in = st.session_state.opex_in_growth / 100.0
-
-    for item in st.session_state.opex_cash_in:
-        base_total = calculate_total(item)
-        cash_flow_data['Description'].append(f"  {item['name']}")
-        cash_flow_data['Total'].append(base_total)
-        for i, year in enumerate(years_labels):
-            if i == 0:
-                cash_flow_data[year].append('')
-            else:
-                # Apply growth: base × (1 + rate)^year
-                year_total = base_total * ((1 + growth_in) ** i)
-                cash_flow_data[year].append(year_total)
-
-    cash_flow_data['Description'].append('Total Revenue')
-    base_yearly_revenue = calculate_yearly_opex_cash_in()
-    cash_flow_data['Total'].append('')
-    for i, year in enumerate(years_labels):
-        if i == 0:
-            cash_flow_data[year].append('')
-        else:
-            # Apply growth: base × (1 + rate)^year
-            year_revenue = base_yearly_revenue * ((1 + growth_in) ** i)
-            cash_flow_data[year].append(year_revenue)
-
-    # Empty row
-    cash_flow_data['Description'].append('')
-    cash_flow_data['Total'].append('')
-    for year in years_labels:
-        cash_flow_data[year].append('')
-
-    # OPEX Cash Out Section
-    cash_flow_data['Description'].append('OPERATIONAL EXPENSES (OPEX - Cash Out)')
-    cash_flow_data['Total'].append('')
-    for year in years_labels:
-        cash_flow_data[year].append('')
-
-    # Get growth rate for expenses
-    growth_out = st.session_state.opex_out_growth / 100.0
-
-    for item in st.session_state.opex_cash_out:
-        base_total = -calculate_total(item)  # Negative for expenses
-        cash_flow_data['Description'].append(f"  {item['name']}")
-        cash_flow_data['Total'].append(base_total)
-        for i, year in enumerate(years_labels):
-            if i == 0:
-                cash_flow_data[year].append('')
-            else:
-                # Apply growth: base × (1 + rate)^year
-                year_total = base_total * ((1 + growth_out) ** i)
-                cash_flow_data[year].append(year_total)
-
-    cash_flow_data['Description'].append('Total Expenses')
-    base_yearly_expenses = -calculate_yearly_opex_cash_out()
-    cash_flow_data['Total'].append('')
-    for i, year in enumerate(years_labels):
-        if i == 0:
-            cash_flow_data[year].append('')
-        else:
-            # Apply growth: base × (1 + rate)^year
-            year_expenses = base_yearly_expenses * ((1 + growth_out) ** i)
-            cash_flow_data[year].append(year_expenses)
-
-    # Empty row
-    cash_flow_data['Description'].append('')
-    cash_flow_data['Total'].append('')
-    for year in years_labels:
-        cash_flow_data[year].append('')
-
-    # Net Cash Flow
-    cash_flow_data['Description'].append('NET CASH FLOW')
-    cash_flow_data['Total'].append('')
-    for i, year in enumerate(years_labels):
-        cash_flow_data[year].append(cashflows[i])
-
-    # Empty row
-    cash_flow_data['Description'].append('')
-    cash_flow_data['Total'].append('')
-    for year in years_labels:
-        cash_flow_data[year].append('')
-
-    # Discount Factor
-    rate_percent = st.session_state.discount_rate
-    cash_flow_data['Description'].append(f'DISCOUNT FACTOR (MARR {rate_percent}%)')
-    cash_flow_data['Total'].append('')
-    for i, year in enumerate(years_labels):
-        cash_flow_data[year].append(discount_factors[i])
-
-    # Discounted Cash Flow
-    cash_flow_data['Description'].append('DISCOUNTED CASH FLOW')
-    cash_flow_data['Total'].append('')
-    for i, year in enumerate(years_labels):
-        cash_flow_data[year].append(discounted_cashflows[i])
-
-    # Cumulative Cash Flow
-    cash_flow_data['Description'].append('CUMULATIVE CASH FLOW')
-    cash_flow_data['Total'].append('')
-    for i, year in enumerate(years_labels):
-        cash_flow_data[year].append(cumulative_cashflows[i])
-
-    # Create DataFrame
-    df_cashflow = pd.DataFrame(cash_flow_data)
-
-    # Format the dataframe for display with improved formatting
-    def format_cell(x):
-        if isinstance(x, (int, float)) and x != '':
-            if abs(x) >= 1e6:
-                return f"Rp {x/1e6:.2f}M"
-            elif abs(x) >= 1e3:
-                return f"Rp {x/1e3:.0f}K"
-            else:
-                return f"Rp {x:,.0f}"
-        return str(x) if x != '' else ''
-
-    df_display = df_cashflow.copy()
-    for col in df_display.columns:
-        if col != 'Description':
-            df_display[col] = df_display[col].apply(format_cell)
-
-    # Display table with enhanced styling
+    return df_cashflow
+
+@st.fragment
+@profiled_fragment("cash_flow_view")
+def cash_flow_view():
+    st.markdown('<div class="section-header">Cash Flow Analysis (Arus Kas)</div>', unsafe_allow_html=True)
+
+    df_cashflow = cached_view_data('cash_flow_table', build_cash_flow_table)
+
+    # Numbers stay numeric; the browser formats them (e.g. "-141.5M")
+    number_format = st.column_config.NumberColumn(format="compact")
+    st.caption("All amounts in Rupiah (Rp)")
     st.dataframe(
-        df_display,
+        df_cashflow,
         use_container_width=True,
         height=800,
-        hide_index=True
+        hide_index=True,
+        placeholder="",
+        column_config={col: number_format for col in df_cashflow.columns if col != 'Description'}
     )
 
     # Enhanced download buttons
@@ -1094,23 +1550,25 @@ with tab2:
     with col1:
         st.download_button(
             label="📥 Download Cash Flow Table (CSV)",
-            data=df_cashflow.to_csv(index=False),
+            data=lambda: df_cashflow.to_csv(index=False),
             file_name=f"cashflow_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
             mime="text/csv"
         )
 
     with col2:
-        excel_file = export_to_excel()
-        if excel_file:
+        excel_bytes = cached_view_data('excel_export', build_excel_bytes)
+        if excel_bytes:
             st.download_button(
                 label="📥 Download Excel (Formatted)",
-                data=excel_file,
+                data=excel_bytes,
                 file_name=f"feasibility_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
                 mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
             )
 
 # TAB 3: FINANCIAL METRICS (Enhanced)
-with tab3:
+@st.fragment
+@profiled_fragment("metrics_view")
+def metrics_view():
     st.markdown('<div class="section-header">Financial Metrics & Analysis</div>', unsafe_allow_html=True)
 
     # Calculate metrics
@@ -1122,6 +1580,10 @@ with tab3:
     npv = calculate_npv(discounted_cashflows)
     irr = calculate_irr(cashflows)
     pbp = calculate_payback_period(cumulative_cashflows)
+    hurdle, hurdle_name = hurdle_rate()
+
+    if st.session_state.after_tax:
+        st.caption(f"After income tax ({st.session_state.tax_rate:g}%, {st.session_state.depreciation_method.replace('_', ' ')} depreciation)")
 
     # Display metrics in enhanced cards
     col1, col2, col3 = st.columns(3)
@@ -1145,13 +1607,13 @@ with tab3:
         st.metric(
             label="Internal Rate of Return (IRR)",
             value=f"{irr*100:.2f}%",
-            delta=f"{(irr*100 - st.session_state.discount_rate):.2f}% vs MARR",
-            delta_color="normal" if irr*100 > st.session_state.discount_rate else "inverse"
+            delta=f"{(irr*100 - hurdle):.2f}% vs {hurdle_name}",
+            delta_color="normal" if irr*100 > hurdle else "inverse"
         )
-        if irr * 100 > st.session_state.discount_rate:
-            st.success("✅ IRR > MARR (Good)")
+        if irr * 100 > hurdle:
+            st.success(f"✅ IRR > {hurdle_name} (Good)")
         else:
-            st.warning("⚠️ IRR < MARR (Risky)")
+            st.warning(f"⚠️ IRR < {hurdle_name} (Risky)")
         st.markdown('</div>', unsafe_allow_html=True)
 
     with col3:
@@ -1176,7 +1638,12 @@ with tab3:
         st.write(f"**Initial Investment (CAPEX):** Rp {-cashflows[0]:,.0f}")
         st.write(f"**Annual Net Operating Cash Flow:** Rp {cashflows[1]:,.0f}")
         st.write(f"**Project Duration:** {st.session_state.project_years} years")
-        st.write(f"**Discount Rate (MARR):** {st.session_state.discount_rate}%")
+        if st.session_state.discount_curve:
+            rates = curve_rates(st.session_state.discount_curve, int(st.session_state.project_years))
+            st.write(f"**Discount Curve:** {rates[0]:g}% in year 1 to {rates[-1]:g}% in year {len(rates)} "
+                     f"(average {hurdle:.2f}% a year)")
+        else:
+            st.write(f"**Discount Rate (MARR):** {st.session_state.discount_rate}%")
 
     with col2:
         st.subheader("Decision Criteria")
@@ -1189,12 +1656,12 @@ with tab3:
             ],
             'Criteria': [
                 'NPV > 0',
-                f'IRR > {st.session_state.discount_rate}%',
+                f'IRR > {hurdle:.2f}% ({hurdle_name})' if st.session_state.discount_curve else f'IRR > {hurdle}%',
                 f'PBP < {st.session_state.project_years} years'
             ],
             'Status': [
                 '✅ Pass' if npv > 0 else '❌ Fail',
-                '✅ Pass' if irr*100 > st.session_state.discount_rate else '❌ Fail',
+                '✅ Pass' if irr*100 > hurdle else '❌ Fail',
                 '✅ Pass' if pbp <= st.session_state.project_years else '❌ Fail'
             ]
         }
@@ -1207,7 +1674,7 @@ with tab3:
 
     passing_criteria = sum([
         npv > 0,
-        irr * 100 > st.session_state.discount_rate,
+        irr * 100 > hurdle,
         pbp <= st.session_state.project_years
     ])
 
@@ -1217,7 +1684,7 @@ with tab3:
 
         All three financial criteria are met:
         - **NPV is positive**: The project will create value
-        - **IRR exceeds MARR**: Returns exceed the required rate
+        - **IRR exceeds the required rate** (the MARR, or the discount curve's average)
         - **Payback period is acceptable**: Investment will be recovered within project timeline
 
         This project demonstrates strong financial viability and should be considered for implementation.
@@ -1243,19 +1710,142 @@ with tab3:
         - Consider alternative investment options
         """)
 
-# TAB 4: VISUALIZATIONS (Enhanced)
-with tab4:
-    st.markdown('<div class="section-header">Visualizations & Charts</div>', unsafe_allow_html=True)
+    duration_profile_section()
+    optional_capex_section()
 
-    # Calculate values
-    cashflows = calculate_net_cashflow()
-    discount_factors = calculate_discount_factor()
-    discounted_cashflows = calculate_discounted_cashflow(cashflows, discount_factors)
-    cumulative_cashflows = calculate_cumulative_cashflow(discounted_cashflows)
-    years_labels = ['Year 0'] + [f'Year {i+1}' for i in range(int(st.session_state.project_years))]
+# NPV for every project duration from one evaluation at the longest one and the
+# book values CAPEX returns when stopped earlier
+def duration_profile_section():
+    st.markdown("---")
+    st.subheader("📆 NPV by Project Duration")
+
+    current = int(st.session_state.project_years)
+    max_years = max(30, current)  # The Project Duration input's maximum
+    profile = cached_view_data('horizon_profile', lambda: horizon_profile(current_project(), max_years))
+    best, first_payback = profile['best_horizon'], profile['first_payback_horizon']
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Highest NPV", f"{best} years", f"Rp {profile['npv'][best - 1]:,.0f}", delta_color="off")
+    col2.metric("Paid Back From", f"{first_payback} years" if first_payback else "Never",
+                help="Shortest duration whose cumulative discounted cash flow reaches zero")
+    col3.metric("Current Duration", f"{current} years", f"Rp {profile['npv'][current - 1]:,.0f}", delta_color="off")
+
+    import plotly.graph_objects as go
+    colors = ['#f39c12' if h == best else '#27ae60' if paid else '#e74c3c'
+              for h, paid in zip(profile['horizons'], profile['paid_back'])]
+    fig = go.Figure(go.Bar(
+        x=profile['horizons'],
+        y=profile['npv'],
+        marker_color=colors,
+        hovertemplate="%{x} years<br>NPV: Rp %{y:,.0f}<extra></extra>",
+    ))
+    fig.add_vline(x=current, line_dash="dash", line_color="#1f77b4", annotation_text="Current")
+    fig.update_layout(
+        xaxis_title="Project Duration (years)",
+        yaxis_title="NPV (Rp)",
+        height=350,
+        margin=dict(t=30, b=40),
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption("🟠 highest NPV · 🟢 paid back · 🔴 not yet paid back. "
+               "CAPEX still in use at the end of a duration returns its book value then.")
+
+    with st.expander("📋 All Durations"):
+        st.dataframe(
+            pd.DataFrame({
+                'Years': profile['horizons'],
+                'NPV': profile['npv'],
+                'IRR (%)': np.asarray(profile['irr']) * 100,
+                'Payback (years)': profile['payback_period'],
+            }),
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                'NPV': st.column_config.NumberColumn(format="localized"),
+                'IRR (%)': st.column_config.NumberColumn(format="%.2f"),
+                'Payback (years)': st.column_config.NumberColumn(format="%.2f"),
+            },
+        )
+
+    if best != current and st.button(f"Use {best} years", help="Set the project duration to the highest-NPV duration"):
+        st.session_state.project_years = best
+        st.session_state.pop('project_years_input', None)
+        auto_save()
+        st.rerun()
+
+# The best set of optional CAPEX items within a budget (feasibility.options)
+def optional_capex_section():
+    st.markdown("---")
+    st.subheader("🧩 Optional CAPEX")
+    optional = [item for item in st.session_state.capex_items if item.get('optional')]
+    if not optional:
+        st.caption("Tick \"Optional\" on CAPEX items, and list in \"Enables\" the revenue/expense items each one "
+                   "brings, to find which of them to buy within a budget.")
+        return
+
+    # Every purchase, as the options count them (residual values do not lower the budget)
+    capex_total = float(cached_view_data('capex_purchases', lambda: purchase_matrix(
+        st.session_state.capex_items, int(st.session_state.project_years)
+    )).sum())
+    budget = st.number_input("CAPEX Budget (Rp)", min_value=0.0, value=capex_total, step=1000000.0,
+                             format="%.0f", key="optional_capex_budget",
+                             help="Ceiling on all CAPEX purchases, including the items that are not optional")
+    selection = cached_view_data('optional_capex', lambda: optional_capex_for(current_project(), budget), budget)
+    if selection['selected'] is None:
+        st.error(f"The CAPEX that is not optional (Rp {selection['capex']:,.0f}) is already over the budget.")
+        return
+
+    chosen = set(selection['selected'])
+    col1, col2, col3 = st.columns(3)
+    col1.metric("NPV, Best Choice", f"Rp {selection['evaluated_npv']:,.0f}",
+                f"Rp {selection['evaluated_npv'] - selection['npv_all']:,.0f} vs. buying all", delta_color="normal")
+    col2.metric("CAPEX Used", f"Rp {selection['capex']:,.0f}", f"of Rp {budget:,.0f}", delta_color="off")
+    col3.metric("Optional Items Bought", f"{len(chosen)} of {len(optional)}")
+    if not selection['optimal']:
+        st.warning(f"The search stopped early; this is the best choice found, not proven the best. "
+                   f"Before tax, no choice can exceed Rp {selection['bound']:,.0f}, a gap of at most "
+                   f"{selection['gap']:.2%} (Rp {selection['bound'] - selection['npv']:,.0f}).")
+
+    st.dataframe(
+        pd.DataFrame({
+            'Buy': ['✅' if i in chosen else '—' for i, item in enumerate(st.session_state.capex_items) if item.get('optional')],
+            'Item': [item['name'] for item in optional],
+            'CAPEX': [calculate_total(item) for item in optional],
+            'Enables': [format_enables(item) for item in optional],
+        }),
+        hide_index=True,
+        use_container_width=True,
+        column_config={'CAPEX': st.column_config.NumberColumn(format="localized")},
+    )
+    st.caption("Items are chosen on pre-tax values" + (", and the NPV is after tax." if st.session_state.after_tax else ".")
+               + " Revenue/expense items listed by several optional items need all of them.")
+
+# TAB 4: VISUALIZATIONS (Enhanced)
+TOP_N_ITEMS = 12  # Items shown individually in breakdown charts; the rest become "Other"
+
+def top_n_with_other(names, values, n=TOP_N_ITEMS):
+    """Keep the n largest items and aggregate the long tail into a single 'Other' entry"""
+    values = np.asarray(values, dtype=float)
+    if len(values) <= n + 1:
+        return list(names), values.tolist()
+    order = np.argsort(-np.abs(values), kind='stable')
+    top, rest = order[:n], order[n:]
+    top_names = [names[i] for i in top] + [f"Other ({len(rest)} items)"]
+    return top_names, values[top].tolist() + [float(values[rest].sum())]
+
+@profile_phase("figures")
+@st.cache_data(show_spinner=False, max_entries=64)
+def build_chart_figures(years_labels, cashflows, cumulative_cashflows, capex, revenue, expenses,
+                        npv, irr, pbp, discount_rate, project_years):
+    """Serialized (JSON) figures for the Visualizations tab, cached per input hash.
+
+    capex, revenue and expenses are (names, values) tuples of the items.
+    """
+    import plotly.graph_objects as go
+
+    figures = {}
 
     # 1. Cash Flow Chart
-    st.subheader("💰 Net Cash Flow by Year")
     fig_cashflow = go.Figure()
     fig_cashflow.add_trace(go.Bar(
         x=years_labels,
@@ -1272,10 +1862,9 @@ with tab4:
         hovermode='x unified',
         height=400
     )
-    st.plotly_chart(fig_cashflow, use_container_width=True)
+    figures['cashflow'] = fig_cashflow.to_json()
 
     # 2. Cumulative Cash Flow Chart
-    st.subheader("📈 Cumulative Discounted Cash Flow")
     fig_cumulative = go.Figure()
     fig_cumulative.add_trace(go.Scatter(
         x=years_labels,
@@ -1294,13 +1883,10 @@ with tab4:
         hovermode='x unified',
         height=400
     )
-    st.plotly_chart(fig_cumulative, use_container_width=True)
+    figures['cumulative'] = fig_cumulative.to_json()
 
     # 3. CAPEX Breakdown
-    st.subheader("💼 CAPEX Breakdown")
-    capex_names = [item['name'] for item in st.session_state.capex_items]
-    capex_values = [calculate_total(item) for item in st.session_state.capex_items]
-
+    capex_names, capex_values = top_n_with_other(*capex)
     fig_capex = go.Figure(data=[go.Pie(
         labels=capex_names,
         values=capex_values,
@@ -1312,62 +1898,34 @@ with tab4:
         title='Capital Expenditure Distribution',
         height=400
     )
-    st.plotly_chart(fig_capex, use_container_width=True)
+    figures['capex'] = fig_capex.to_json()
 
     # 4. OPEX Analysis
-    col1, col2 = st.columns(2)
-
-    with col1:
-        st.subheader("💵 Revenue Sources")
-        revenue_names = [item['name'] for item in st.session_state.opex_cash_in]
-        revenue_values = [calculate_total(item) for item in st.session_state.opex_cash_in]
-
-        fig_revenue = go.Figure(data=[go.Bar(
-            y=revenue_names,
-            x=revenue_values,
-            orientation='h',
-            marker_color='lightgreen',
-            text=[f'Rp {v:,.0f}' for v in revenue_values],
-            textposition='outside'
-        )])
-        fig_revenue.update_layout(
-            title='Annual Revenue Breakdown',
-            xaxis_title='Amount (Rp)',
-            height=300
-        )
-        st.plotly_chart(fig_revenue, use_container_width=True)
-
-    with col2:
-        st.subheader("💸 Expense Categories")
-        expense_names = [item['name'] for item in st.session_state.opex_cash_out]
-        expense_values = [calculate_total(item) for item in st.session_state.opex_cash_out]
-
-        fig_expense = go.Figure(data=[go.Bar(
-            y=expense_names,
-            x=expense_values,
+    for key, (names, values), title, color in [
+        ('revenue', revenue, 'Annual Revenue Breakdown', 'lightgreen'),
+        ('expenses', expenses, 'Annual Expense Breakdown', 'lightcoral'),
+    ]:
+        names, values = top_n_with_other(names, values)
+        fig = go.Figure(data=[go.Bar(
+            y=names,
+            x=values,
             orientation='h',
-            marker_color='lightcoral',
-            text=[f'Rp {v:,.0f}' for v in expense_values],
+            marker_color=color,
+            text=[f'Rp {v:,.0f}' for v in values],
             textposition='outside'
         )])
-        fig_expense.update_layout(
-            title='Annual Expense Breakdown',
+        fig.update_layout(
+            title=title,
             xaxis_title='Amount (Rp)',
             height=300
         )
-        st.plotly_chart(fig_expense, use_container_width=True)
+        figures[key] = fig.to_json()
 
     # 5. Financial Metrics Comparison
-    st.subheader("📊 Key Financial Metrics")
-
-    npv = calculate_npv(discounted_cashflows)
-    irr = calculate_irr(cashflows)
-    pbp = calculate_payback_period(cumulative_cashflows)
-
     metrics_data = {
         'Metric': ['NPV (Million Rp)', 'IRR (%)', 'Payback Period (Years)'],
         'Value': [npv/1000000, irr*100, pbp],
-        'Target': [0, st.session_state.discount_rate, st.session_state.project_years]
+        'Target': [0, discount_rate, project_years]
     }
 
     fig_metrics = go.Figure()
@@ -1390,10 +1948,154 @@ with tab4:
         height=400,
         barmode='group'
     )
-    st.plotly_chart(fig_metrics, use_container_width=True)
+    figures['metrics'] = fig_metrics.to_json()
+
+    return figures
+
+def item_names_and_totals(items):
+    """(names, totals) tuple of a section's items, hashable for caching"""
+    return tuple(item['name'] for item in items), tuple(item_totals(items).tolist())
+
+@st.fragment
+@profiled_fragment("charts_view")
+def charts_view():
+    st.markdown('<div class="section-header">Visualizations & Charts</div>', unsafe_allow_html=True)
+
+    # Calculate values
+    cashflows = calculate_net_cashflow()
+    discount_factors = calculate_discount_factor()
+    discounted_cashflows = calculate_discounted_cashflow(cashflows, discount_factors)
+    cumulative_cashflows = calculate_cumulative_cashflow(discounted_cashflows)
+    years_labels = ['Year 0'] + [f'Year {i+1}' for i in range(int(st.session_state.project_years))]
+
+    figures = build_chart_figures(
+        tuple(years_labels),
+        tuple(cashflows),
+        tuple(cumulative_cashflows),
+        item_names_and_totals(st.session_state.capex_items),
+        item_names_and_totals(st.session_state.opex_cash_in),
+        item_names_and_totals(st.session_state.opex_cash_out),
+        calculate_npv(discounted_cashflows),
+        calculate_irr(cashflows),
+        calculate_payback_period(cumulative_cashflows),
+        hurdle_rate()[0],
+        int(st.session_state.project_years)
+    )
+
+    def show(name):
+        st.plotly_chart(json.loads(figures[name]), use_container_width=True)
+
+    st.subheader("💰 Net Cash Flow by Year")
+    show('cashflow')
+
+    st.subheader("📈 Cumulative Discounted Cash Flow")
+    show('cumulative')
+
+    npv_attribution_section()
+
+    st.subheader("💼 CAPEX Breakdown")
+    show('capex')
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.subheader("💵 Revenue Sources")
+        show('revenue')
+
+    with col2:
+        st.subheader("💸 Expense Categories")
+        show('expenses')
+
+    st.subheader("📊 Key Financial Metrics")
+    show('metrics')
+
+def unique_labels(labels):
+    """Labels made unique by numbering repeats, so chart categories don't merge"""
+    seen = {}
+    unique = []
+    for label in labels:
+        seen[label] = seen.get(label, 0) + 1
+        unique.append(label if seen[label] == 1 else f"{label} ({seen[label]})")
+    return unique
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def build_attribution_figure(revenue, expenses, capex, tax, npv):
+    """Serialized waterfall from 0 to the NPV; revenue, expenses and capex are
+    (names, contributions) tuples of the items"""
+    import plotly.graph_objects as go
+
+    labels, values = [], []
+    for prefix, (names, contributions) in [('➕', revenue), ('➖', expenses), ('🏗️', capex)]:
+        names, contributions = top_n_with_other(names, contributions)
+        order = np.argsort(-np.abs(contributions), kind='stable')
+        labels += [f"{prefix} {names[i]}" for i in order]
+        values += [contributions[i] for i in order]
+    if tax:
+        labels.append('🧾 Income Tax')
+        values.append(tax)
+
+    fig = go.Figure(go.Waterfall(
+        x=unique_labels(labels) + ['NPV'],
+        y=values + [npv],
+        measure=['relative'] * len(values) + ['total'],
+        increasing=dict(marker_color='#27ae60'),
+        decreasing=dict(marker_color='#e74c3c'),
+        totals=dict(marker_color='#1f77b4'),
+        hovertemplate='<b>%{x}</b><br>Rp %{y:,.0f}<extra></extra>',
+    ))
+    fig.update_layout(
+        title='Contribution of Each Item to NPV',
+        yaxis_title='Present Value (Rp)',
+        height=500,
+        showlegend=False,
+        xaxis=dict(tickangle=-45),
+    )
+    return fig.to_json()
+
+# Every item's discounted value: one matrix-vector product per section (feasibility.attribution)
+def npv_attribution_section():
+    st.subheader("🧮 NPV by Item")
+    capex, revenue, expenses = cached_view_data('npv_attribution', lambda: item_contributions(
+        capex_item_matrix(), *operating_item_matrices(), calculate_discount_factor()
+    ))
+    flows = project_flows()
+    tax = -float(flows.tax @ flows.weights) if flows.tax is not None else 0.0
+
+    sections = [
+        ('Revenue', st.session_state.opex_cash_in, revenue),
+        ('Expenses', st.session_state.opex_cash_out, expenses),
+        ('CAPEX', st.session_state.capex_items, capex),
+    ]
+    figure = build_attribution_figure(
+        *((tuple(item['name'] for item in items), tuple(contributions.tolist())) for _, items, contributions in sections),
+        tax,
+        flows.npv,
+    )
+    st.plotly_chart(json.loads(figure), use_container_width=True)
+    st.caption("Each item's yearly amounts, with its schedule and growth, discounted to today. "
+               f"The {TOP_N_ITEMS} largest items per section are shown; the rest are grouped as \"Other\"."
+               + (" Income tax is shown as one amount." if tax else ""))
+
+    with st.expander("📋 All Items"):
+        st.dataframe(
+            pd.DataFrame({
+                'Item': [item['name'] for _, items, _ in sections for item in items],
+                'Section': [section for section, items, _ in sections for _ in items],
+                'Qty × Price': np.concatenate([item_totals(items) for _, items, _ in sections]),
+                'NPV Contribution': np.concatenate([contributions for _, _, contributions in sections]),
+            }).sort_values('NPV Contribution', ascending=False, key=np.abs),
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                'Qty × Price': st.column_config.NumberColumn(format="localized"),
+                'NPV Contribution': st.column_config.NumberColumn(format="localized"),
+            },
+        )
 
 # TAB 5: SENSITIVITY ANALYSIS (Enhanced)
-with tab5:
+@st.fragment
+@profiled_fragment("sensitivity_view")
+def sensitivity_view():
     st.markdown('<div class="section-header">Sensitivity Analysis (Tornado Diagram)</div>', unsafe_allow_html=True)
 
     st.info("""
@@ -1406,127 +2108,23 @@ with tab5:
 
     # Sensitivity parameters
     variation = st.slider("Variation Percentage (%)", min_value=5, max_value=50, value=20, step=5)
-    variation_decimal = variation / 100
-
-    # Base case NPV
-    base_cashflows = calculate_net_cashflow()
-    base_discount_factors = calculate_discount_factor()
-    base_discounted = calculate_discounted_cashflow(base_cashflows, base_discount_factors)
-    base_npv = calculate_npv(base_discounted)
-
-    # Variables to test
-    sensitivity_results = []
-
-    # 1. Sensitivity to Revenue
-    st.session_state.opex_cash_in_backup = st.session_state.opex_cash_in.copy()
-
-    # Increase revenue
-    for item in st.session_state.opex_cash_in:
-        item['price'] = item['price'] * (1 + variation_decimal)
-    cashflows_high = calculate_net_cashflow()
-    discounted_high = calculate_discounted_cashflow(cashflows_high, base_discount_factors)
-    npv_high = calculate_npv(discounted_high)
-
-    # Decrease revenue
-    for item in st.session_state.opex_cash_in:
-        item['price'] = item['price'] * (1 - variation_decimal)
-    cashflows_low = calculate_net_cashflow()
-    discounted_low = calculate_discounted_cashflow(cashflows_low, base_discount_factors)
-    npv_low = calculate_npv(discounted_low)
-
-    # Restore
-    st.session_state.opex_cash_in = st.session_state.opex_cash_in_backup
-
-    sensitivity_results.append({
-        'Variable': 'Revenue',
-        'NPV_Low': npv_low,
-        'NPV_High': npv_high,
-        'Range': npv_high - npv_low
-    })
-
-    # 2. Sensitivity to Operating Costs
-    st.session_state.opex_cash_out_backup = st.session_state.opex_cash_out.copy()
-
-    # Increase costs (decreases NPV)
-    for item in st.session_state.opex_cash_out:
-        item['price'] = item['price'] * (1 + variation_decimal)
-    cashflows_high = calculate_net_cashflow()
-    discounted_high = calculate_discounted_cashflow(cashflows_high, base_discount_factors)
-    npv_cost_high = calculate_npv(discounted_high)
-
-    # Decrease costs (increases NPV)
-    for item in st.session_state.opex_cash_out:
-        item['price'] = item['price'] * (1 - variation_decimal)
-    cashflows_low = calculate_net_cashflow()
-    discounted_low = calculate_discounted_cashflow(cashflows_low, base_discount_factors)
-    npv_cost_low = calculate_npv(discounted_low)
-
-    # Restore
-    st.session_state.opex_cash_out = st.session_state.opex_cash_out_backup
-
-    sensitivity_results.append({
-        'Variable': 'Operating Costs',
-        'NPV_Low': npv_cost_high,  # Note: swapped because higher cost = lower NPV
-        'NPV_High': npv_cost_low,
-        'Range': npv_cost_low - npv_cost_high
-    })
-
-    # 3. Sensitivity to Initial Investment (CAPEX)
-    st.session_state.capex_items_backup = st.session_state.capex_items.copy()
-
-    # Increase CAPEX
-    for item in st.session_state.capex_items:
-        item['price'] = item['price'] * (1 + variation_decimal)
-    cashflows_high = calculate_net_cashflow()
-    discounted_high = calculate_discounted_cashflow(cashflows_high, base_discount_factors)
-    npv_capex_high = calculate_npv(discounted_high)
-
-    # Decrease CAPEX
-    for item in st.session_state.capex_items:
-        item['price'] = item['price'] * (1 - variation_decimal)
-    cashflows_low = calculate_net_cashflow()
-    discounted_low = calculate_discounted_cashflow(cashflows_low, base_discount_factors)
-    npv_capex_low = calculate_npv(discounted_low)
-
-    # Restore
-    st.session_state.capex_items = st.session_state.capex_items_backup
-
-    sensitivity_results.append({
-        'Variable': 'Initial Investment',
-        'NPV_Low': npv_capex_high,  # Note: swapped
-        'NPV_High': npv_capex_low,
-        'Range': npv_capex_low - npv_capex_high
-    })
-
-    # 4. Sensitivity to Discount Rate
-    original_rate = st.session_state.discount_rate
-
-    # Increase discount rate
-    st.session_state.discount_rate = original_rate * (1 + variation_decimal)
-    df_high = calculate_discount_factor()
-    discounted_high = calculate_discounted_cashflow(base_cashflows, df_high)
-    npv_rate_high = calculate_npv(discounted_high)
-
-    # Decrease discount rate
-    st.session_state.discount_rate = original_rate * (1 - variation_decimal)
-    df_low = calculate_discount_factor()
-    discounted_low = calculate_discounted_cashflow(base_cashflows, df_low)
-    npv_rate_low = calculate_npv(discounted_low)
-
-    # Restore
-    st.session_state.discount_rate = original_rate
-
-    sensitivity_results.append({
-        'Variable': 'Discount Rate',
-        'NPV_Low': npv_rate_high,  # Note: swapped
-        'NPV_High': npv_rate_low,
-        'Range': npv_rate_low - npv_rate_high
-    })
 
-    # Sort by range (most sensitive first)
-    sensitivity_results.sort(key=lambda x: x['Range'], reverse=True)
+    capex, cash_in, cash_out, years, rate, tax_rate, deductions = what_if_inputs()
+    base_npv, sensitivity_results = run_sensitivity_analysis(
+        capex,
+        cash_in,
+        cash_out,
+        years,
+        rate,
+        0.0,  # Growth is already in the yearly amounts
+        0.0,
+        variation,
+        tax_rate,
+        deductions
+    )
 
     # Create Tornado Diagram
+    import plotly.graph_objects as go
     fig_tornado = go.Figure()
 
     variables = [r['Variable'] for r in sensitivity_results]
@@ -1634,6 +2232,90 @@ with tab5:
         - Consider sensitivity analysis results in your go/no-go decision
         """)
 
+    start_timing_section()
+
+# Start timing: every delay of every stream evaluated at once (feasibility.deferral)
+def start_timing_section():
+    st.markdown("---")
+    st.subheader("⏱️ Start Timing")
+    st.caption("NPV if the whole project, or only its CAPEX, revenue or expenses, starts later. "
+               "When only one stream is delayed, the project runs on until that stream's last amount, so nothing "
+               "is dropped; years after the last project year use its discount rate.")
+
+    max_delay = st.slider("Delay up to (years)", min_value=1, max_value=10, value=5, key="max_delay")
+    capex, cash_in, cash_out, years, rate, tax_rate, deductions = what_if_inputs()
+    npvs = deferral_npvs(capex, cash_in, cash_out, years, rate, max_delay, tax_rate, deductions)
+
+    import plotly.graph_objects as go
+    fig = go.Figure()
+    for stream in DEFERRAL_STREAMS:
+        fig.add_trace(go.Scatter(x=list(range(max_delay + 1)), y=npvs[stream], mode='lines+markers', name=stream))
+    fig.add_hline(y=0, line_dash="dash", line_color="gray")
+    fig.update_layout(
+        xaxis_title="Delay (years)",
+        yaxis_title="NPV (Rp)",
+        height=380,
+        template='plotly_white',
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    summaries = {stream: delay_summary(npvs[stream]) for stream in DEFERRAL_STREAMS}
+    st.dataframe(
+        pd.DataFrame({
+            'Delayed': list(DEFERRAL_STREAMS),
+            'Best Start (years later)': [summaries[stream]['best_delay'] for stream in DEFERRAL_STREAMS],
+            'NPV at Best Start': [summaries[stream]['best_npv'] for stream in DEFERRAL_STREAMS],
+            'NPV Lost by 1st Year of Delay': [summaries[stream]['delay_costs'][0] for stream in DEFERRAL_STREAMS],
+            f'NPV Lost by Year {max_delay}': [summaries[stream]['delay_costs'][-1] for stream in DEFERRAL_STREAMS],
+        }),
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            column: st.column_config.NumberColumn(format="localized")
+            for column in ['NPV at Best Start', 'NPV Lost by 1st Year of Delay', f'NPV Lost by Year {max_delay}']
+        },
+    )
+
+    # Per item: which single items cost (or gain) the most when they start a year later
+    with st.expander("📋 Delay Cost per Item (pre-tax)"):
+        cash_in_matrix, cash_out_matrix = operating_item_matrices()
+        with_year_0 = lambda matrix: np.hstack([np.zeros((len(matrix), 1)), matrix])
+        sections = [
+            ('CAPEX', st.session_state.capex_items, -capex_item_matrix()),
+            ('Revenue', st.session_state.opex_cash_in, with_year_0(cash_in_matrix)),
+            ('Expenses', st.session_state.opex_cash_out, -with_year_0(cash_out_matrix)),
+        ]
+        item_flows = np.vstack([flows for _, _, flows in sections])
+        changes = item_deferral_npvs(item_flows, calculate_discount_factor(), max_delay)
+        items_df = pd.DataFrame({
+            'Item': [item['name'] for _, items, _ in sections for item in items],
+            'Section': [section for section, items, _ in sections for _ in items],
+            'NPV Change, 1 Year Later': changes[:, 1],
+            f'NPV Change, {max_delay} Years Later': changes[:, max_delay],
+        })
+        items_df = items_df.reindex(items_df['NPV Change, 1 Year Later'].abs().sort_values(ascending=False).index).head(TOP_N_ITEMS)
+        st.dataframe(
+            items_df,
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                column: st.column_config.NumberColumn(format="localized")
+                for column in ['NPV Change, 1 Year Later', f'NPV Change, {max_delay} Years Later']
+            },
+        )
+
+views = [
+    (tab1, input_view),
+    (tab2, cash_flow_view),
+    (tab3, metrics_view),
+    (tab4, charts_view),
+    (tab5, sensitivity_view),
+]
+for tab, view in views:
+    if tab.open:
+        with tab, profile_phase(f"tab: {view.__name__}"):
+            view()
+
 # Footer
 st.markdown("---")
 st.markdown("""
@@ -1641,4 +2323,11 @@ st.markdown("""
         <p>Feasibility Analysis Tool v2.0 | Built with Streamlit</p>
         <p>For investment analysis and project evaluation | Enhanced with improved sensitivity analysis</p>
     </div>
-    """, unsafe_allow_html=True)
\ No newline at end of file
+    """, unsafe_allow_html=True)
+
+# Developer tools
+with st.sidebar:
+    st.markdown("---")
+    st.toggle("🩺 Profile reruns", key="profiling", on_change=stop_memory_tracing,
+              help=f"Show where each rerun's time and memory go and log it to {PROFILE_LOG_FILE}")
+    finish_profile()
@@ -0,0 +1,117 @@
+"""Cold-start import budget for app.py.
+
+Runs app.py once in a fresh interpreter (Streamlit "bare" mode, in a temporary
+directory so no storage file is touched) with ``python -X importtime`` and checks:
+
+- total startup wall time and total import time stay under the budget, and
+- feature-specific heavy modules (plotly.express, openpyxl, ...) are not imported
+  at startup. (``import streamlit`` itself loads plotly.graph_objects to register
+  its chart theme, so only modules the app controls are listed.)
+
+Usage:
+    python benchmarks/import_budget.py            # check against import_budget.json
+    python benchmarks/import_budget.py --top 15   # also list the slowest imports
+    python benchmarks/import_budget.py --json     # machine-readable result
+
+Exits with status 1 when the budget is exceeded, so it can run in CI.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, 'app.py')
+BUDGET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'import_budget.json')
+
+# Like `streamlit run`, put the script's directory first on sys.path
+DRIVER = ("import os, runpy, sys; sys.path.insert(0, os.path.dirname(sys.argv[1])); "
+          "runpy.run_path(sys.argv[1], run_name='__main__')")
+
+
+def parse_importtime(stderr):
+    """Return {module: (self_us, cumulative_us, depth)} from -X importtime output"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3:
+            continue
+        self_us, cumulative_us, raw_name = fields
+        depth = (len(raw_name) - len(raw_name.lstrip(' ')) - 1) // 2
+        modules[raw_name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return modules
+
+
+def measure(app_path=APP_PATH):
+    """Run the app once in a fresh interpreter and collect timings"""
+    with tempfile.TemporaryDirectory() as workdir:
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', DRIVER, app_path],
+            cwd=workdir, capture_output=True, text=True
+        )
+        wall = time.perf_counter() - start
+
+    modules = parse_importtime(result.stderr)
+    top_level = {name: cumulative for name, (_, cumulative, depth) in modules.items() if depth == 0}
+    return {
+        'returncode': result.returncode,
+        'startup_seconds': wall,
+        'import_ms': sum(top_level.values()) / 1000,
+        'top_level_imports_ms': {name: us / 1000 for name, us in sorted(top_level.items(), key=lambda kv: -kv[1])},
+        'modules': set(modules),
+    }
+
+
+def check(result, budget):
+    """List of budget violations (empty when within budget)"""
+    problems = []
+    if result['returncode'] != 0:
+        problems.append(f"app.py exited with status {result['returncode']}")
+    if result['startup_seconds'] > budget['max_startup_seconds']:
+        problems.append(f"startup took {result['startup_seconds']:.2f}s (budget {budget['max_startup_seconds']}s)")
+    if result['import_ms'] > budget['max_import_ms']:
+        problems.append(f"imports took {result['import_ms']:.0f}ms (budget {budget['max_import_ms']}ms)")
+    for module in budget.get('lazy_modules', []):
+        if any(name == module or name.startswith(module + '.') for name in result['modules']):
+            problems.append(f"'{module}' is imported at startup but should be imported lazily")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--budget', default=BUDGET_PATH, help='Budget JSON file')
+    parser.add_argument('--top', type=int, default=0, help='Show the N slowest top-level imports')
+    parser.add_argument('--json', action='store_true', help='Print the result as JSON')
+    args = parser.parse_args()
+
+    with open(args.budget) as f:
+        budget = json.load(f)
+
+    result = measure()
+    problems = check(result, budget)
+
+    if args.json:
+        output = {k: v for k, v in result.items() if k != 'modules'}
+        output['problems'] = problems
+        print(json.dumps(output, indent=2))
+    else:
+        print(f"Startup: {result['startup_seconds']:.2f}s (budget {budget['max_startup_seconds']}s)")
+        print(f"Imports: {result['import_ms']:.0f}ms (budget {budget['max_import_ms']}ms)")
+        for name, ms in list(result['top_level_imports_ms'].items())[:args.top]:
+            print(f"  {ms:8.1f}ms  {name}")
+        for problem in problems:
+            print(f"FAIL: {problem}")
+        if not problems:
+            print("OK: within import budget")
+
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,246 @@
+"""Concurrent-session load test for app.py.
+
+Drives N simulated user sessions through Streamlit's AppTest, spread over
+worker processes that each interleave their sessions' reruns the way a
+Streamlit server process does. Each session repeats a realistic script:
+
+    open the app -> add a CAPEX item -> change MARR -> open the Sensitivity tab
+    -> export to Excel -> back to Input Data
+
+and every rerun is timed. All sessions share one working directory, so they
+also share the storage file (feasibilitizer_data.json); a watcher thread counts
+the writes to it and any reads that find it half-written.
+
+Reported: throughput (reruns/s), p50/p95/p99 rerun latency overall and per
+step, memory per session (RSS growth / sessions) and storage-file contention
+(writes, torn reads, and how many sessions' latest item survived in the file).
+
+Usage:
+    python benchmarks/load_test.py --sessions 10 --iterations 3
+    python benchmarks/load_test.py --sessions 50 --processes 4 --items 1000 --output load.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(os.path.dirname(BENCH_DIR), 'app.py')
+sys.path.insert(0, BENCH_DIR)
+
+from synthetic import synthetic_project, write_project  # noqa: E402
+
+STORAGE_FILE = 'feasibilitizer_data.json'
+INPUT_TAB = "📝 Input Data"
+SENSITIVITY_TAB = "🎯 Sensitivity Analysis"
+EXPORT_LABEL = "📥 Export to Excel"
+
+
+def rss_kb():
+    """Current resident set size of this process in KB (Linux), else peak RSS"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class StorageWatcher(threading.Thread):
+    """Polls the storage file, counting writes (mtime changes) and torn reads"""
+
+    def __init__(self, path, interval=0.005):
+        super().__init__(daemon=True)
+        self.path = path
+        self.interval = interval
+        self.writes = 0
+        self.torn_reads = 0
+        self.reads = 0
+        self.stopped = threading.Event()
+
+    def run(self):
+        last_mtime = None
+        while not self.stopped.is_set():
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+                if mtime != last_mtime:
+                    if last_mtime is not None:
+                        self.writes += 1
+                    last_mtime = mtime
+                    with open(self.path) as f:
+                        self.reads += 1
+                        json.load(f)
+            except FileNotFoundError:
+                pass
+            except ValueError:
+                self.torn_reads += 1
+            time.sleep(self.interval)
+
+
+def timed_run(at, step, latencies):
+    start = time.perf_counter()
+    at.run()
+    latencies.append((step, (time.perf_counter() - start) * 1000))
+    if at.exception:
+        raise RuntimeError(f"{step}: {at.exception[0].message}")
+
+
+def session_script(at, session_id, iterations, latencies, outcome):
+    """One simulated user, as a generator that pauses after every rerun"""
+    timed_run(at, 'open', latencies)
+    yield
+    for i in range(iterations):
+        item_name = f"Load test item {session_id}-{i}"
+        at.text_input(key="new_capex_items_name").input(item_name)
+        at.number_input(key="new_capex_items_price").set_value(1_000_000.0 + i)
+        at.button(key="add_capex_items").click()
+        timed_run(at, 'add_item', latencies)
+        outcome[session_id] = item_name
+        yield
+
+        # 'Add' reruns only the item fragments, so AppTest's element tree now holds
+        # just those; set the sidebar widget through session state instead
+        at.session_state['discount_rate_input'] = 8.0 + (session_id + i) % 8
+        timed_run(at, 'change_marr', latencies)
+        yield
+
+        at.session_state['active_tab'] = SENSITIVITY_TAB
+        timed_run(at, 'sensitivity_tab', latencies)
+        yield
+
+        next(b for b in at.button if b.label == EXPORT_LABEL).click()
+        timed_run(at, 'export', latencies)
+        yield
+
+        at.session_state['active_tab'] = INPUT_TAB
+        timed_run(at, 'input_tab', latencies)
+        yield
+
+
+def run_worker(args):
+    """Drive some sessions in this process, interleaving their reruns round-robin.
+
+    AppTest can only run one script at a time per process, so each worker
+    stands in for one server process whose sessions take turns (a Streamlit
+    server's script threads also share one GIL).
+    """
+    from streamlit.testing.v1 import AppTest
+
+    session_ids, iterations, workdir, timeout = args
+    os.chdir(workdir)
+    latencies, outcome = [], {}
+    rss_before = rss_kb()
+    sessions = []
+    for session_id in session_ids:
+        at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        sessions.append((at, session_script(at, session_id, iterations, latencies, outcome)))
+
+    active = [script for _, script in sessions]
+    while active:
+        for script in list(active):
+            try:
+                next(script)
+            except StopIteration:
+                active.remove(script)
+
+    # Every session's AppTest is still alive here, so this is their combined footprint
+    return latencies, outcome, rss_kb() - rss_before
+
+
+def percentiles(values):
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {'p50_ms': round(p50, 2), 'p95_ms': round(p95, 2), 'p99_ms': round(p99, 2),
+            'mean_ms': round(statistics.fmean(values), 2), 'count': len(values)}
+
+
+def run_load_test(sessions, iterations, processes, items, timeout=600):
+    processes = max(1, min(processes, sessions))
+    latencies, outcome, memory_kb = [], {}, 0
+    with tempfile.TemporaryDirectory() as workdir:
+        storage_path = os.path.join(workdir, STORAGE_FILE)
+        if items:
+            write_project(storage_path, synthetic_project(items, 5))
+        watcher = StorageWatcher(storage_path)
+        watcher.start()
+        tasks = [(list(range(sessions))[w::processes], iterations, workdir, timeout) for w in range(processes)]
+        start = time.perf_counter()
+        try:
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                for worker_latencies, worker_outcome, worker_memory_kb in pool.map(run_worker, tasks):
+                    latencies.extend(worker_latencies)
+                    outcome.update(worker_outcome)
+                    memory_kb += worker_memory_kb
+            elapsed = time.perf_counter() - start
+        finally:
+            watcher.stopped.set()
+            watcher.join()
+
+        with open(storage_path) as f:
+            stored_names = {item.get('name') for item in json.load(f).get('capex_items', [])}
+
+    survived = sum(1 for item_name in outcome.values() if item_name in stored_names)
+    all_ms = [ms for _, ms in latencies]
+    steps = {}
+    for step, ms in latencies:
+        steps.setdefault(step, []).append(ms)
+
+    return {
+        'sessions': sessions,
+        'iterations': iterations,
+        'processes': processes,
+        'seed_items': items,
+        'wall_seconds': round(elapsed, 3),
+        'reruns': len(all_ms),
+        'throughput_reruns_per_s': round(len(all_ms) / elapsed, 2),
+        'latency': percentiles(all_ms),
+        'latency_by_step': {step: percentiles(values) for step, values in steps.items()},
+        'memory_per_session_kb': round(memory_kb / sessions, 1),
+        'storage': {
+            'writes': watcher.writes,
+            'writes_per_s': round(watcher.writes / elapsed, 2),
+            'torn_reads': watcher.torn_reads,
+            'reads': watcher.reads,
+            'sessions_with_latest_item_saved': survived,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=10, help='simulated sessions (default 10)')
+    parser.add_argument('--iterations', type=int, default=3, help='script repetitions per session (default 3)')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='worker processes sharing the sessions (default: CPU count)')
+    parser.add_argument('--items', type=int, default=0,
+                        help='seed the storage file with a synthetic project of this many items')
+    parser.add_argument('--output', help='also write the report as JSON to this file')
+    args = parser.parse_args()
+
+    report = run_load_test(args.sessions, args.iterations, args.processes or os.cpu_count() or 1, args.items)
+
+    print(f"{report['sessions']} sessions x {report['iterations']} iterations on {report['processes']} process(es), "
+          f"{report['reruns']} reruns in {report['wall_seconds']:.1f}s "
+          f"({report['throughput_reruns_per_s']:.1f} reruns/s)")
+    print(f"{'step':<16}{'p50':>10}{'p95':>10}{'p99':>10}  (ms)")
+    for step, stats in [('all', report['latency'])] + list(report['latency_by_step'].items()):
+        print(f"{step:<16}{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}")
+    print(f"Memory per session: {report['memory_per_session_kb'] / 1024:.1f} MB")
+    storage = report['storage']
+    print(f"Storage file: {storage['writes']} writes ({storage['writes_per_s']:.1f}/s), "
+          f"{storage['torn_reads']} torn reads, latest item saved for "
+          f"{storage['sessions_with_latest_item_saved']}/{report['sessions']} sessions")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,239 @@
+"""Benchmark suite for the calculation engine, storage, Excel export and app reruns.
+
+Synthetic projects (see synthetic.py) are generated for every combination of
+item count and horizon. Each benchmark is run several times and the min /
+median / max wall time is written to a JSON results file:
+
+- engine:       evaluate_project() (item totals, cash flows, NPV, IRR, payback)
+- irr:          calculate_irr() on the project's cash flows
+- sensitivity:  the tornado analysis (run_sensitivity_analysis)
+- export:       export_to_excel()
+- save / load:  writing and reading the storage file, incl. rebuilding section totals
+- app_first_run / app_rerun / app_sensitivity_tab:
+                full runs of app.py through Streamlit's AppTest with the project
+                loaded from the storage file (first run, plain rerun, switch to
+                the Sensitivity tab)
+
+Before timing, check_engine() checks that the NPV by duration at the
+project's own duration is the evaluated NPV, with CAPEX given useful lives
+and residual values so that the shorter durations credit book values.
+
+Usage:
+    python benchmarks/suite.py                         # full grid, results in benchmarks/results/
+    python benchmarks/suite.py --quick --skip-app      # small grid, engine only
+    python benchmarks/suite.py --compare benchmarks/results/abc1234.json
+
+With --compare the run exits with status 1 when a benchmark's median is more
+than --threshold times the baseline's.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+APP_PATH = os.path.join(ROOT, 'app.py')
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+sys.path.insert(0, ROOT)
+
+from feasibility import (  # noqa: E402
+    evaluate_project,
+    calculate_irr,
+    run_sensitivity_analysis,
+    export_to_excel,
+    section_totals,
+)
+from feasibility.horizons import horizon_profile  # noqa: E402
+from synthetic import synthetic_project, write_project  # noqa: E402
+
+ITEM_COUNTS = [10, 100, 1000, 10000]
+HORIZONS = [1, 5, 10, 30]
+QUICK_ITEM_COUNTS = [10, 1000]
+QUICK_HORIZONS = [5, 30]
+
+STORAGE_FILE = 'feasibilitizer_data.json'
+SENSITIVITY_TAB = "🎯 Sensitivity Analysis"
+
+
+def time_calls(func, repeat):
+    """Wall times of `repeat` calls of func, in ms"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def summarize(name, items, years, times):
+    return {
+        'benchmark': name,
+        'items': items,
+        'years': years,
+        'runs': len(times),
+        'min_ms': round(min(times), 3),
+        'median_ms': round(statistics.median(times), 3),
+        'max_ms': round(max(times), 3),
+    }
+
+
+def check_engine(project):
+    """Raise if horizon_profile() disagrees with evaluate_project() at the project's duration"""
+    project = {**project, 'capex_items': [
+        {**item, 'useful_life': 2 + i % 9, 'residual': 10 * (i % 4)} for i, item in enumerate(project['capex_items'])
+    ]}
+    years = project['project_years']
+    expected = evaluate_project(project)['npv']
+    for max_years in (years, max(30, years)):
+        npv = horizon_profile(project, max_years)['npv'][years - 1]
+        if abs(npv - expected) > 1e-6 * max(1.0, abs(expected)):
+            raise RuntimeError(f"horizon_profile NPV at {years} of {max_years} years: {npv:,.2f}, "
+                               f"evaluate_project: {expected:,.2f}")
+
+
+def bench_engine(project, repeat):
+    """Engine, IRR, sensitivity, export and storage timings for one project"""
+    result = evaluate_project(project)
+    sensitivity_args = (result['capex'], result['annual_revenue'], result['annual_expenses'],
+                        result['project_years'], result['discount_rate'], 0.0, 0.0, 20)
+    timings = {
+        'engine': time_calls(lambda: evaluate_project(project), repeat),
+        'irr': time_calls(lambda: calculate_irr(result['cashflows']), repeat),
+        'sensitivity': time_calls(lambda: run_sensitivity_analysis(*sensitivity_args), repeat),
+        'export': time_calls(lambda: export_to_excel(project, result), max(1, repeat // 3)),
+    }
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, STORAGE_FILE)
+
+        def load():
+            with open(path, 'r') as f:
+                section_totals(json.load(f))
+
+        timings['save'] = time_calls(lambda: write_project(path, project), repeat)
+        timings['load'] = time_calls(load, repeat)
+    return timings
+
+
+def bench_app(project, repeat):
+    """Full app runs through AppTest, with the project in the storage file"""
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    timings = {'app_first_run': [], 'app_rerun': [], 'app_sensitivity_tab': []}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        write_project(os.path.join(workdir, STORAGE_FILE), project)
+        os.chdir(workdir)
+        try:
+            for _ in range(repeat):
+                # Cold caches, so every repeat measures the same work
+                st.cache_data.clear()
+                at = AppTest.from_file(APP_PATH, default_timeout=600)
+                steps = [('app_first_run', None), ('app_rerun', None), ('app_sensitivity_tab', SENSITIVITY_TAB)]
+                for name, tab in steps:
+                    if tab:
+                        at.session_state['active_tab'] = tab
+                    start = time.perf_counter()
+                    at.run()
+                    timings[name].append((time.perf_counter() - start) * 1000)
+                    if at.exception:
+                        raise RuntimeError(f"{name}: {at.exception[0].message}")
+        finally:
+            os.chdir(cwd)
+    return timings
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip() or 'unknown'
+    except OSError:
+        return 'unknown'
+
+
+def compare(results, baseline, threshold):
+    """(report lines, regressions) against a baseline results file"""
+    base = {(r['benchmark'], r['items'], r['years']): r for r in baseline['results']}
+    lines, regressions = [], []
+    for r in results:
+        old = base.get((r['benchmark'], r['items'], r['years']))
+        if not old or not old['median_ms']:
+            continue
+        ratio = r['median_ms'] / old['median_ms']
+        # Ignore sub-millisecond differences; they are timer noise
+        slower = ratio > threshold and r['median_ms'] - old['median_ms'] > 1.0
+        line = (f"{r['benchmark']:<20} {r['items']:>6} items {r['years']:>3}y  "
+                f"{old['median_ms']:10.2f}ms -> {r['median_ms']:10.2f}ms  x{ratio:.2f}")
+        lines.append(line + ('  REGRESSION' if slower else ''))
+        if slower:
+            regressions.append(line)
+    return lines, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, nargs='+', help=f'item counts (default {ITEM_COUNTS})')
+    parser.add_argument('--years', type=int, nargs='+', help=f'horizons in years (default {HORIZONS})')
+    parser.add_argument('--quick', action='store_true', help='small grid for a fast check')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per benchmark (default 5)')
+    parser.add_argument('--app-repeat', type=int, default=3, help='AppTest runs per project (default 3)')
+    parser.add_argument('--skip-app', action='store_true', help='skip the AppTest benchmarks')
+    parser.add_argument('--output', help='results file (default benchmarks/results/<commit>.json)')
+    parser.add_argument('--compare', metavar='BASELINE', help='results file to compare against')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='slowdown ratio that counts as a regression (default 1.25)')
+    args = parser.parse_args()
+
+    item_counts = args.items or (QUICK_ITEM_COUNTS if args.quick else ITEM_COUNTS)
+    horizons = args.years or (QUICK_HORIZONS if args.quick else HORIZONS)
+
+    results = []
+    for items in item_counts:
+        for years in horizons:
+            project = synthetic_project(items, years)
+            check_engine(project)
+            timings = bench_engine(project, args.repeat)
+            if not args.skip_app:
+                timings.update(bench_app(project, args.app_repeat))
+            for name, times in timings.items():
+                results.append(summarize(name, items, years, times))
+            print(f"{items:>6} items {years:>3}y  " + "  ".join(
+                f"{name}={statistics.median(times):.1f}ms" for name, times in timings.items()))
+
+    commit = git_commit()
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            'meta': {
+                'commit': commit,
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'repeat': args.repeat,
+                'app_repeat': None if args.skip_app else args.app_repeat,
+            },
+            'results': results,
+        }, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            lines, regressions = compare(results, json.load(f), args.threshold)
+        print("\n".join(lines))
+        if regressions:
+            print(f"FAIL: {len(regressions)} benchmark(s) slower than x{args.threshold}")
+            sys.exit(1)
+        print("OK: no regressions")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""Synthetic projects for the benchmarks, in the app's save format.
+
+Projects are deterministic for a given (items, years, seed) and have a
+realistic shape: about 40% CAPEX items, 30% revenue and 30% cost items,
+with revenue and costs scaled so the project pays back within its horizon.
+"""
+import json
+import random
+import uuid
+
+SECTION_SHARES = (('capex_items', 0.4), ('opex_cash_in', 0.3), ('opex_cash_out', 0.3))
+UNITS = ['unit', 'set', 'paket', 'lisensi', 'bulan', 'tahun']
+
+
+def synthetic_items(rng, count, prefix, total):
+    """count items whose totals add up to about total"""
+    weights = [rng.lognormvariate(0, 1) for _ in range(count)]
+    scale = total / sum(weights) if weights else 0
+    items = []
+    for i, weight in enumerate(weights):
+        volume = float(rng.randint(1, 20))
+        items.append({
+            'id': str(uuid.UUID(int=rng.getrandbits(128))),
+            'name': f"{prefix} {i + 1}",
+            'volume': volume,
+            'unit': rng.choice(UNITS),
+            'price': round(weight * scale / volume, 2),
+        })
+    return items
+
+
+def synthetic_project(items=100, years=5, seed=0, discount_rate=10.7):
+    """A project with `items` items over `years` years"""
+    rng = random.Random(f"{items}-{years}-{seed}")
+    counts = {key: max(1, round(items * share)) for key, share in SECTION_SHARES}
+    counts['capex_items'] = max(1, items - counts['opex_cash_in'] - counts['opex_cash_out'])
+
+    capex = 150_000_000.0
+    revenue = capex * 0.6
+    return {
+        'capex_items': synthetic_items(rng, counts['capex_items'], 'Investasi', capex),
+        'opex_cash_in': synthetic_items(rng, counts['opex_cash_in'], 'Pendapatan', revenue),
+        'opex_cash_out': synthetic_items(rng, counts['opex_cash_out'], 'Biaya', revenue * 0.35),
+        'project_years': years,
+        'discount_rate': discount_rate,
+        'default_data_loaded': False,
+    }
+
+
+def write_project(path, project):
+    """Save a project the way the app's save_to_storage() does"""
+    with open(path, 'w') as f:
+        json.dump(project, f, indent=2)
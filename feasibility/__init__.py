@@ -0,0 +1,32 @@
+"""Feasibility analysis engine: cash flows, NPV/IRR/payback, sensitivity and Excel export.
+
+Works on plain project dicts in the app's save format, so it can be used
+without Streamlit (see feasibility.batch for the command-line runner).
+"""
+from .cashflow import (
+    SECTION_KEYS,
+    calculate_total,
+    section_totals,
+    project_cashflows,
+    discount_factors_for,
+    calculate_discounted_cashflow,
+    calculate_cumulative_cashflow,
+)
+from .capex import capex_schedule, capex_matrix
+from .curve import curve_rates, curve_discount_factors, load_discount_curve
+from .escalation import escalation_matrix, operating_matrices
+from .metrics import (
+    calculate_npv,
+    calculate_irr,
+    calculate_payback_period,
+    evaluate_project,
+)
+from .project import DEFAULT_SETTINGS, project_settings, validate_project, load_project
+from .tax import ASSET_GROUPS, depreciation_matrix, tax_deductions, income_tax
+from .sensitivity import run_sensitivity_analysis, sensitivity_for
+from .deferral import deferral_npvs, deferral_for
+from .portfolio import select_projects, portfolio_for
+from .options import select_options, optional_capex_for
+from .flows import ProjectFlows
+from .attribution import item_contributions, npv_attribution
+from .export import export_to_excel
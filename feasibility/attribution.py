@@ -0,0 +1,51 @@
+"""NPV by item: each line item's discounted contribution to the project NPV.
+
+An item's contribution is its amount in each year (with its schedule and
+growth applied) times that year's discount weight, 1 / discount factor:
+positive for revenue, negative for expenses and CAPEX (residual values
+count back in). For a whole section that is one matrix-vector product of its
+items × years matrix with the weights. Before tax the contributions add up
+to the NPV; after tax, the present value of the income tax is the remainder.
+"""
+import numpy as np
+
+from .capex import capex_matrix
+from .escalation import operating_matrices
+from .metrics import evaluate_project
+
+
+def item_contributions(capex, cash_in, cash_out, discount_factors):
+    """Signed contributions (capex, revenue, expenses) of every item, from the
+    items' matrices (CAPEX for years 0..N, operating items for years 1..N)"""
+    weights = 1 / np.asarray(discount_factors, dtype=float)
+    return (
+        -(np.asarray(capex, dtype=float) @ weights),
+        np.asarray(cash_in, dtype=float) @ weights[1:],
+        -(np.asarray(cash_out, dtype=float) @ weights[1:]),
+    )
+
+
+def npv_attribution(project):
+    """Contributions of a project's items to its NPV.
+
+    Returns {'capex_items', 'opex_cash_in', 'opex_cash_out'}: per-item lists,
+    plus 'tax' (minus the present value of income tax, 0 before tax) and
+    'npv'; the contributions and tax add up to npv.
+    """
+    result = evaluate_project(project)
+    years = result['project_years']
+    cash_in_matrix, cash_out_matrix = operating_matrices(
+        project, years, result['opex_in_growth'] / 100.0, result['opex_out_growth'] / 100.0
+    )
+    capex, revenue, expenses = item_contributions(
+        capex_matrix(project.get('capex_items', []), years), cash_in_matrix, cash_out_matrix,
+        result['discount_factors']
+    )
+    tax = -float(np.dot(result['tax'], 1 / np.asarray(result['discount_factors']))) if 'tax' in result else 0.0
+    return {
+        'capex_items': capex.tolist(),
+        'opex_cash_in': revenue.tolist(),
+        'opex_cash_out': expenses.tolist(),
+        'tax': tax,
+        'npv': result['npv'],
+    }
@@ -0,0 +1,152 @@
+"""Score a directory of project JSON files in parallel.
+
+Each file is a project as saved by "💾 Save Project" (growth rates may be added as
+opex_in_growth / opex_out_growth in percent). Files are evaluated in a process
+pool and written to one results table, one row per file; files that cannot be
+read or evaluated get an error message instead of metrics.
+
+With --budget, the projects with the highest total NPV whose CAPEX fits the
+budget are marked as selected (see feasibility.portfolio); a comma-separated
+budget limits the CAPEX of year 0, 1, ... separately.
+
+Usage:
+    python -m feasibility.batch projects/ -o results.csv
+    python -m feasibility.batch projects/ -o results.json --workers 8 --sensitivity 20
+    python -m feasibility.batch projects/ -o results.csv --budget 500000000
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .metrics import evaluate_project
+from .portfolio import select_projects
+from .project import load_project
+from .sensitivity import sensitivity_for
+
+RESULT_COLUMNS = [
+    'file', 'npv', 'irr', 'payback_period', 'capex', 'annual_revenue', 'annual_expenses',
+    'project_years', 'discount_rate', 'opex_in_growth', 'opex_out_growth',
+]
+SENSITIVITY_COLUMNS = ['most_sensitive', 'npv_range']
+PORTFOLIO_COLUMNS = ['selected']
+
+
+def evaluate_file(path, variation=None):
+    """One results row for a project file (never raises)"""
+    row = {'file': os.path.basename(path), 'error': ''}
+    try:
+        result = evaluate_project(load_project(path))
+        row.update({key: result[key] for key in RESULT_COLUMNS[1:]})
+        row['purchase_schedule'] = result['purchase_schedule']
+        if variation is not None:
+            _, sensitivity_results = sensitivity_for(result, variation)
+            row['most_sensitive'] = sensitivity_results[0]['Variable']
+            row['npv_range'] = sensitivity_results[0]['Range']
+    except Exception as e:
+        row['error'] = f"{type(e).__name__}: {e}"
+    return row
+
+
+def _evaluate_chunk(args):
+    paths, variation = args
+    return [evaluate_file(path, variation) for path in paths]
+
+
+def evaluate_files(paths, workers=None, variation=None):
+    """Results rows for many project files, in input order.
+
+    Files are sent to the pool in chunks so per-task overhead stays small next
+    to the calculation itself. workers=1 evaluates in this process.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(paths) <= 1:
+        return [evaluate_file(path, variation) for path in paths]
+
+    chunk_size = max(1, min(500, len(paths) // (workers * 4)))
+    chunks = [(paths[i:i + chunk_size], variation) for i in range(0, len(paths), chunk_size)]
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk_rows in pool.map(_evaluate_chunk, chunks):
+            rows.extend(chunk_rows)
+    return rows
+
+
+def select_rows(rows, budget, method='auto'):
+    """Mark the rows of the projects to fund within budget (rows with errors are never selected)"""
+    evaluated = [row for row in rows if not row['error']]
+    portfolio = select_projects([row['npv'] for row in evaluated],
+                                [row['purchase_schedule'] for row in evaluated], budget, method)
+    chosen = set(portfolio['selected'])
+    for i, row in enumerate(evaluated):
+        row['selected'] = i in chosen
+    return portfolio
+
+
+def parse_budget(text):
+    """A budget total, or a list of yearly budgets from comma-separated amounts"""
+    amounts = [float(part) for part in text.split(',')]
+    return amounts[0] if len(amounts) == 1 else amounts
+
+
+def write_results(rows, output, columns):
+    """Write rows as CSV, or as a JSON list when output ends in .json"""
+    if output.endswith('.json'):
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump([{key: row.get(key, '') for key in columns} for row in rows], f, indent=2)
+        return
+
+    with open(output, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=columns, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('directory', help='directory containing project JSON files')
+    parser.add_argument('-o', '--output', default='results.csv', help='results file (.csv or .json)')
+    parser.add_argument('--pattern', default='*.json', help='file name pattern (default: *.json)')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--sensitivity', type=float, metavar='PERCENT', default=None,
+                        help='also report the most sensitive variable at ±PERCENT')
+    parser.add_argument('--budget', type=parse_budget, metavar='AMOUNT[,AMOUNT...]', default=None,
+                        help='select the projects with the highest total NPV within this CAPEX budget '
+                             '(comma-separated: per year from year 0)')
+    parser.add_argument('--method', choices=['auto', 'exact', 'greedy'], default='auto',
+                        help='portfolio selection: exact branch and bound, greedy by profitability index, '
+                             'or auto (exact up to 500 projects)')
+    args = parser.parse_args(argv)
+
+    paths = sorted(glob.glob(os.path.join(args.directory, args.pattern)))
+    if not paths:
+        print(f"No files matching {args.pattern} in {args.directory}", file=sys.stderr)
+        return 1
+
+    start = time.perf_counter()
+    rows = evaluate_files(paths, args.workers, args.sensitivity)
+    elapsed = time.perf_counter() - start
+
+    portfolio = select_rows(rows, args.budget, args.method) if args.budget is not None else None
+
+    columns = (RESULT_COLUMNS + (SENSITIVITY_COLUMNS if args.sensitivity is not None else [])
+               + (PORTFOLIO_COLUMNS if portfolio else []) + ['error'])
+    write_results(rows, args.output, columns)
+
+    failed = sum(1 for row in rows if row['error'])
+    print(f"Evaluated {len(rows)} projects in {elapsed:.2f}s ({failed} failed) -> {args.output}")
+    if portfolio:
+        optimal = ("optimal" if portfolio['optimal'] else
+                   f"best found; no selection exceeds {portfolio['bound']:,.0f}, "
+                   f"a gap of at most {portfolio['gap']:.2%}")
+        print(f"Selected {len(portfolio['selected'])} projects within budget: total NPV "
+              f"{portfolio['total_npv']:,.0f} ({portfolio['method']}, {optimal})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
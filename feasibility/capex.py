@@ -0,0 +1,135 @@
+"""Time-phased CAPEX: purchases, replacements and residual values per year.
+
+A CAPEX item may carry, besides volume and price:
+
+- start_year:   the year it is bought (default 0, the investment year)
+- recur_every:  buy it again every N years (e.g. laptops every 4)
+- useful_life:  years each purchase lasts (default: recur_every)
+- residual:     value left at the end of its useful life, in percent of its cost
+
+Each purchase returns its residual value when its useful life ends. A
+purchase still in use when the project ends returns its book value there
+(straight-line from cost down to the residual); an item with a residual but
+no useful life returns the residual at the end of the project. Items without
+these fields are bought once in year 0, as before.
+
+Schedules are kept as these few fields per item and expanded into sparse
+(item, year, amount) events, which are scatter-added into the year vector.
+"""
+import numpy as np
+
+from .cashflow import calculate_total
+from .escalation import _year_value
+
+CAPEX_SCHEDULE_FIELDS = ('start_year', 'recur_every', 'useful_life', 'residual')
+
+
+def has_capex_schedule(item):
+    """Whether a CAPEX item has any schedule setting"""
+    return any(item.get(field) not in (None, '') for field in CAPEX_SCHEDULE_FIELDS)
+
+
+def _purchases(items, years):
+    """(rows, buy_years, costs, lives, salvages) of every purchase in years 0..years"""
+    n = len(items)
+    cost = np.fromiter((calculate_total(item) for item in items), dtype=float, count=n)
+    start = np.zeros(n, dtype=int)
+    every = np.zeros(n, dtype=int)
+    life = np.zeros(n, dtype=int)
+    residual = np.zeros(n)
+
+    # Only items with settings are visited; the rest are bought once in year 0
+    for i, item in enumerate(items):
+        if not has_capex_schedule(item):
+            continue
+        start[i] = max(0, _year_value(item.get('start_year'), 0))
+        every[i] = max(0, _year_value(item.get('recur_every'), 0))
+        life[i] = max(0, _year_value(item.get('useful_life'), every[i]))
+        residual[i] = float(item.get('residual') or 0) / 100.0
+
+    # One purchase per item and cycle: start, start + every, ... up to the last year
+    counts = np.where(start > years, 0, np.where(every > 0, (years - start) // np.maximum(every, 1) + 1, 1))
+    rows = np.repeat(np.arange(n), counts)
+    cycle = np.arange(rows.size) - np.repeat(np.cumsum(counts) - counts, counts)
+    buy_years = start[rows] + cycle * every[rows]
+    buy_amounts = cost[rows]
+    return rows, buy_years, buy_amounts, life[rows], buy_amounts * residual[rows]
+
+
+def capex_purchases(items, years):
+    """Every purchase of items in years 0..years, as arrays.
+
+    Returns (rows, buy_years, costs, end_years, end_values, retired): the item
+    of each purchase, when it is bought and for how much, when it returns how
+    much (end_values is 0 for a purchase that returns nothing), and whether its
+    useful life ends within the project.
+    """
+    rows, buy_years, buy_amounts, purchase_life, salvage = _purchases(items, years)
+
+    # Residual at the end of each purchase's life, or book value at the project end
+    retire_years = buy_years + purchase_life
+    retired = (purchase_life > 0) & (retire_years <= years)
+    unused_share = np.where(purchase_life > 0, (retire_years - years) / np.maximum(purchase_life, 1), 0.0)
+    end_values = np.where(retired, salvage, salvage + (buy_amounts - salvage) * unused_share)
+    end_years = np.where(retired, retire_years, years)
+    return rows, buy_years, buy_amounts, end_years, end_values, retired
+
+
+def truncated_end_values(items, years):
+    """Value returned at the end of the project if it stopped after each year 0..years.
+
+    The purchases made by year h whose useful life is not over by then (or
+    that have a residual but no useful life) return their book value (or
+    residual) in year h; those of an evaluation over all the years return it
+    later instead. Purchases × horizons at once; 0 in year `years`, where
+    capex_schedule() already holds the values.
+    """
+    _, buy_years, buy_amounts, purchase_life, salvage = _purchases(items, years)
+    horizons = np.arange(years + 1)[:, None]
+    retire_years = buy_years + purchase_life
+    in_use = (buy_years <= horizons) & ((purchase_life == 0) | (retire_years > horizons)) & (horizons < years)
+    unused_share = np.where(purchase_life > 0, (retire_years - horizons) / np.maximum(purchase_life, 1), 0.0)
+    book_values = salvage + (buy_amounts - salvage) * unused_share
+    return np.where(in_use, book_values, 0.0).sum(axis=1)
+
+
+def capex_events(items, years):
+    """Sparse (rows, years, amounts) arrays of items' CAPEX in years 0..years.
+
+    Purchases are positive amounts, residual values negative.
+    """
+    rows, buy_years, buy_amounts, end_years, end_values, _ = capex_purchases(items, years)
+    returned = end_values != 0
+    return (
+        np.concatenate([rows, rows[returned]]),
+        np.concatenate([buy_years, end_years[returned]]),
+        np.concatenate([buy_amounts, -end_values[returned]]),
+    )
+
+
+def capex_schedule(items, years):
+    """Net CAPEX per year for years 0..years (purchases less residual values)"""
+    _, event_years, amounts = capex_events(items, years)
+    return np.bincount(event_years, weights=amounts, minlength=years + 1).astype(float)
+
+
+def purchase_schedule(items, years):
+    """Purchases per year for years 0..years, residual values left out"""
+    _, buy_years, buy_amounts, _, _ = _purchases(items, years)
+    return np.bincount(buy_years, weights=buy_amounts, minlength=years + 1).astype(float)
+
+
+def purchase_matrix(items, years):
+    """Purchases of each item per year, shape (len(items), years + 1), residual values left out"""
+    rows, buy_years, buy_amounts, _, _ = _purchases(items, years)
+    matrix = np.zeros((len(items), years + 1))
+    np.add.at(matrix, (rows, buy_years), buy_amounts)
+    return matrix
+
+
+def capex_matrix(items, years):
+    """Net CAPEX of each item per year, shape (len(items), years + 1)"""
+    rows, event_years, amounts = capex_events(items, years)
+    matrix = np.zeros((len(items), years + 1))
+    np.add.at(matrix, (rows, event_years), amounts)
+    return matrix
@@ -0,0 +1,99 @@
+"""Cash flow arithmetic on plain project data (no Streamlit)."""
+import math
+
+import numpy as np
+
+from .curve import rate_factors
+
+SECTION_KEYS = ('capex_items', 'opex_cash_in', 'opex_cash_out')
+
+
+def calculate_total(item):
+    """Calculate total from volume * price with validation"""
+    try:
+        volume = float(item.get('volume', 0))
+        price = float(item.get('price', 0))
+        return volume * price
+    except (ValueError, TypeError):
+        return 0
+
+
+def section_totals(project):
+    """Total of every item section of a project dict"""
+    return {
+        key: math.fsum(calculate_total(item) for item in project.get(key, []))
+        for key in SECTION_KEYS
+    }
+
+
+def project_cashflows(capex, base_cash_in, base_cash_out, years, growth_in=0.0, growth_out=0.0):
+    """Net cashflow per year for years 0..years.
+
+    capex is either a total spent in year 0 or per-year amounts for years
+    0..years (see feasibility.capex). base_cash_in / base_cash_out are either
+    yearly section totals, grown at growth_in / growth_out (decimals), or
+    per-year amounts for years 1..years (e.g. escalation matrix column sums),
+    used as given.
+    """
+    cash_in = yearly_amounts(base_cash_in, years, growth_in)
+    cash_out = yearly_amounts(base_cash_out, years, growth_out)
+    cashflows = -capex_amounts(capex, years)
+    cashflows[1:] += cash_in - cash_out
+    return cashflows.tolist()
+
+
+def capex_amounts(capex, years):
+    """CAPEX for years 0..years from a year-0 total or a per-year sequence"""
+    amounts = np.asarray(capex, dtype=float)
+    if amounts.ndim == 0:
+        return np.concatenate([[amounts], np.zeros(years)])
+    if len(amounts) != years + 1:
+        raise ValueError(f"expected {years + 1} yearly CAPEX amounts, got {len(amounts)}")
+    return amounts.copy()
+
+
+def yearly_amounts(amount, years, growth=0.0):
+    """Amounts for years 1..years from a base amount or a per-year sequence"""
+    amounts = np.asarray(amount, dtype=float)
+    if amounts.ndim == 0:
+        # Compound growth (Excel-style) starts from year 2: =Base*(1+Rate)^(year-1)
+        return amounts * (1 + growth) ** np.arange(years, dtype=float)
+    if len(amounts) != years:
+        raise ValueError(f"expected {years} yearly amounts, got {len(amounts)}")
+    return amounts
+
+
+def discount_factors_for(rate_percent, years):
+    """Discount factors (1 + rate)^year for years 0..years.
+
+    rate_percent may also be per-year rates for years 1..years (a discount
+    curve, see feasibility.curve), compounded year by year.
+    """
+    rates = np.asarray(rate_percent, dtype=float)
+    if rates.ndim == 0:
+        rate = rate_percent / 100
+        return [(1 + rate) ** i for i in range(years + 1)]
+    if len(rates) != years:
+        raise ValueError(f"expected {years} yearly discount rates, got {len(rates)}")
+    return rate_factors(rates).tolist()
+
+
+def calculate_discounted_cashflow(cashflows, discount_factors):
+    """Calculate discounted cashflow"""
+    try:
+        return [cf / df if df != 0 else 0 for cf, df in zip(cashflows, discount_factors)]
+    except Exception:
+        return [0]
+
+
+def calculate_cumulative_cashflow(discounted_cashflows):
+    """Calculate cumulative cashflow"""
+    try:
+        cumulative = []
+        total = 0
+        for dcf in discounted_cashflows:
+            total += dcf
+            cumulative.append(total)
+        return cumulative
+    except Exception:
+        return [0]
@@ -0,0 +1,103 @@
+"""Discount curves: a discount rate per year instead of a single MARR.
+
+A curve is a list of (year, rate in percent) points, e.g.
+[[1, 8.0], [5, 10.0], [10, 11.5]]. Rates between points are interpolated
+linearly and held flat before the first and after the last point. Year t's
+cash flow is discounted by (1 + r_1) × (1 + r_2) × ... × (1 + r_t), so a
+curve with one point is the same as that MARR.
+"""
+import csv
+import io
+from functools import lru_cache
+
+import numpy as np
+
+
+def curve_points(points):
+    """A curve as a sorted tuple of (year, rate) pairs, from pairs or a {year: rate} dict.
+
+    Raises ValueError for an empty curve, a year below 1 or a non-numeric value.
+    """
+    pairs = points.items() if isinstance(points, dict) else points
+    try:
+        curve = {int(year): float(rate) for year, rate in pairs}
+    except (TypeError, ValueError):
+        raise ValueError("discount curve points must be (year, rate) number pairs")
+    if not curve:
+        raise ValueError("discount curve needs at least one point")
+    if min(curve) < 1:
+        raise ValueError("discount curve years start at 1")
+    if min(curve.values()) <= -100:
+        raise ValueError("discount curve rates must be above -100%")
+    return tuple(sorted(curve.items()))
+
+
+@lru_cache(maxsize=256)
+def _curve(points, years):
+    curve_years, rates = zip(*points)
+    rates = np.interp(np.arange(1, years + 1), curve_years, rates)
+    return tuple(rates.tolist()), tuple(rate_factors(rates).tolist())
+
+
+def curve_rates(points, years):
+    """Interpolated rate (percent) for each of years 1..years, cached per curve"""
+    return np.array(_curve(curve_points(points), years)[0])
+
+
+def curve_discount_factors(points, years):
+    """Discount factors for years 0..years, cached per curve"""
+    return list(_curve(curve_points(points), years)[1])
+
+
+def parse_curve_csv(text):
+    """Curve points from CSV text of year,rate rows (a header row is optional)"""
+    try:
+        dialect = csv.Sniffer().sniff(text[:4096], delimiters=',;\t')
+    except csv.Error:
+        dialect = csv.excel
+    rows = [row for row in csv.reader(io.StringIO(text), dialect) if any(cell.strip() for cell in row)]
+
+    if rows and not rows[0][0].strip().lstrip('-').replace('.', '', 1).isdigit():
+        rows = rows[1:]  # Header
+    if any(len(row) < 2 for row in rows):
+        raise ValueError("every discount curve row needs a year and a rate")
+    return curve_points((row[0], row[1]) for row in rows)
+
+
+def load_discount_curve(path):
+    """Curve points from a CSV file (see parse_curve_csv)"""
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        return parse_curve_csv(f.read())
+
+
+def rate_factors(rates):
+    """Discount factors for years 0..N from per-year rates (percent): a cumulative product.
+
+    rates may be a 2-D array of scenarios (one curve per row), giving one row
+    of factors per scenario.
+    """
+    growth = 1 + np.asarray(rates, dtype=float) / 100
+    ones = np.ones(growth.shape[:-1] + (1,))
+    return np.concatenate([ones, np.cumprod(growth, axis=-1)], axis=-1)
+
+
+def average_rate(points, years):
+    """The single yearly rate (percent) with the curve's discount factor at year `years`"""
+    return (curve_discount_factors(points, years)[-1] ** (1 / years) - 1) * 100
+
+
+def shifted_curves(rates, proportional=(), twist=()):
+    """Scenario curves, one row each: rates × (1 + p) for every proportional
+    shift p (each rate moves by the same share of itself, not the same
+    amount), then rates × (1 + t × s) for every twist t, where s runs from -1
+    in year 1 to +1 in the last year (short rates down and long rates up for t > 0)."""
+    rates = np.asarray(rates, dtype=float)
+    slope = np.linspace(-1.0, 1.0, len(rates)) if len(rates) > 1 else np.zeros(len(rates))
+    proportional = np.asarray(proportional, dtype=float).reshape(-1, 1)
+    twist = np.asarray(twist, dtype=float).reshape(-1, 1)
+    return np.vstack([rates * (1 + proportional), rates * (1 + twist * slope)])
+
+
+def scenario_npvs(cashflows, rate_scenarios):
+    """NPV of cashflows (years 0..N) under each row of per-year rates, in one batch"""
+    return (np.asarray(cashflows, dtype=float) / rate_factors(rate_scenarios)).sum(axis=-1)
@@ -0,0 +1,120 @@
+"""Start timing: NPV when the project, or part of it, starts 0..K years later.
+
+Delaying is a shift plus re-discounting, so every delay is evaluated at once:
+each delayed stream becomes a (delays × years) matrix and all its NPVs come
+from one division by the discount factors.
+
+- Whole project: everything moves k years later, the duration stays the same.
+- CAPEX, Revenue, Expenses: only that stream moves, and the project runs on
+  until its last amount: what would fall after the last project year falls
+  in the years after it, so no cash is dropped.
+
+Discounting beyond the last project year uses the last year's rate.
+"""
+import numpy as np
+
+from .cashflow import capex_amounts, yearly_amounts, discount_factors_for
+from .curve import rate_factors
+from .tax import income_tax
+
+DEFERRAL_STREAMS = ('Whole Project', 'CAPEX', 'Revenue', 'Expenses')
+
+
+def shifted(amounts, max_delay, length=None):
+    """Rows of amounts moved 0..max_delay places later, each row `length` long"""
+    amounts = np.asarray(amounts, dtype=float)
+    length = length or len(amounts) + max_delay
+    source = np.arange(length)[None, :] - np.arange(max_delay + 1)[:, None]
+    valid = (source >= 0) & (source < len(amounts))
+    return np.where(valid, amounts[np.clip(source, 0, len(amounts) - 1)], 0.0)
+
+
+def extended_factors(rate, years, extra_years):
+    """Discount factors for years 0..years + extra_years (the last rate held after the last year)"""
+    rates = np.asarray(rate, dtype=float)
+    if rates.ndim == 0:
+        return np.asarray(discount_factors_for(float(rate), years + extra_years))
+    return rate_factors(np.concatenate([rates, np.full(extra_years, rates[-1])]))
+
+
+def deferral_npvs(capex, cash_in, cash_out, years, rate, max_delay, tax_rate=None, deductions=None):
+    """NPV for each stream of DEFERRAL_STREAMS delayed 0..max_delay years.
+
+    Inputs are as for run_sensitivity_analysis (capex for years 0..years,
+    cash_in / cash_out for years 1..years, rate a MARR or per-year rates, and
+    optionally the tax rate and deductions, which move with CAPEX). Returns
+    {stream: [NPV at delay 0, 1, ..., max_delay]}.
+    """
+    capex = capex_amounts(capex, years)
+    operating_in = np.concatenate([[0.0], yearly_amounts(cash_in, years)])
+    operating_out = np.concatenate([[0.0], yearly_amounts(cash_out, years)])
+    deductions = np.zeros(years + 1) if deductions is None else np.asarray(deductions, dtype=float)
+
+    # Per scenario row: CAPEX, revenue, expenses and deductions for years 0..years + max_delay
+    width = years + 1 + max_delay
+    pad = lambda amounts: np.tile(np.concatenate([amounts, np.zeros(max_delay)]), (max_delay + 1, 1))
+    base = [pad(capex), pad(operating_in), pad(operating_out), pad(deductions)]
+    delayed = [shifted(stream, max_delay, width) for stream in (capex, operating_in, operating_out, deductions)]
+
+    scenarios = {
+        'Whole Project': delayed,
+        'CAPEX': [delayed[0], base[1], base[2], delayed[3]],
+        'Revenue': [base[0], delayed[1], base[2], base[3]],
+        'Expenses': [base[0], base[1], delayed[2], base[3]],
+    }
+    factors = extended_factors(rate, years, max_delay)
+
+    npvs = {}
+    for stream, (capex_rows, in_rows, out_rows, deduction_rows) in scenarios.items():
+        cashflows = in_rows - out_rows - capex_rows
+        if tax_rate is not None:
+            taxable = in_rows - out_rows - deduction_rows
+            cashflows = cashflows - np.array([income_tax(row, tax_rate) for row in taxable])
+        npvs[stream] = (cashflows / factors).sum(axis=1).tolist()
+    return npvs
+
+
+def item_deferral_npvs(item_flows, discount_factors, max_delay):
+    """NPV change from delaying each item alone by 0..max_delay years.
+
+    item_flows holds each item's signed cash flow for years 0..N (CAPEX
+    negative); flows moved past year N fall after it, discounted at the last
+    year's rate. Returns an array of shape (items, max_delay + 1), pre-tax.
+    """
+    item_flows = np.asarray(item_flows, dtype=float)
+    factors = np.asarray(discount_factors, dtype=float)
+    n_years = len(factors)
+    last_growth = factors[-1] / factors[-2] if n_years > 1 else 1.0
+
+    # weights[t, k]: present value of 1 paid in year t moved k years later
+    target = np.arange(n_years)[:, None] + np.arange(max_delay + 1)[None, :]
+    beyond = np.maximum(target - (n_years - 1), 0)
+    weights = 1 / (factors[np.minimum(target, n_years - 1)] * last_growth ** beyond)
+    present_values = item_flows @ weights
+    return present_values - present_values[:, :1]
+
+
+def delay_summary(npvs):
+    """Best delay for NPVs by delay 0..K, and the NPV lost by each further year of delay"""
+    npvs = np.asarray(npvs, dtype=float)
+    best = int(np.argmax(npvs))
+    return {
+        'best_delay': best,
+        'best_npv': float(npvs[best]),
+        'delay_costs': (npvs[:-1] - npvs[1:]).tolist(),
+    }
+
+
+def deferral_for(result, max_delay=5):
+    """deferral_npvs() for a result of evaluate_project()"""
+    after_tax = 'tax' in result
+    return deferral_npvs(
+        result['capex_schedule'],
+        result['cash_in_schedule'],
+        result['cash_out_schedule'],
+        result['project_years'],
+        result['discount_rates'] if result['discount_curve'] else result['discount_rate'],
+        max_delay,
+        result['tax_rate'] if after_tax else None,
+        np.subtract(result['depreciation'], result['disposal_gains']) if after_tax else None,
+    )
@@ -0,0 +1,121 @@
+"""Per-item escalation: every operating item's amount in each year as one items × years matrix.
+
+An item may carry, besides volume and price:
+
+- growth:      yearly growth in percent (the section's growth rate when missing)
+- start_year / end_year: the years the item runs (default: the whole project)
+- steps:       {year: percent} one-off level changes from that year on
+- overrides:   {year: amount} the item's amount in that year, as given
+
+The amount in year y is volume × price × (1 + growth)^(y-1) × every step at or
+before y, zero outside start_year..end_year, unless an override sets it. The
+cash flow table, the Excel export and the metrics all read the same matrix.
+"""
+import re
+
+import numpy as np
+
+from .cashflow import calculate_total
+
+ESCALATION_FIELDS = ('growth', 'start_year', 'end_year', 'steps', 'overrides')
+
+_ADJUSTMENT = re.compile(r'^\s*(\d+)\s*(?::\s*([+-]?\d+(?:\.\d+)?)\s*%|=\s*([+-]?\d+(?:\.\d+)?))\s*$')
+
+
+def has_escalation(item):
+    """Whether an item has any escalation setting"""
+    return any(item.get(field) not in (None, {}, '') for field in ESCALATION_FIELDS)
+
+
+def parse_adjustments(text):
+    """(steps, overrides) from text like "3:+10%, 5=25000000".
+
+    "Y:±P%" changes the item's level by P percent from year Y on, "Y=A" sets
+    its amount in year Y to A. Raises ValueError for anything else.
+    """
+    steps, overrides = {}, {}
+    for entry in re.split(r'[,;]', text or ''):
+        if not entry.strip():
+            continue
+        match = _ADJUSTMENT.match(entry)
+        if not match or int(match.group(1)) < 1:
+            raise ValueError(f"'{entry.strip()}' is not 'year:+percent%' or 'year=amount'")
+        year = str(int(match.group(1)))
+        if match.group(2) is not None:
+            steps[year] = float(match.group(2))
+        else:
+            overrides[year] = float(match.group(3))
+    return steps, overrides
+
+
+def format_adjustments(item):
+    """Text form of an item's steps and overrides (see parse_adjustments)"""
+    entries = [(int(year), f"{int(year)}:{percent:+g}%") for year, percent in (item.get('steps') or {}).items()]
+    entries += [(int(year), f"{int(year)}={amount:.15g}") for year, amount in (item.get('overrides') or {}).items()]
+    return ', '.join(text for _, text in sorted(entries))
+
+
+def _year_value(value, default):
+    try:
+        return int(value) if value not in (None, '') else default
+    except (TypeError, ValueError):
+        return default
+
+
+def escalation_matrix(items, years, default_growth=0.0):
+    """Amounts of items in years 1..years as a float array of shape (len(items), years).
+
+    default_growth (decimal) applies to items without their own growth.
+    """
+    n = len(items)
+    base = np.fromiter((calculate_total(item) for item in items), dtype=float, count=n)
+    growth = np.full(n, float(default_growth))
+    start = np.ones(n, dtype=int)
+    end = np.full(n, years, dtype=int)
+    step_rows, step_cols, step_factors = [], [], []
+    override_rows, override_cols, override_values = [], [], []
+
+    # Only items with settings are visited; the rest use the defaults above
+    for i, item in enumerate(items):
+        if not has_escalation(item):
+            continue
+        if item.get('growth') not in (None, ''):
+            growth[i] = float(item['growth']) / 100.0
+        start[i] = _year_value(item.get('start_year'), 1)
+        end[i] = _year_value(item.get('end_year'), years)
+        for year, percent in (item.get('steps') or {}).items():
+            if 1 <= int(year) <= years:
+                step_rows.append(i)
+                step_cols.append(int(year) - 1)
+                step_factors.append(1 + float(percent) / 100.0)
+        for year, amount in (item.get('overrides') or {}).items():
+            if 1 <= int(year) <= years:
+                override_rows.append(i)
+                override_cols.append(int(year) - 1)
+                override_values.append(float(amount))
+
+    # One growth curve per distinct rate, gathered per item
+    rates, rate_index = np.unique(growth, return_inverse=True)
+    curves = (1 + rates)[:, None] ** np.arange(years, dtype=float)
+    matrix = base[:, None] * curves[rate_index.reshape(-1)]
+
+    if step_rows:
+        step_matrix = np.ones((n, years))
+        np.multiply.at(step_matrix, (step_rows, step_cols), step_factors)
+        matrix *= np.cumprod(step_matrix, axis=1)
+
+    if (start > 1).any() or (end < years).any():
+        year_numbers = np.arange(1, years + 1)
+        matrix *= (year_numbers >= start[:, None]) & (year_numbers <= end[:, None])
+
+    if override_rows:
+        matrix[override_rows, override_cols] = override_values
+    return matrix
+
+
+def operating_matrices(project, years, growth_in=0.0, growth_out=0.0):
+    """Escalation matrices of a project's revenue and cost items (growth as decimals)"""
+    return (
+        escalation_matrix(project.get('opex_cash_in', []), years, growth_in),
+        escalation_matrix(project.get('opex_cash_out', []), years, growth_out),
+    )
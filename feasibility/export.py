@@ -0,0 +1,186 @@
+"""Formatted Excel workbook for a project (openpyxl is imported on first use)."""
+import io
+from datetime import datetime
+from functools import lru_cache
+
+from .capex import capex_matrix
+from .cashflow import calculate_total
+from .escalation import operating_matrices
+from .metrics import evaluate_project
+
+
+@lru_cache(maxsize=None)
+def excel_styles():
+    """Shared openpyxl style objects for the Excel export (immutable, reused across exports)"""
+    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+
+    thin = Side(style='thin')
+    return {
+        'title_font': Font(bold=True, size=16, color="FFFFFF"),
+        'title_fill': PatternFill(start_color="1f77b4", end_color="1f77b4", fill_type="solid"),
+        'title_alignment': Alignment(horizontal='center', vertical='center'),
+        'center': Alignment(horizontal='center'),
+        'info_font': Font(size=10, color="666666"),
+        'timestamp_font': Font(size=10, color="999999"),
+        'header_font': Font(bold=True),
+        'header_fill': PatternFill(start_color="ecf0f1", end_color="ecf0f1", fill_type="solid"),
+        'section_font': Font(bold=True, size=12),
+        'border': Border(left=thin, right=thin, top=thin, bottom=thin),
+    }
+
+
+def section_fill(color):
+    """Solid fill for an Excel section title"""
+    from openpyxl.styles import PatternFill
+    return PatternFill(start_color=color, end_color=color, fill_type="solid")
+
+
+def export_to_excel(project, result=None):
+    """Cash flow analysis workbook for a project dict, as a BytesIO.
+
+    result is the project's evaluate_project() output; it is computed when not given.
+    """
+    from openpyxl import Workbook
+    from openpyxl.utils import get_column_letter
+    styles = excel_styles()
+
+    if result is None:
+        result = evaluate_project(project)
+    project_years = result['project_years']
+    discount_rate = result['discount_rate']
+
+    # Create workbook
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Cash Flow Analysis"
+
+    cashflows = result['cashflows']
+    discount_factors = result['discount_factors']
+    discounted_cashflows = result['discounted_cashflows']
+    cumulative_cashflows = result['cumulative_cashflows']
+
+    # Create headers
+    years_labels = ['Tahun 0'] + [f'Tahun {i+1}' for i in range(project_years)]
+    headers = ['Description', 'Total'] + years_labels
+    last_column = get_column_letter(len(headers))
+
+    # Add title
+    ws.merge_cells(f'A1:{last_column}1')
+    title_cell = ws['A1']
+    title_cell.value = "CASH FLOW ANALYSIS (ARUS KAS)"
+    title_cell.alignment = styles['title_alignment']
+    title_cell.fill = styles['title_fill']
+    title_cell.font = styles['title_font']
+
+    # Add project info
+    ws.merge_cells(f'A2:{last_column}2')
+    rates = result['discount_rates']
+    rate_text = f"{rates[0]:g}%-{rates[-1]:g}% (curve)" if result['discount_curve'] else f"{discount_rate}%"
+    ws['A2'].value = f"Project Duration: {project_years} years | Discount Rate: {rate_text}"
+    ws['A2'].alignment = styles['center']
+    ws['A2'].font = styles['info_font']
+
+    # Add timestamp
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    ws.merge_cells(f'A3:{last_column}3')
+    ws['A3'].value = f"Generated: {timestamp}"
+    ws['A3'].alignment = styles['center']
+    ws['A3'].font = styles['timestamp_font']
+
+    # Add headers
+    for col, header in enumerate(headers, 1):
+        cell = ws.cell(row=5, column=col, value=header)
+        cell.font = styles['header_font']
+        cell.fill = styles['header_fill']
+        cell.border = styles['border']
+
+    current_row = 6
+
+    # Function to add section with color
+    def add_section(title, data, color="FFFFFF"):
+        nonlocal current_row
+
+        # Add section title
+        ws.merge_cells(f'A{current_row}:{last_column}{current_row}')
+        title_cell = ws.cell(row=current_row, column=1, value=title)
+        title_cell.font = styles['section_font']
+        title_cell.fill = section_fill(color)
+        title_cell.alignment = styles['center']
+        current_row += 1
+
+        # Add data rows
+        for row_data in data:
+            for col, value in enumerate(row_data, 1):
+                cell = ws.cell(row=current_row, column=col, value=value)
+                cell.border = styles['border']
+                if isinstance(value, (int, float)) and value != '':
+                    cell.number_format = '#,##0'
+            current_row += 1
+
+        current_row += 1  # Add spacing
+
+    # CAPEX Section (Light Blue): purchases and residual values in the years they happen
+    capex_items = project.get('capex_items', [])
+    capex_by_item = capex_matrix(capex_items, project_years)
+    blank_zero = lambda amounts: [amounts[0]] + [amount if amount else '' for amount in amounts[1:]]
+
+    capex_data = [[f"  {item['name']}", -calculate_total(item)] + blank_zero((-capex_by_item[i]).tolist())
+                  for i, item in enumerate(capex_items)]
+    capex_total = -sum(calculate_total(item) for item in capex_items)
+    capex_data.append(['Total CAPEX', capex_total] + blank_zero((-capex_by_item.sum(axis=0)).tolist()))
+    add_section('CAPITAL EXPENDITURE (CAPEX)', capex_data, "DDEBF7")
+
+    # OPEX sections: one row per item from the escalation matrices the metrics use
+    cash_in_matrix, cash_out_matrix = operating_matrices(
+        project, project_years, result['opex_in_growth'] / 100.0, result['opex_out_growth'] / 100.0
+    )
+
+    def opex_rows(items, matrix, sign, total_label):
+        rows = [[f"  {item['name']}", sign * calculate_total(item), ''] + (sign * matrix[i]).tolist()
+                for i, item in enumerate(items)]
+        rows.append([total_label, '', ''] + (sign * matrix.sum(axis=0)).tolist())
+        return rows
+
+    # OPEX Cash In Section (Light Green)
+    cashin_data = opex_rows(project.get('opex_cash_in', []), cash_in_matrix, 1, 'Total Revenue')
+    add_section('OPERATIONAL REVENUE (OPEX - Cash In)', cashin_data, "D4E6C4")
+
+    # OPEX Cash Out Section (Light Red)
+    cashout_data = opex_rows(project.get('opex_cash_out', []), cash_out_matrix, -1, 'Total Expenses')
+    add_section('OPERATIONAL EXPENSES (OPEX - Cash Out)', cashout_data, "F8D7DA")
+
+    # Income Tax Section (Light Grey), after-tax analysis only
+    if 'tax' in result:
+        tax_data = [
+            ['  Depreciation', -sum(result['depreciation'])] + [-amount for amount in result['depreciation']],
+            ['  Taxable Income', ''] + result['taxable_income'],
+            [f"  Income Tax ({result['tax_rate']:g}%)", -sum(result['tax'])] + [-amount for amount in result['tax']],
+        ]
+        add_section('INCOME TAX', tax_data, "E7E6E6")
+
+    # Financial Summary Section (Light Yellow)
+    summary_data = [
+        ['NET CASH FLOW (AFTER TAX)' if 'tax' in result else 'NET CASH FLOW', ''] + cashflows,
+        *([['DISCOUNT RATE (%)', '', ''] + result['discount_rates']] if result['discount_curve'] else []),
+        ['DISCOUNT FACTOR (RATE CURVE)' if result['discount_curve'] else f'DISCOUNT FACTOR (MARR {discount_rate}%)', ''] + discount_factors,
+        ['DISCOUNTED CASH FLOW', ''] + discounted_cashflows,
+        ['CUMULATIVE CASH FLOW', ''] + cumulative_cashflows,
+        ['NPV', result['npv']] + [''] * len(years_labels),
+        ['IRR', f"{result['irr']*100:.2f}%"] + [''] * len(years_labels),
+        ['Payback Period', f"{result['payback_period']:.2f} years"] + [''] * len(years_labels)
+    ]
+    add_section('FINANCIAL SUMMARY', summary_data, "FFF2CC")
+
+    # Adjust column widths
+    for col in range(1, len(headers) + 1):
+        if col == 1:  # Description column
+            ws.column_dimensions[get_column_letter(col)].width = 40
+        else:
+            ws.column_dimensions[get_column_letter(col)].width = 15
+
+    # Save to bytes
+    excel_file = io.BytesIO()
+    wb.save(excel_file)
+    excel_file.seek(0)
+
+    return excel_file
@@ -0,0 +1,115 @@
+"""Yearly totals, NPV, cumulative cash flow and payback, kept up to date item by item.
+
+NPV is a weighted sum of the yearly totals: with w_t = 1 / discount factor of
+year t, NPV = sum_t (cash in_t - cash out_t - capex_t) × w_t. An item's edit
+changes the totals by that item's own flows alone, so ProjectFlows updates
+the totals, discounted and cumulative cash flows and payback from the item's
+change: O(years) per edit instead of O(items × years). Items without their
+own schedule or escalation are a rupiah amount times a per-section profile
+(year 0 for CAPEX, the section's growth curve for operating items), so their
+flows need no escalation at all.
+
+Only the horizon, discount rate/curve, growth and tax settings need a full
+rebuild; they are held in key. After tax, the income tax is recomputed from
+the updated totals (losses carried forward make it non-linear), which is
+still O(years).
+"""
+import numpy as np
+
+from .capex import capex_schedule, has_capex_schedule
+from .cashflow import calculate_total, discount_factors_for
+from .curve import curve_discount_factors
+from .escalation import escalation_matrix, has_escalation
+from .metrics import calculate_payback_period
+from .project import project_settings
+from .tax import tax_deductions, income_tax
+
+
+def settings_key(settings):
+    """The settings a ProjectFlows depends on, as a hashable tuple"""
+    return tuple(settings[key] for key in sorted(settings))
+
+
+class ProjectFlows:
+    """Yearly flows of a project (years 0..N) updated one item change at a time"""
+
+    def __init__(self, project):
+        settings = project_settings(project)
+        self.key = settings_key(settings)
+        self.years = years = settings['project_years']
+        self.tax_rate = settings['tax_rate'] if settings['after_tax'] else None
+        self.depreciation_method = settings['depreciation_method']
+        self.growth = {'opex_cash_in': settings['opex_in_growth'] / 100.0,
+                       'opex_cash_out': settings['opex_out_growth'] / 100.0}
+
+        factors = (curve_discount_factors(settings['discount_curve'], years) if settings['discount_curve']
+                   else discount_factors_for(settings['discount_rate'], years))
+        self.weights = 1 / np.asarray(factors, dtype=float)
+
+        # Flows of 1 rupiah of an item without its own settings, per section
+        self.profiles = {'capex_items': np.eye(1, years + 1).ravel()}
+        for section, growth in self.growth.items():
+            self.profiles[section] = np.concatenate([[0.0], (1 + growth) ** np.arange(years, dtype=float)])
+
+        self.schedules = {'capex_items': capex_schedule(project.get('capex_items', []), years)}
+        for section, growth in self.growth.items():
+            matrix = escalation_matrix(project.get(section, []), years, growth)
+            self.schedules[section] = np.concatenate([[0.0], matrix.sum(axis=0)])
+
+        self.deductions = None
+        if self.tax_rate is not None:
+            depreciation, gains = tax_deductions(project.get('capex_items', []), years, self.depreciation_method)
+            self.deductions = depreciation - gains
+        self._recompute()
+
+    def item_flows(self, section, item):
+        """One item's amounts for years 0..N (zeros for None)"""
+        if item is None:
+            return np.zeros(self.years + 1)
+        if section == 'capex_items':
+            if has_capex_schedule(item):
+                return capex_schedule([item], self.years)
+        elif has_escalation(item):
+            return np.concatenate([[0.0], escalation_matrix([item], self.years, self.growth[section])[0]])
+        return calculate_total(item) * self.profiles[section]
+
+    def replace_item(self, section, old, new):
+        """Apply one item's change (old/new item dicts; None for an added/removed item)"""
+        delta = self.item_flows(section, new) - self.item_flows(section, old)
+        self.schedules[section] += delta
+
+        if self.tax_rate is not None:
+            if section == 'capex_items':
+                for item, sign in ((new, 1.0), (old, -1.0)):
+                    if item is not None:
+                        depreciation, gains = tax_deductions([item], self.years, self.depreciation_method)
+                        self.deductions += sign * (depreciation - gains)
+            self._recompute()
+            return
+
+        # Pre-tax the cash flow is linear in the item: shift everything by its change
+        change = delta if section == 'opex_cash_in' else -delta
+        discounted_change = change * self.weights
+        self.pre_tax_cashflows += change
+        self.cashflows = self.pre_tax_cashflows
+        self.discounted_cashflows += discounted_change
+        self.cumulative_cashflows += np.cumsum(discounted_change)
+        self._update_metrics()
+
+    def _recompute(self):
+        self.pre_tax_cashflows = (self.schedules['opex_cash_in'] - self.schedules['opex_cash_out']
+                                  - self.schedules['capex_items'])
+        self.cashflows = self.pre_tax_cashflows
+        self.tax = None
+        if self.tax_rate is not None:
+            # Taxable income excludes CAPEX, which is deducted through depreciation
+            taxable_income = self.schedules['opex_cash_in'] - self.schedules['opex_cash_out'] - self.deductions
+            self.tax = income_tax(taxable_income, self.tax_rate)
+            self.cashflows = self.pre_tax_cashflows - self.tax
+        self.discounted_cashflows = self.cashflows * self.weights
+        self.cumulative_cashflows = np.cumsum(self.discounted_cashflows)
+        self._update_metrics()
+
+    def _update_metrics(self):
+        self.npv = float(self.cumulative_cashflows[-1])
+        self.payback_period = calculate_payback_period(self.cumulative_cashflows)
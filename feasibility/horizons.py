@@ -0,0 +1,93 @@
+"""NPV, IRR and payback for every project duration at once.
+
+Stopping the project after year h keeps the first h + 1 cash flows of the
+longest horizon, plus what its CAPEX returns in year h: purchases still in
+use return their book value then instead of later (see feasibility.capex).
+So one evaluation at the longest horizon and one purchases × horizons array
+of those values give every duration. After tax, disposal gains and losses
+carried forward change with the duration, so each duration is evaluated on
+its own.
+"""
+import numpy as np
+
+from .capex import truncated_end_values
+from .metrics import calculate_payback_period, evaluate_project
+
+DEFAULT_MAX_HORIZON = 30
+
+
+def horizon_cashflows(cashflows, end_values=None):
+    """Cash flows of the project stopped after each year 1..N, one row per
+    duration (zeros after it), with end_values[h] added in year h"""
+    cashflows = np.asarray(cashflows, dtype=float)
+    horizons = np.arange(1, len(cashflows))
+    rows = np.where(np.arange(len(cashflows))[None, :] <= horizons[:, None], cashflows, 0.0)
+    if end_values is not None:
+        rows[horizons - 1, horizons] += np.asarray(end_values, dtype=float)[1:]
+    return rows
+
+
+def truncated_irrs(rows, low=-0.99, high=10.0, iterations=100):
+    """IRR of each row of horizon_cashflows(), solved together by bisection.
+
+    NaN where a row's cash flows have no IRR in (low, high).
+    """
+    rows = np.asarray(rows, dtype=float)
+    years = np.arange(rows.shape[1])
+
+    def npvs(rates):
+        return (rows / (1 + rates[:, None]) ** years).sum(axis=1)
+
+    lo, hi = np.full(len(rows), low), np.full(len(rows), high)
+    npv_lo, npv_hi = npvs(lo), npvs(hi)
+    solvable = np.sign(npv_lo) != np.sign(npv_hi)
+    for _ in range(iterations):
+        mid = (lo + hi) / 2
+        npv_mid = npvs(mid)
+        same_side = np.sign(npv_mid) == np.sign(npv_lo)
+        lo, npv_lo = np.where(same_side, mid, lo), np.where(same_side, npv_mid, npv_lo)
+        hi = np.where(same_side, hi, mid)
+    return np.where(solvable, (lo + hi) / 2, np.nan)
+
+
+def horizon_metrics(rows, discount_factors):
+    """NPV, IRR and payback for each duration's cash flows (rows of horizon_cashflows()).
+
+    Returns a dict of per-horizon lists (horizons, npv, irr, payback_period
+    (NaN until paid back), paid_back) plus best_horizon (highest NPV) and
+    first_payback_horizon (None if never paid back).
+    """
+    rows = np.asarray(rows, dtype=float)
+    cumulative = np.cumsum(rows / np.asarray(discount_factors, dtype=float)[:len(rows) + 1], axis=1)
+    horizons = np.arange(1, len(rows) + 1)
+    npv = cumulative[horizons - 1, horizons]
+
+    # Paid back by year h once the cumulative value has reached zero at or before h
+    reached = np.maximum.accumulate(cumulative >= 0, axis=1)
+    paid_back = reached[horizons - 1, horizons]
+    payback_periods = np.array([
+        calculate_payback_period(cumulative[h - 1, :h + 1].tolist()) if paid else np.nan
+        for h, paid in zip(horizons, paid_back)
+    ])
+
+    return {
+        'horizons': horizons.tolist(),
+        'npv': npv.tolist(),
+        'irr': truncated_irrs(rows).tolist(),
+        'payback_period': payback_periods.tolist(),
+        'paid_back': paid_back.tolist(),
+        'best_horizon': int(horizons[np.argmax(npv)]) if len(npv) else None,
+        'first_payback_horizon': int(horizons[paid_back][0]) if paid_back.any() else None,
+    }
+
+
+def horizon_profile(project, max_years=DEFAULT_MAX_HORIZON):
+    """horizon_metrics() for a project dict, for durations 1..max_years"""
+    result = evaluate_project({**project, 'project_years': max_years})
+    if 'tax' in result:
+        rows = np.zeros((max_years, max_years + 1))
+        for h in range(1, max_years + 1):
+            rows[h - 1, :h + 1] = evaluate_project({**project, 'project_years': h})['cashflows']
+    else:
+        rows = horizon_cashflows(result['cashflows'], truncated_end_values(project.get('capex_items', []), max_years))
+    return horizon_metrics(rows, result['discount_factors'])
@@ -0,0 +1,132 @@
+"""NPV, IRR and payback period, plus a one-call project evaluation."""
+from functools import lru_cache
+
+import numpy as np
+
+from .cashflow import (
+    section_totals,
+    project_cashflows,
+    discount_factors_for,
+    calculate_discounted_cashflow,
+    calculate_cumulative_cashflow,
+)
+from .capex import capex_schedule, purchase_schedule
+from .curve import curve_rates, curve_discount_factors
+from .escalation import operating_matrices
+from .project import project_settings
+from .tax import tax_deductions, after_tax_schedule
+
+
+def calculate_npv(discounted_cashflows):
+    """Calculate Net Present Value"""
+    try:
+        return sum(discounted_cashflows)
+    except Exception:
+        return 0
+
+
+@lru_cache(maxsize=None)
+def irr_solver():
+    """IRR function, resolved once per process (numpy_financial, or numpy < 1.20)"""
+    try:
+        from numpy_financial import irr
+        return irr
+    except ImportError:
+        import numpy as np
+        return getattr(np, 'irr', None)
+
+
+def calculate_irr(cashflows):
+    """Calculate Internal Rate of Return"""
+    try:
+        return irr_solver()(cashflows)
+    except Exception:
+        return 0.0
+
+
+def calculate_payback_period(cumulative_cashflows):
+    """Calculate Payback Period (the project length if it never pays back)"""
+    try:
+        for i, cumulative in enumerate(cumulative_cashflows):
+            if cumulative >= 0:
+                if i == 0:
+                    return 0
+                # Linear interpolation for more accurate payback period
+                prev_cumulative = cumulative_cashflows[i-1]
+                curr_cumulative = cumulative
+                if curr_cumulative - prev_cumulative != 0:
+                    fraction = abs(prev_cumulative) / (curr_cumulative - prev_cumulative)
+                    return i - 1 + fraction
+        return len(cumulative_cashflows) - 1  # If never positive
+    except Exception:
+        return 0
+
+
+def evaluate_project(project):
+    """Full cash flow and metrics for a project dict.
+
+    The project uses the app's save format (capex_items, opex_cash_in,
+    opex_cash_out, project_years, discount_rate) plus optional opex_in_growth /
+    opex_out_growth in percent. CAPEX items follow their own purchase schedule
+    (see feasibility.capex) and operating items their own escalation settings
+    (see feasibility.escalation).
+
+    A discount_curve of (year, rate) points replaces discount_rate for
+    discounting (see feasibility.curve). With after_tax set, cashflows are after income tax (see feasibility.tax)
+    and the result also holds pre_tax_cashflows, depreciation, disposal_gains,
+    taxable_income and tax per year.
+    """
+    settings = project_settings(project)
+    totals = section_totals(project)
+    years = settings['project_years']
+
+    cash_in_matrix, cash_out_matrix = operating_matrices(
+        project, years, settings['opex_in_growth'] / 100.0, settings['opex_out_growth'] / 100.0
+    )
+    cash_in_schedule = cash_in_matrix.sum(axis=0)
+    cash_out_schedule = cash_out_matrix.sum(axis=0)
+
+    capex = capex_schedule(project.get('capex_items', []), years)
+
+    cashflows = project_cashflows(capex, cash_in_schedule, cash_out_schedule, years)
+    tax_results = {}
+    if settings['after_tax']:
+        depreciation, disposal_gains = tax_deductions(project.get('capex_items', []), years, settings['depreciation_method'])
+        taxable_income, tax = after_tax_schedule(capex, cashflows, depreciation - disposal_gains, settings['tax_rate'])
+        tax_results = {
+            'pre_tax_cashflows': cashflows,
+            'depreciation': depreciation.tolist(),
+            'disposal_gains': disposal_gains.tolist(),
+            'taxable_income': taxable_income.tolist(),
+            'tax': tax.tolist(),
+        }
+        cashflows = (np.asarray(cashflows) - tax).tolist()
+
+    if settings['discount_curve']:
+        discount_rates = curve_rates(settings['discount_curve'], years)
+        discount_factors = curve_discount_factors(settings['discount_curve'], years)
+    else:
+        discount_rates = np.full(years, settings['discount_rate'])
+        discount_factors = discount_factors_for(settings['discount_rate'], years)
+    discounted_cashflows = calculate_discounted_cashflow(cashflows, discount_factors)
+    cumulative_cashflows = calculate_cumulative_cashflow(discounted_cashflows)
+
+    return {
+        **settings,
+        'capex': totals['capex_items'],
+        'annual_revenue': totals['opex_cash_in'],
+        'annual_expenses': totals['opex_cash_out'],
+        'capex_schedule': capex.tolist(),
+        'purchase_schedule': purchase_schedule(project.get('capex_items', []), years).tolist(),
+        'cash_in_schedule': cash_in_schedule.tolist(),
+        'cash_out_schedule': cash_out_schedule.tolist(),
+        'cashflows': cashflows,
+        'discount_rates': discount_rates.tolist(),
+        'discount_factors': discount_factors,
+        'discounted_cashflows': discounted_cashflows,
+        'cumulative_cashflows': cumulative_cashflows,
+        'npv': calculate_npv(discounted_cashflows),
+        'irr': float(calculate_irr(cashflows)),
+        'payback_period': calculate_payback_period(cumulative_cashflows),
+        **tax_results,
+    }
@@ -0,0 +1,186 @@
+"""Optional CAPEX: which optional items to buy for the highest NPV within a CAPEX budget.
+
+A CAPEX item marked optional may list, in enables, the names of the revenue
+and expense items that exist only when it is bought. An operating item listed
+by several optional items needs all of them. Items that are not optional are
+always bought and count against the budget first; the budget is a ceiling on
+the project's CAPEX purchases (residual values do not add to it).
+
+Each item's cash flows are discounted once, so the NPV of any choice is a sum
+of present values. The best choice is found by branch and bound over the
+optional items: in order of value per rupiah, with a fractional-knapsack
+bound, stopped after MAX_NODES nodes or MAX_SECONDS with the best choice
+found and the bound no choice can exceed. An item's cost against the budget
+is the sum of its purchases (every one of a recurring item's). Choices are
+made on pre-tax values; optional_capex_for() reports the NPV of the chosen
+project with the project's own settings (after tax if set).
+"""
+import time
+
+import numpy as np
+
+from .attribution import item_contributions
+from .capex import capex_matrix, purchase_matrix
+from .escalation import operating_matrices
+from .metrics import evaluate_project
+
+OPTION_FIELDS = ('optional', 'enables')
+MAX_NODES = 500_000
+MAX_SECONDS = 2.0
+
+
+def parse_enables(text):
+    """Item names from "Name A; Name B" text (or a list), blanks dropped"""
+    names = text if isinstance(text, (list, tuple)) else str(text or '').split(';')
+    return [name.strip() for name in names if str(name).strip()]
+
+
+def format_enables(item):
+    """An item's enables list as "Name A; Name B" text"""
+    return '; '.join(parse_enables(item.get('enables')))
+
+
+def option_links(capex_items, operating_items):
+    """(optional, requirements): positions of the optional CAPEX items, and for
+    each operating item the positions in optional it needs (empty: always there)"""
+    optional = [i for i, item in enumerate(capex_items) if item.get('optional')]
+    enabling = {}
+    for position, i in enumerate(optional):
+        for name in parse_enables(capex_items[i].get('enables')):
+            enabling.setdefault(name, set()).add(position)
+    requirements = [frozenset(enabling.get(str(item.get('name', '')).strip(), ())) for item in operating_items]
+    return optional, requirements
+
+
+def select_options(capex_pv, capex_costs, operating_pv, optional, requirements, budget,
+                   max_nodes=MAX_NODES, max_seconds=MAX_SECONDS):
+    """The optional CAPEX items to buy for the highest NPV within budget.
+
+    capex_pv / capex_costs: present value and total purchases of every CAPEX item;
+    operating_pv: signed present value of every operating item (expenses
+    negative); optional, requirements: from option_links(). Returns a dict with
+    selected (CAPEX item positions), npv, npv_without (no optional items),
+    capex, optimal, bound (the highest NPV any choice could reach; npv when
+    optimal), gap (bound - npv as a share of |bound|) and nodes; selected is
+    None when the items that are not optional already exceed the budget.
+    """
+    capex_pv = np.asarray(capex_pv, dtype=float)
+    capex_costs = np.clip(np.asarray(capex_costs, dtype=float), 0, None)
+    operating_pv = np.asarray(operating_pv, dtype=float)
+    n = len(optional)
+    is_optional = np.zeros(len(capex_pv), dtype=bool)
+    is_optional[optional] = True
+
+    always = [o for o, needs in enumerate(requirements) if not needs]
+    npv_without = float(operating_pv[always].sum() - capex_pv[~is_optional].sum())
+    mandatory_capex = float(capex_costs[~is_optional].sum())
+    available = budget - mandatory_capex
+    if available < -1e-6:
+        return {'selected': None, 'npv': npv_without, 'npv_without': npv_without,
+                'capex': mandatory_capex, 'optimal': True, 'bound': npv_without, 'gap': 0.0, 'nodes': 0}
+
+    costs = capex_costs[optional]
+    own_value = -capex_pv[optional]
+
+    # Search order: optimistic value (own value plus the gains of what it
+    # enables) per rupiah. Each operating item is added when the last of its
+    # requirements in this order is decided.
+    optimistic = own_value.copy()
+    for o, needs in enumerate(requirements):
+        for position in needs:
+            optimistic[position] += max(operating_pv[o], 0.0)
+    order = np.argsort(-optimistic / np.maximum(costs, 1e-12), kind='stable')
+    depth = np.empty(n, dtype=int)
+    depth[order] = np.arange(n)
+    owned = [[] for _ in range(n)]
+    for o, needs in enumerate(requirements):
+        if needs:
+            masks = sum(1 << int(depth[position]) for position in needs)
+            owned[max(depth[position] for position in needs)].append((masks, operating_pv[o]))
+
+    values, weights = own_value[order], costs[order]
+    bound_values = np.maximum(optimistic[order], 0.0)
+    cum_value = np.concatenate([[0.0], np.cumsum(bound_values)])
+    cum_cost = np.concatenate([[0.0], np.cumsum(weights)])
+
+    def bound(d, remaining):
+        # Fractional knapsack of the optimistic values of items d..
+        capacity = cum_cost[d] + remaining
+        k = max(min(int(np.searchsorted(cum_cost, capacity, side='right')) - 1, n), d)
+        extra = bound_values[k] * (capacity - cum_cost[k]) / max(weights[k], 1e-12) if k < n else 0.0
+        return cum_value[k] - cum_value[d] + extra
+
+    best_value, best_mask = 0.0, 0
+    root_bound = bound(0, available)
+    stack = [(0, 0.0, available, 0)]
+    nodes = 0
+    deadline = time.perf_counter() + max_seconds
+    stopped = False
+    while stack:
+        d, value, remaining, mask = stack.pop()
+        nodes += 1
+        if nodes > max_nodes or (nodes % 1024 == 0 and time.perf_counter() > deadline):
+            stopped = True
+            break
+        if value > best_value + 1e-6:
+            best_value, best_mask = value, mask
+        if d == n or value + bound(d, remaining) <= best_value + 1e-6:
+            continue
+        stack.append((d + 1, value, remaining, mask))
+        if weights[d] <= remaining + 1e-6:
+            taken = mask | (1 << d)
+            gained = sum(pv for needs, pv in owned[d] if needs & taken == needs)
+            stack.append((d + 1, value + values[d] + gained, remaining - weights[d], taken))
+
+    chosen = sorted(int(optional[order[d]]) for d in range(n) if best_mask >> d & 1)
+    npv = float(npv_without + best_value)
+    upper = npv if not stopped else float(npv_without + max(root_bound, best_value))
+    return {
+        'selected': chosen,
+        'npv': npv,
+        'npv_without': npv_without,
+        'capex': mandatory_capex + float(capex_costs[chosen].sum()),
+        'optimal': not stopped,
+        'bound': upper,
+        'gap': (upper - npv) / abs(upper) if upper else 0.0,
+        'nodes': nodes,
+    }
+
+
+def selected_project(project, selected):
+    """The project with only the selected optional CAPEX items and what they enable"""
+    capex_items = project.get('capex_items', [])
+    operating_items = project.get('opex_cash_in', []) + project.get('opex_cash_out', [])
+    optional, requirements = option_links(capex_items, operating_items)
+    bought = {position for position, i in enumerate(optional) if i in set(selected)}
+    kept = [needs <= bought for needs in requirements]
+    n_in = len(project.get('opex_cash_in', []))
+    return {
+        **project,
+        'capex_items': [item for i, item in enumerate(capex_items) if not item.get('optional') or i in set(selected)],
+        'opex_cash_in': [item for item, keep in zip(project.get('opex_cash_in', []), kept[:n_in]) if keep],
+        'opex_cash_out': [item for item, keep in zip(project.get('opex_cash_out', []), kept[n_in:]) if keep],
+    }
+
+
+def optional_capex_for(project, budget):
+    """select_options() for a project dict; the result also holds npv_all (every
+    item bought) and, when a choice fits, evaluated_npv (the chosen project
+    evaluated with its own settings)"""
+    result = evaluate_project(project)
+    years = result['project_years']
+    capex_items = project.get('capex_items', [])
+    cash_in_matrix, cash_out_matrix = operating_matrices(
+        project, years, result['opex_in_growth'] / 100.0, result['opex_out_growth'] / 100.0
+    )
+    capex = capex_matrix(capex_items, years)
+    capex_value, revenue, expenses = item_contributions(capex, cash_in_matrix, cash_out_matrix, result['discount_factors'])
+
+    optional, requirements = option_links(capex_items, project.get('opex_cash_in', []) + project.get('opex_cash_out', []))
+    purchases = purchase_matrix(capex_items, years).sum(axis=1)
+    selection = select_options(-capex_value, purchases, np.concatenate([revenue, expenses]),
+                               optional, requirements, budget)
+    selection['npv_all'] = result['npv']
+    if selection['selected'] is not None:
+        selection['evaluated_npv'] = evaluate_project(selected_project(project, selection['selected']))['npv']
+    return selection
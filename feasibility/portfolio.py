@@ -0,0 +1,233 @@
+"""Capital rationing: the subset of projects with the highest total NPV within a CAPEX budget.
+
+The budget is either one amount for the total CAPEX of the selected projects,
+or one amount per year (year 0, 1, ...) for their CAPEX in that year; years
+past the end of the list are not limited. Projects all start in year 0, and
+only purchases count against the budget (residual values returned in a year
+do not free budget for other projects).
+
+- branch_and_bound: exact. Projects are taken in order of profitability
+  index (NPV per rupiah of budgeted CAPEX); the bound at each node is the
+  fractional knapsack of the remaining projects on the budget summed over
+  the limited years, which no selection can exceed. Per-year budgets make
+  the search much longer, so 'auto' uses it for fewer projects there, and
+  it stops after MAX_NODES nodes or MAX_SECONDS with the best selection
+  found (never worse than the greedy one).
+- greedy_selection: the same profitability-index order, taking each
+  project that still fits. Fast for thousands of projects; not always optimal.
+
+A selection that is not proven optimal comes with the fractional bound: the
+best total NPV could be at most that, so the gap to it is how far off the
+selection can be.
+"""
+import time
+
+import numpy as np
+
+EXACT_MAX_PROJECTS = 500
+EXACT_MAX_PROJECTS_PER_YEAR = 100
+MAX_NODES = 500_000
+MAX_SECONDS = 2.0
+
+
+def budget_matrix(capex, budget):
+    """(costs, limits): each project's CAPEX against each limited budget.
+
+    capex is one CAPEX total per project or one yearly schedule per project
+    of purchases only (an evaluation's purchase_schedule: residual values
+    returned would lower a year's cost); lists of different lengths are
+    padded with zeros. budget is a total or a list of yearly amounts.
+    """
+    if np.ndim(budget) == 0:
+        totals = [float(np.clip(np.asarray(c, dtype=float), 0, None).sum()) for c in capex]
+        return np.array(totals).reshape(-1, 1), np.array([float(budget)])
+
+    limits = np.asarray(budget, dtype=float)
+    costs = np.zeros((len(capex), len(limits)))
+    for i, schedule in enumerate(capex):
+        schedule = np.clip(np.atleast_1d(np.asarray(schedule, dtype=float)), 0, None)[:len(limits)]
+        costs[i, :len(schedule)] = schedule
+    return costs, limits
+
+
+def _prepared(npvs, costs, limits):
+    """Projects worth considering: (always-taken, candidates in profitability-index order)"""
+    npvs = np.asarray(npvs, dtype=float)
+    spend = costs.sum(axis=1)
+    free = (npvs > 0) & (spend == 0)
+    candidates = np.flatnonzero((npvs > 0) & (spend > 0) & (costs <= limits).all(axis=1))
+    index = npvs[candidates] / spend[candidates]
+    return np.flatnonzero(free), candidates[np.argsort(-index, kind='stable')]
+
+
+def greedy_selection(npvs, costs, limits):
+    """Indices of the projects chosen by profitability index, each taken if it still fits"""
+    free, order = _prepared(npvs, costs, limits)
+    remaining = np.asarray(limits, dtype=float).copy()
+    chosen = list(free)
+    for j in order:
+        if (costs[j] <= remaining + 1e-6).all():
+            remaining -= costs[j]
+            chosen.append(j)
+    return sorted(int(j) for j in chosen)
+
+
+def fractional_bound(values, costs, capacity):
+    """(NPV, whole, part) of the best fractions of projects within one budget:
+    the projects taken whole and the one taken in part (None if all fit)"""
+    order = np.argsort(-values / np.maximum(costs, 1e-12), kind='stable')
+    cum_costs = np.cumsum(costs[order])
+    k = int(np.searchsorted(cum_costs, capacity, side='right'))
+    whole = order[:k]
+    if k == len(order):
+        return float(values[whole].sum()), whole, None
+    spent = cum_costs[k - 1] if k else 0.0
+    part = order[k]
+    return float(values[whole].sum() + values[part] * (capacity - spent) / max(costs[part], 1e-12)), whole, part
+
+
+def surrogate_weights(values, weights, limits, iterations=200):
+    """Weights that combine yearly budgets into one budget giving a tight bound.
+
+    Any selection that fits every year also fits the combined budget. Starts
+    from each year scaled by its budget and shifts weight toward the years the
+    fractional solution overspends, keeping the weights with the lowest bound.
+    """
+    scale = 1 / np.maximum(limits, 1e-9)
+    weight = scale / scale.sum()
+    if len(limits) == 1 or not len(values):
+        return weight
+    best_weight, best_bound = weight, np.inf
+    for step in range(iterations):
+        bound, whole, part = fractional_bound(values, weights @ weight, limits @ weight)
+        if bound < best_bound:
+            best_weight, best_bound = weight, bound
+        used = weights[whole].sum(axis=0) + (weights[part] if part is not None else 0.0)
+        excess = (used - limits) * scale
+        if (excess <= 1e-9).all():
+            break  # The fractional solution fits every year: no tighter bound
+        weight = np.maximum(weight * np.exp(excess / np.sqrt(step + 1)), 1e-12)
+        weight = weight / weight.sum()
+    return best_weight
+
+
+def upper_bound(npvs, costs, limits):
+    """Total NPV no selection within the limits can exceed (the fractional bound)"""
+    npvs = np.asarray(npvs, dtype=float)
+    limits = np.asarray(limits, dtype=float)
+    free, order = _prepared(npvs, costs, limits)
+    weight = surrogate_weights(npvs[order], costs[order], limits)
+    bound, _, _ = fractional_bound(npvs[order], costs[order] @ weight, limits @ weight)
+    return float(npvs[free].sum()) + bound
+
+
+def branch_and_bound(npvs, costs, limits, max_nodes=MAX_NODES, max_seconds=MAX_SECONDS):
+    """(indices of the selection with the highest total NPV, whether proven optimal, upper bound).
+
+    The search starts from the greedy selection and stops after max_nodes
+    nodes or max_seconds with the best selection found so far.
+    """
+    npvs = np.asarray(npvs, dtype=float)
+    limits = np.asarray(limits, dtype=float)
+    free, order = _prepared(npvs, costs, limits)
+    weight = surrogate_weights(npvs[order], costs[order], limits)
+
+    # Projects in NPV-per-combined-budget order, with running sums for the bound
+    surrogate = costs[order] @ weight
+    order = order[np.argsort(-npvs[order] / np.maximum(surrogate, 1e-12), kind='stable')]
+    values, weights = npvs[order], costs[order]
+    surrogate = weights @ weight
+    cum_value = np.concatenate([[0.0], np.cumsum(values)])
+    cum_cost = np.concatenate([[0.0], np.cumsum(surrogate)])
+    n = len(order)
+
+    def bound(i, remaining):
+        # Fractional knapsack of projects i.. on the combined remaining budget
+        capacity = cum_cost[i] + remaining @ weight
+        k = max(min(int(np.searchsorted(cum_cost, capacity, side='right')) - 1, n), i)
+        extra = values[k] * (capacity - cum_cost[k]) / max(surrogate[k], 1e-12) if k < n else 0.0
+        return cum_value[k] - cum_value[i] + extra
+
+    greedy = greedy_selection(npvs, costs, limits)
+    free_npv = float(npvs[free].sum())
+    best_value = float(npvs[greedy].sum()) - free_npv
+    best_path = None
+    root_bound = free_npv + bound(0, limits)
+
+    # Depth-first, "take" before "skip"; a path is a linked list (position, parent)
+    stack = [(0, 0.0, limits.copy(), None)]
+    nodes = 0
+    deadline = time.perf_counter() + max_seconds
+    stopped = False
+    while stack:
+        i, value, remaining, path = stack.pop()
+        nodes += 1
+        if nodes > max_nodes or (nodes % 1024 == 0 and time.perf_counter() > deadline):
+            stopped = True
+            break
+        if value > best_value + 1e-6:
+            best_value, best_path = value, path
+        if i == n or value + bound(i, remaining) <= best_value + 1e-6:
+            continue
+        stack.append((i + 1, value, remaining, path))
+        if (weights[i] <= remaining + 1e-6).all():
+            stack.append((i + 1, value + values[i], remaining - weights[i], (i, path)))
+
+    if best_path is None:
+        chosen = greedy
+    else:
+        chosen = list(free)
+        while best_path is not None:
+            chosen.append(order[best_path[0]])
+            best_path = best_path[1]
+        chosen = sorted(int(j) for j in chosen)
+    return chosen, not stopped, root_bound
+
+
+def select_projects(npvs, capex, budget, method='auto'):
+    """The projects to fund within budget.
+
+    npvs: NPV per project; capex: CAPEX purchases (total or yearly schedule) per project;
+    method: 'exact', 'greedy' or 'auto' (exact up to EXACT_MAX_PROJECTS
+    projects, EXACT_MAX_PROJECTS_PER_YEAR with more than one limited year).
+    Returns a dict with selected (indices), total_npv, capex (spent per
+    limited year, or the total), method, optimal, bound (the most any
+    selection could reach) and gap (bound - total_npv as a share of bound,
+    0 when optimal).
+    """
+    if method not in ('auto', 'exact', 'greedy'):
+        raise ValueError(f"unknown selection method: {method}")
+    costs, limits = budget_matrix(capex, budget)
+    if method == 'auto':
+        exact_max = EXACT_MAX_PROJECTS if len(limits) == 1 else EXACT_MAX_PROJECTS_PER_YEAR
+        method = 'exact' if len(costs) <= exact_max else 'greedy'
+
+    if method == 'exact':
+        selected, optimal, bound = branch_and_bound(npvs, costs, limits)
+    else:
+        selected = greedy_selection(npvs, costs, limits)
+        optimal, bound = False, upper_bound(npvs, costs, limits)
+    spent = costs[selected].sum(axis=0)
+    total_npv = float(np.asarray(npvs, dtype=float)[selected].sum())
+    optimal = optimal or bound <= total_npv + 1e-6  # Reaching the bound proves it
+    if optimal:
+        bound = total_npv
+    return {
+        'selected': selected,
+        'total_npv': total_npv,
+        'capex': float(spent[0]) if np.ndim(budget) == 0 else spent.tolist(),
+        'method': method,
+        'optimal': optimal,
+        'bound': bound,
+        'gap': (bound - total_npv) / bound if bound > 0 else 0.0,
+    }
+
+
+def portfolio_for(results, budget, method='auto'):
+    """select_projects() for results of evaluate_project()"""
+    return select_projects(
+        [result['npv'] for result in results],
+        [result['purchase_schedule'] for result in results],
+        budget,
+        method,
+    )
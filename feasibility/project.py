@@ -0,0 +1,100 @@
+"""Project data: the JSON format saved by the app, loaded and validated."""
+import json
+import math
+
+from .curve import curve_points
+from .tax import DEFAULT_TAX_RATE, DEPRECIATION_METHODS
+
+DEFAULT_SETTINGS = {
+    'project_years': 5,
+    'discount_rate': 10.7,
+    'opex_in_growth': 0.0,
+    'opex_out_growth': 0.0,
+    'after_tax': False,
+    'tax_rate': DEFAULT_TAX_RATE,
+    'depreciation_method': 'straight_line',
+}
+
+MAX_PROJECT_YEARS = 50
+
+
+def project_settings(project):
+    """Project length, discount rate (or curve), growth rates and tax settings, with defaults.
+
+    Raises ValueError when a setting has the wrong type or is out of range:
+    flags must be true/false and whole-number settings whole numbers (5.0 is
+    5, 2.7 is an error); nothing is coerced silently.
+    """
+    settings = {}
+    for key, default in DEFAULT_SETTINGS.items():
+        value = project.get(key, default)
+        if isinstance(default, bool):
+            if not isinstance(value, bool):
+                raise ValueError(f"{key} must be true or false, got {value!r}")
+            settings[key] = value
+        elif isinstance(default, (int, float)):
+            if isinstance(value, bool):
+                raise ValueError(f"{key} must be a number, got {value!r}")
+            try:
+                number = float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"{key} must be a number, got {value!r}")
+            if not math.isfinite(number):
+                raise ValueError(f"{key} must be a finite number, got {value!r}")
+            if isinstance(default, int):
+                if not number.is_integer():
+                    raise ValueError(f"{key} must be a whole number, got {value!r}")
+                number = int(number)
+            settings[key] = number
+        else:
+            if not isinstance(value, str):
+                raise ValueError(f"{key} must be text, got {value!r}")
+            settings[key] = value
+
+    if not 1 <= settings['project_years'] <= MAX_PROJECT_YEARS:
+        raise ValueError(f"project_years must be between 1 and {MAX_PROJECT_YEARS}")
+    if not 0 <= settings['tax_rate'] <= 100:
+        raise ValueError("tax_rate must be between 0 and 100")
+    if settings['depreciation_method'] not in DEPRECIATION_METHODS:
+        raise ValueError(f"depreciation_method must be one of {', '.join(DEPRECIATION_METHODS)}")
+    settings['discount_curve'] = curve_points(project['discount_curve']) if project.get('discount_curve') else None
+    return settings
+
+
+ITEM_SECTIONS = ('capex_items', 'opex_cash_in', 'opex_cash_out')
+NUMBER_FIELDS = ('volume', 'price')
+MAPPING_FIELDS = ('steps', 'overrides')
+
+
+def validate_project(project):
+    """Check a project's structure: an object whose sections are lists of
+    items with numeric volume and price (and {year: value} steps and
+    overrides). Raises ValueError otherwise."""
+    if not isinstance(project, dict):
+        raise ValueError("project must be a JSON object")
+    for key in ITEM_SECTIONS:
+        items = project.get(key, [])
+        if not isinstance(items, list):
+            raise ValueError(f"{key} must be a list of items")
+        for i, item in enumerate(items):
+            if not isinstance(item, dict):
+                raise ValueError(f"{key}[{i}] must be an object")
+            for field in NUMBER_FIELDS:
+                value = item.get(field)
+                if value is None:
+                    continue
+                try:
+                    float(value)
+                except (TypeError, ValueError):
+                    raise ValueError(f"{key}[{i}].{field} must be a number, got {value!r}")
+            for field in MAPPING_FIELDS:
+                if item.get(field) and not isinstance(item[field], dict):
+                    raise ValueError(f"{key}[{i}].{field} must be an object of year: value")
+    return project
+
+
+def load_project(path):
+    """Read a project JSON file (as saved by "💾 Save Project")"""
+    with open(path, 'r', encoding='utf-8') as f:
+        project = json.load(f)
+    return validate_project(project)
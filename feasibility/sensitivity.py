@@ -0,0 +1,91 @@
+"""One-at-a-time NPV sensitivity (tornado) analysis."""
+import numpy as np
+
+from .cashflow import (
+    capex_amounts,
+    project_cashflows,
+    discount_factors_for,
+    calculate_discounted_cashflow,
+)
+from .curve import shifted_curves, scenario_npvs
+from .metrics import calculate_npv
+from .tax import after_tax_schedule
+
+
+def run_sensitivity_analysis(capex, cash_in, cash_out, years, rate, growth_in, growth_out, variation,
+                             tax_rate=None, deductions=None):
+    """NPV at -/+ variation% for each key variable, most sensitive first.
+
+    Works on section totals (or per-year amounts, see project_cashflows) so
+    the project data is never modified. rate is the MARR or per-year rates
+    for years 1..years (a discount curve), which is shifted in proportion
+    (every rate by variation% of itself) and also twisted (short rates one
+    way, long rates the other). With tax_rate set, NPVs are after
+    tax; deductions are the depreciation less disposal gains per year for
+    years 0..years, which scale with the investment. Returns (base_npv,
+    sensitivity_results).
+    """
+    v = variation / 100
+    capex = capex_amounts(capex, years)
+    cash_in = np.asarray(cash_in, dtype=float)
+    cash_out = np.asarray(cash_out, dtype=float)
+
+    rates = np.asarray(rate, dtype=float)
+    is_curve = rates.ndim > 0
+
+    def cashflows_for(capex_scale=1.0, cash_in=cash_in, cash_out=cash_out):
+        cashflows = project_cashflows(capex * capex_scale, cash_in, cash_out, years, growth_in, growth_out)
+        if tax_rate is not None:
+            _, tax = after_tax_schedule(capex * capex_scale, cashflows, np.asarray(deductions) * capex_scale, tax_rate)
+            cashflows = (np.asarray(cashflows) - tax).tolist()
+        return cashflows
+
+    def npv_for(**changes):
+        return calculate_npv(calculate_discounted_cashflow(cashflows_for(**changes), discount_factors_for(rate, years)))
+
+    base_npv = npv_for()
+
+    # Rate shifts are evaluated together: one discount factor row per shifted curve
+    twists = (v, -v) if is_curve else ()
+    rate_npvs = scenario_npvs(
+        cashflows_for(),
+        shifted_curves(rates if is_curve else np.full(years, float(rate)), proportional=(v, -v), twist=twists),
+    ).tolist()
+
+    # NPV_Low is always the adverse scenario: less revenue, higher costs/investment/rate
+    scenarios = [
+        ('Revenue', npv_for(cash_in=cash_in * (1 - v)), npv_for(cash_in=cash_in * (1 + v))),
+        ('Operating Costs', npv_for(cash_out=cash_out * (1 + v)), npv_for(cash_out=cash_out * (1 - v))),
+        ('Initial Investment', npv_for(capex_scale=1 + v), npv_for(capex_scale=1 - v)),
+        # Every rate moves by variation% of itself: the MARR, or the whole curve in proportion
+        ('Discount Curve (proportional)' if is_curve else 'Discount Rate', rate_npvs[0], rate_npvs[1]),
+    ]
+    if is_curve:
+        # Either twist can be the adverse one, depending on when the cash arrives
+        scenarios.append(('Curve Twist', min(rate_npvs[2:]), max(rate_npvs[2:])))
+
+    sensitivity_results = [
+        {'Variable': name, 'NPV_Low': npv_low, 'NPV_High': npv_high, 'Range': npv_high - npv_low}
+        for name, npv_low, npv_high in scenarios
+    ]
+
+    # Sort by range (most sensitive first)
+    sensitivity_results.sort(key=lambda x: x['Range'], reverse=True)
+    return base_npv, sensitivity_results
+
+
+def sensitivity_for(result, variation=20):
+    """run_sensitivity_analysis() for a result of evaluate_project()"""
+    after_tax = 'tax' in result
+    return run_sensitivity_analysis(
+        tuple(result['capex_schedule']),
+        tuple(result['cash_in_schedule']),
+        tuple(result['cash_out_schedule']),
+        result['project_years'],
+        tuple(result['discount_rates']) if result['discount_curve'] else result['discount_rate'],
+        0.0,
+        0.0,
+        variation,
+        result['tax_rate'] if after_tax else None,
+        tuple(np.subtract(result['depreciation'], result['disposal_gains'])) if after_tax else None,
+    )
@@ -0,0 +1,304 @@
+"""Local JSON HTTP API for project evaluation.
+
+Connections are handled on an asyncio event loop; the calculations run in a
+process pool so slow requests never block others. Responses are cached by a
+hash of the endpoint and the canonical JSON payload.
+
+Endpoints (request and response bodies are JSON):
+    GET  /health          {"status": "ok", ...}
+    POST /evaluate        a project -> cash flows, NPV, IRR, payback
+                          (add "sensitivity": PERCENT for the tornado analysis)
+    POST /sensitivity     {"project": {...}, "variation": 20} -> tornado analysis
+    POST /batch           {"projects": [{...}, ...], "sensitivity": 20} -> one result per project
+                          ({"error": ...} for a project that is not valid)
+                          (add "budget": AMOUNT or [per year] for the best portfolio within it)
+
+Projects use the app's save format and are checked with
+feasibility.project.validate_project(); an invalid project or setting is a
+400 with the reason.
+
+Usage:
+    python -m feasibility.server --port 8765 --workers 4
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from .metrics import evaluate_project
+from .portfolio import select_projects
+from .project import validate_project
+from .sensitivity import sensitivity_for
+
+MAX_BODY_BYTES = 10 * 1024 * 1024
+MAX_BATCH_PROJECTS = 10000
+BATCH_CHUNK_PROJECTS = 200
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+               413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class RequestError(Exception):
+    """A request the API rejects, sent back as {"error": message}"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def json_safe(value):
+    """Replace NaN/inf (e.g. IRR with no sign change) with None so the output is valid JSON"""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {key: json_safe(v) for key, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_safe(v) for v in value]
+    return value
+
+
+def evaluate_payload(project, variation=None):
+    """Result of one project, with the tornado analysis when variation is given"""
+    result = evaluate_project(validate_project(project))
+    if variation is not None:
+        base_npv, sensitivity_results = sensitivity_for(result, float(variation))
+        result['sensitivity'] = {'variation': float(variation), 'base_npv': base_npv,
+                                 'results': sensitivity_results}
+    return json_safe(result)
+
+
+def evaluate_batch(projects, variation=None):
+    """evaluate_payload() for many projects; failures become {"error": ...} entries"""
+    results = []
+    for project in projects:
+        try:
+            results.append(evaluate_payload(project, variation))
+        except Exception as e:
+            results.append({'error': f"{type(e).__name__}: {e}"})
+    return results
+
+
+def select_portfolio(results, budget):
+    """select_projects() over the evaluated results of a batch; indices are positions in results"""
+    evaluated = [i for i, result in enumerate(results) if 'error' not in result]
+    portfolio = select_projects([results[i]['npv'] for i in evaluated],
+                                [results[i]['purchase_schedule'] for i in evaluated], budget)
+    portfolio['selected'] = [evaluated[i] for i in portfolio['selected']]
+    return portfolio
+
+
+class ResponseCache:
+    """Least-recently-used cache of response bodies"""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        body = self.entries.get(key)
+        if body is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return body
+
+    def put(self, key, body):
+        if self.max_entries <= 0:
+            return
+        self.entries[key] = body
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+def payload_key(path, payload):
+    """Cache key: endpoint plus the SHA-256 of the canonical JSON payload"""
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    return path + ':' + hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class FeasibilityAPI:
+    """Routes requests and runs the calculations in a worker pool"""
+
+    def __init__(self, workers=None, cache_size=1024):
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        self.cache = ResponseCache(cache_size)
+        self.requests = 0
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+    async def run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.pool, func, *args)
+
+    async def handle(self, method, path, payload):
+        """(status, response body bytes) for a parsed request"""
+        self.requests += 1
+        if path == '/health':
+            if method != 'GET':
+                raise RequestError(405, "use GET")
+            return 200, self.encode({
+                'status': 'ok', 'workers': self.workers, 'requests': self.requests,
+                'cache': {'entries': len(self.cache.entries), 'hits': self.cache.hits,
+                          'misses': self.cache.misses},
+            })
+
+        handler = {'/evaluate': self.evaluate, '/sensitivity': self.sensitivity,
+                   '/batch': self.batch}.get(path)
+        if handler is None:
+            raise RequestError(404, f"unknown endpoint {path}")
+        if method != 'POST':
+            raise RequestError(405, "use POST with a JSON body")
+        if not isinstance(payload, dict):
+            raise RequestError(400, "request body must be a JSON object")
+
+        key = payload_key(path, payload)
+        body = self.cache.get(key)
+        if body is None:
+            body = self.encode(await handler(payload))
+            self.cache.put(key, body)
+        return 200, body
+
+    async def evaluate(self, payload):
+        project = dict(payload)
+        variation = project.pop('sensitivity', None)
+        return await self.run_project(project, variation)
+
+    async def sensitivity(self, payload):
+        return await self.run_project(payload.get('project'), payload.get('variation', 20))
+
+    async def run_project(self, project, variation):
+        try:
+            return await self.run(evaluate_payload, project, variation)
+        except (TypeError, ValueError) as e:
+            raise RequestError(400, str(e))
+
+    async def batch(self, payload):
+        projects = payload.get('projects')
+        if not isinstance(projects, list):
+            raise RequestError(400, "projects must be a list")
+        if len(projects) > MAX_BATCH_PROJECTS:
+            raise RequestError(413, f"at most {MAX_BATCH_PROJECTS} projects per request")
+
+        variation = payload.get('sensitivity')
+        if variation is not None and not isinstance(variation, (int, float)):
+            raise RequestError(400, f"sensitivity must be a number, got {variation!r}")
+
+        # Chunks keep the per-task overhead small and spread a batch over all workers
+        # (projects that fail validation come back as {"error": ...} entries)
+        chunks = [projects[i:i + BATCH_CHUNK_PROJECTS]
+                  for i in range(0, len(projects), BATCH_CHUNK_PROJECTS)]
+        chunk_results = await asyncio.gather(*(self.run(evaluate_batch, chunk, variation) for chunk in chunks))
+        results = [result for chunk in chunk_results for result in chunk]
+        if payload.get('budget') is None:
+            return {'results': results}
+        try:
+            return {'results': results, 'portfolio': await self.run(select_portfolio, results, payload['budget'])}
+        except (TypeError, ValueError) as e:
+            raise RequestError(400, str(e))
+
+    @staticmethod
+    def encode(data):
+        return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+    async def serve_connection(self, reader, writer):
+        """Read requests from one connection (HTTP/1.1 keep-alive) until it closes"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                keep_alive = await self.respond(request_line, reader, writer)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, request_line, reader, writer):
+        """Handle one request and write the response; returns whether to keep the connection"""
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            method, target, version = request_line.decode('latin-1').split()
+        except ValueError:
+            method, target, version = '', '', 'HTTP/1.0'
+        connection = headers.get('connection', '').lower()
+        keep_alive = connection == 'keep-alive' or (version == 'HTTP/1.1' and connection != 'close')
+
+        try:
+            try:
+                length = int(headers.get('content-length', 0))
+            except ValueError:
+                length = -1
+            if length < 0:
+                keep_alive = False  # The body's end is unknown
+                raise RequestError(400, f"invalid Content-Length: {headers.get('content-length')!r}")
+            if length > MAX_BODY_BYTES:
+                keep_alive = False
+                raise RequestError(413, f"request body over {MAX_BODY_BYTES} bytes")
+            body = await reader.readexactly(length) if length else b''
+            if not method:
+                raise RequestError(400, "malformed request line")
+            try:
+                payload = json.loads(body) if body else None
+            except ValueError as e:
+                raise RequestError(400, f"invalid JSON: {e}")
+            status, response = await self.handle(method, target.split('?')[0], payload)
+        except RequestError as e:
+            status, response = e.status, self.encode({'error': str(e)})
+        except Exception as e:
+            status, response = 500, self.encode({'error': f"{type(e).__name__}: {e}"})
+
+        writer.write(
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(response)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + response
+        )
+        return keep_alive
+
+
+async def serve(host='127.0.0.1', port=8765, workers=None, cache_size=1024):
+    api = FeasibilityAPI(workers, cache_size)
+    server = await asyncio.start_server(api.serve_connection, host, port)
+    print(f"Feasibility API on http://{host}:{port} ({api.workers} workers)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        api.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--cache-size', type=int, default=1024, help='cached responses (0 disables the cache)')
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.cache_size))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
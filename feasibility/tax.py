@@ -0,0 +1,125 @@
+"""After-tax cash flows: fiscal depreciation of CAPEX and corporate income tax.
+
+CAPEX items may carry an asset_group from ASSET_GROUPS (default kelompok_1),
+the fiscal asset groups of Indonesian income tax law (UU PPh Pasal 11), which
+set the depreciation period. Depreciation starts the year after purchase:
+
+- straight_line:     cost / life each year
+- declining_balance: 2 / life of the book value each year, the remaining
+  book value in the last year (buildings always use straight_line)
+
+A purchase that returns a residual or book value (see feasibility.capex), or
+whose useful life ends, is disposed of in that year: depreciation stops, and
+the proceeds less the fiscal book value are taxed as a gain (or deducted as a
+loss). Taxable income is revenue - expenses - depreciation + disposal gains;
+losses are carried forward up to LOSS_CARRYFORWARD_YEARS years, oldest first.
+"""
+from collections import deque
+
+import numpy as np
+
+from .capex import capex_purchases
+
+# Group id: (label, fiscal life in years, declining balance allowed)
+ASSET_GROUPS = {
+    'kelompok_1': ("Kelompok 1 (4 years)", 4, True),
+    'kelompok_2': ("Kelompok 2 (8 years)", 8, True),
+    'kelompok_3': ("Kelompok 3 (16 years)", 16, True),
+    'kelompok_4': ("Kelompok 4 (20 years)", 20, True),
+    'bangunan_permanen': ("Permanent building (20 years)", 20, False),
+    'bangunan_tidak_permanen': ("Non-permanent building (10 years)", 10, False),
+    'tanah': ("Land (not depreciated)", 0, False),
+}
+DEFAULT_ASSET_GROUP = 'kelompok_1'
+DEPRECIATION_METHODS = ('straight_line', 'declining_balance')
+DEFAULT_TAX_RATE = 22.0  # PPh Badan, percent
+LOSS_CARRYFORWARD_YEARS = 5
+
+
+def asset_group_of(item):
+    """An item's fiscal asset group id (the default group when missing or unknown)"""
+    group = item.get('asset_group')
+    return group if group in ASSET_GROUPS else DEFAULT_ASSET_GROUP
+
+
+def purchase_depreciation(items, years, method='straight_line'):
+    """Depreciation of every purchase of items per year, and the disposal gains.
+
+    Returns (rows, depreciation, gains): the item of each purchase, a
+    (purchases, years + 1) array of its depreciation, and a (years + 1,)
+    vector of disposal gains (negative for losses).
+    """
+    rows, buy_years, costs, end_years, end_values, retired = capex_purchases(items, years)
+
+    groups = [ASSET_GROUPS[asset_group_of(item)] for item in items]
+    item_life = np.array([life for _, life, _ in groups], dtype=int).reshape(-1)
+    item_declining = np.array([method == 'declining_balance' and declining for _, _, declining in groups], dtype=bool).reshape(-1)
+    life = item_life[rows]
+    declining = item_declining[rows]
+
+    # Age of each purchase in each year: 1 in the year after it is bought
+    age = np.arange(years + 1)[None, :] - buy_years[:, None]
+    in_life = (age >= 1) & (age <= life[:, None])
+    safe_life = np.maximum(life, 1)[:, None]
+
+    depreciation = np.where(in_life, costs[:, None] / safe_life, 0.0)
+
+    # Declining balance only for the purchases that use it
+    if declining.any():
+        d = np.flatnonzero(declining)
+        d_age, d_life = age[d], life[d][:, None]
+        rate = np.minimum(2.0 / d_life, 1.0)
+        remaining = costs[d][:, None] * (1 - rate) ** np.clip(d_age - 1, 0, None)
+        depreciation[d] = np.where(in_life[d], np.where(d_age == d_life, remaining, remaining * rate), 0.0)
+
+    # Disposed purchases stop depreciating; proceeds less book value are a gain
+    disposed = retired | (end_values != 0)
+    depreciation[age > np.where(disposed, end_years - buy_years, years + 1)[:, None]] = 0.0
+    book_values = costs - depreciation.sum(axis=1)
+    gains = np.bincount(end_years[disposed], weights=(end_values - book_values)[disposed], minlength=years + 1)
+    return rows, depreciation, gains.astype(float)
+
+
+def depreciation_matrix(items, years, method='straight_line'):
+    """Fiscal depreciation of each item per year, shape (len(items), years + 1)"""
+    rows, depreciation, _ = purchase_depreciation(items, years, method)
+    matrix = np.zeros((len(items), years + 1))
+    np.add.at(matrix, rows, depreciation)
+    return matrix
+
+
+def tax_deductions(items, years, method='straight_line'):
+    """(depreciation, disposal gains) per year for years 0..years"""
+    _, depreciation, gains = purchase_depreciation(items, years, method)
+    return depreciation.sum(axis=0), gains
+
+
+def income_tax(taxable_income, rate_percent):
+    """Tax per year on taxable income, with losses carried forward"""
+    rate = rate_percent / 100
+    tax = np.zeros(len(taxable_income))
+    losses = deque()  # [year, unused loss], oldest first
+    for year, income in enumerate(taxable_income):
+        while losses and year - losses[0][0] > LOSS_CARRYFORWARD_YEARS:
+            losses.popleft()
+        if income < 0:
+            losses.append([year, -income])
+            continue
+        while income > 0 and losses:
+            used = min(income, losses[0][1])
+            income -= used
+            losses[0][1] -= used
+            if losses[0][1] == 0:
+                losses.popleft()
+        tax[year] = income * rate
+    return tax
+
+
+def after_tax_schedule(capex, cashflows, deductions, rate_percent):
+    """(taxable income, tax) per year from pre-tax cashflows.
+
+    capex is the CAPEX per year included in cashflows, deductions the
+    depreciation less disposal gains per year.
+    """
+    taxable_income = np.asarray(cashflows, dtype=float) + np.asarray(capex, dtype=float) - np.asarray(deductions, dtype=float)
+    return taxable_income, income_tax(taxable_income, rate_percent)
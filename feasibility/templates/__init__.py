@@ -0,0 +1,68 @@
+"""Project templates: named example projects stored as JSON files in this directory.
+
+Each <template id>.json holds a project in the app's save format plus a
+display "name" and "description". Templates are read once per process and
+shared read-only; new_project() returns a fresh copy to edit. Adding a template
+only takes adding a JSON file here.
+"""
+import glob
+import json
+import os
+from functools import lru_cache
+from types import MappingProxyType
+
+from ..project import project_settings
+
+TEMPLATE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_TEMPLATE = 'nas_it'
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(v) for key, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _thaw(value):
+    if isinstance(value, MappingProxyType):
+        return {key: _thaw(v) for key, v in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    return value
+
+
+@lru_cache(maxsize=None)
+def template_registry():
+    """{template id: read-only template}, loaded once per process"""
+    registry = {}
+    for path in sorted(glob.glob(os.path.join(TEMPLATE_DIR, '*.json'))):
+        template_id = os.path.splitext(os.path.basename(path))[0]
+        with open(path, 'r', encoding='utf-8') as f:
+            template = json.load(f)
+        project_settings(template)  # Raises ValueError for a broken template
+        template.setdefault('name', template_id)
+        registry[template_id] = _freeze(template)
+    return MappingProxyType(registry)
+
+
+def template_names():
+    """{template id: display name}, default template first"""
+    registry = template_registry()
+    ids = sorted(registry, key=lambda template_id: (template_id != DEFAULT_TEMPLATE, registry[template_id]['name']))
+    return {template_id: registry[template_id]['name'] for template_id in ids}
+
+
+def new_project(template_id=DEFAULT_TEMPLATE):
+    """A new, editable project copied from a template"""
+    try:
+        template = template_registry()[template_id]
+    except KeyError:
+        raise ValueError(f"unknown template {template_id!r}")
+
+    project = _thaw(template)
+    for key in ('name', 'description'):
+        project.pop(key, None)
+    project['template'] = template_id
+    return project
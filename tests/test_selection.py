@@ -0,0 +1,154 @@
+"""Optional CAPEX and portfolio selection against brute force over every subset."""
+import itertools
+
+import numpy as np
+import pytest
+
+from feasibility import evaluate_project
+from feasibility.options import optional_capex_for, select_options
+from feasibility.portfolio import branch_and_bound, budget_matrix, portfolio_for, select_projects
+
+
+def subsets(n):
+    for mask in itertools.product([False, True], repeat=n):
+        yield np.array(mask, dtype=bool)
+
+
+def best_options(capex_pv, costs, operating_pv, optional, requirements, budget):
+    """Highest NPV over every choice of optional items, or None if nothing fits"""
+    optional = np.asarray(optional, dtype=int)
+    is_optional = np.zeros(len(capex_pv), dtype=bool)
+    is_optional[optional] = True
+    best = None
+    for chosen in subsets(len(optional)):
+        bought = set(np.flatnonzero(chosen))
+        if costs[~is_optional].sum() + costs[optional[chosen]].sum() > budget + 1e-6:
+            continue
+        npv = -capex_pv[~is_optional].sum() - capex_pv[optional[chosen]].sum()
+        npv += sum(pv for pv, needs in zip(operating_pv, requirements) if needs <= bought)
+        best = npv if best is None else max(best, npv)
+    return best
+
+
+def random_options(rng):
+    n_capex, n_operating = rng.integers(1, 10), rng.integers(0, 10)
+    capex_pv = rng.uniform(1, 100, n_capex)
+    costs = capex_pv * rng.uniform(0.8, 1.2, n_capex)
+    operating_pv = rng.normal(30, 40, n_operating)
+    optional = sorted(rng.choice(n_capex, rng.integers(0, n_capex + 1), replace=False).tolist())
+    requirements = [frozenset(rng.choice(len(optional), rng.integers(0, min(3, len(optional)) + 1),
+                                         replace=False).tolist()) for _ in range(n_operating)]
+    budget = float(costs.sum() * rng.uniform(0.2, 1.1))
+    return capex_pv, costs, operating_pv, optional, requirements, budget
+
+
+def random_portfolio(rng, per_year):
+    n, years = rng.integers(1, 12), rng.integers(1, 4)
+    npvs = rng.normal(50, 60, n)
+    capex = rng.uniform(0, 100, (n, years)) * (rng.random((n, years)) < 0.7)
+    budget = rng.uniform(20, 150, years).tolist() if per_year else float(rng.uniform(50, 400))
+    return npvs, list(capex), budget
+
+
+def best_portfolio(npvs, capex, budget):
+    costs, limits = budget_matrix(capex, budget)
+    return max(npvs[chosen].sum() for chosen in subsets(len(npvs))
+               if (costs[chosen].sum(axis=0) <= limits + 1e-9).all())
+
+
+@pytest.mark.parametrize('seed', range(200))
+def test_select_options_matches_brute_force(seed):
+    capex_pv, costs, operating_pv, optional, requirements, budget = random_options(np.random.default_rng(seed))
+    result = select_options(capex_pv, costs, operating_pv, optional, requirements, budget)
+    best = best_options(capex_pv, costs, operating_pv, optional, requirements, budget)
+    if best is None:
+        assert result['selected'] is None
+        return
+    assert result['optimal']
+    assert result['npv'] == pytest.approx(best, abs=1e-6)
+    assert result['bound'] == result['npv'] and result['gap'] == 0
+    assert set(result['selected']) <= set(optional)
+    assert result['capex'] <= budget + 1e-6
+
+
+@pytest.mark.parametrize('limits', [{'max_nodes': 2}, {'max_seconds': 0.0}])
+def test_select_options_stopped_early(limits):
+    rng = np.random.default_rng(1)
+    n = 40
+    capex_pv = rng.uniform(1, 100, n)
+    costs = capex_pv * rng.uniform(0.8, 1.2, n)
+    operating_pv = rng.normal(30, 40, 60)
+    requirements = [frozenset(rng.choice(n, rng.integers(1, 3), replace=False).tolist()) for _ in range(60)]
+    budget = float(costs.sum() / 2)
+    full = select_options(capex_pv, costs, operating_pv, list(range(n)), requirements, budget)
+    stopped = select_options(capex_pv, costs, operating_pv, list(range(n)), requirements, budget, **limits)
+    assert full['optimal'] and not stopped['optimal']
+    assert stopped['npv'] <= full['npv'] + 1e-6 <= stopped['bound'] + 2e-6
+    assert stopped['gap'] == pytest.approx((stopped['bound'] - stopped['npv']) / abs(stopped['bound']))
+    assert stopped['capex'] <= budget + 1e-6
+
+
+def test_option_costs_are_purchases():
+    # Residual values returned in the same or other years do not lower an item's cost
+    project = {
+        'capex_items': [
+            {'name': 'A', 'volume': 1, 'price': 100e6, 'useful_life': 3, 'residual': 20},
+            {'name': 'B', 'volume': 1, 'price': 50e6, 'start_year': 3},
+            {'name': 'C', 'volume': 1, 'price': 10e6, 'optional': True, 'enables': 'R',
+             'recur_every': 2, 'useful_life': 2, 'residual': 50},
+        ],
+        'opex_cash_in': [{'name': 'R', 'volume': 1, 'price': 80e6}],
+        'opex_cash_out': [],
+        'project_years': 5,
+        'discount_rate': 10,
+    }
+    assert optional_capex_for(project, 150e6)['capex'] == 150e6
+    assert optional_capex_for(project, 179e6)['selected'] == []
+    assert optional_capex_for(project, 180e6)['selected'] == [2]
+    assert optional_capex_for(project, 180e6)['capex'] == 180e6
+
+
+@pytest.mark.parametrize('per_year', [False, True])
+@pytest.mark.parametrize('seed', range(150))
+def test_select_projects_matches_brute_force(seed, per_year):
+    npvs, capex, budget = random_portfolio(np.random.default_rng(seed), per_year)
+    best = best_portfolio(npvs, capex, budget)
+    costs, limits = budget_matrix(capex, budget)
+
+    exact = select_projects(npvs, capex, budget, 'exact')
+    assert exact['optimal']
+    assert exact['total_npv'] == pytest.approx(best, abs=1e-6)
+    assert exact['bound'] == exact['total_npv'] and exact['gap'] == 0
+    assert (costs[exact['selected']].sum(axis=0) <= limits + 1e-6).all()
+
+    greedy = select_projects(npvs, capex, budget, 'greedy')
+    assert greedy['total_npv'] <= best + 1e-6 <= greedy['bound'] + 2e-6
+    assert (costs[greedy['selected']].sum(axis=0) <= limits + 1e-6).all()
+
+
+@pytest.mark.parametrize('limits', [{'max_nodes': 2}, {'max_seconds': 0.0}])
+def test_branch_and_bound_stopped_early(limits):
+    rng = np.random.default_rng(2)
+    n = 200
+    npvs = rng.normal(1e8, 8e7, n)
+    costs = rng.uniform(1e7, 5e8, (n, 3))
+    budget = costs.sum(axis=0) / 3
+    selected, optimal, bound = branch_and_bound(npvs, costs, budget, **limits)
+    full, full_optimal, _ = branch_and_bound(npvs, costs, budget)
+    assert full_optimal and not optimal
+    assert (costs[selected].sum(axis=0) <= budget + 1e-6).all()
+    assert npvs[selected].sum() <= npvs[full].sum() + 1e-6 <= bound + 1e-6
+
+
+def test_portfolio_budgets_purchases_only():
+    # A purchase in year 2 returns half its cost there; the year's budget still needs all of it
+    project = {
+        'capex_items': [{'name': 'A', 'volume': 1, 'price': 100e6, 'recur_every': 2, 'useful_life': 2, 'residual': 50}],
+        'opex_cash_in': [{'name': 'R', 'volume': 1, 'price': 80e6}],
+        'opex_cash_out': [],
+        'project_years': 5,
+        'discount_rate': 10,
+    }
+    result = evaluate_project(project)
+    assert portfolio_for([result], [100e6, 0, 100e6])['selected'] == [0]
+    assert portfolio_for([result], [100e6, 0, 60e6])['selected'] == []